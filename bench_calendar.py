@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import datetime
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'driver'))
+
+from main import get_weekname, get_month_from_date
+from week_calendar import weekname_series, month_series
+
+# Benchmark: per-row get_weekname/get_month_from_date vs vectorized week_calendar
+ROW_COUNTS = [1000, 10000, 100000]
+
+
+def make_dates(n, seed=0):
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 365 * 6, size=n)
+    dates = pd.Series(pd.Timestamp('2022-01-01') + pd.to_timedelta(days, unit='D'))
+    # 실제 GLOP 데이터처럼 일부 결측값 포함
+    dates[rng.random(n) < 0.05] = pd.NaT
+    return dates
+
+
+def per_row(dates):
+    """driver/main.py 의 기존 행 단위 로직"""
+    week_name = dates.apply(get_weekname)
+
+    def calculate_month(week_name):
+        if not week_name: return None
+        try:
+            dt = datetime.date.fromisoformat(week_name[:10])
+            iso_year = dt.isocalendar().year
+            month = get_month_from_date(dt)
+            return f"{iso_year}-{month:02d}"
+        except:
+            return None
+
+    month = week_name.apply(calculate_month)
+    return week_name, month
+
+
+def vectorized(dates):
+    return weekname_series(dates), month_series(dates)
+
+
+def as_list(series):
+    return [None if pd.isna(x) else x for x in series]
+
+
+def timed(func, dates):
+    start = time.perf_counter()
+    result = func(dates)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    # 조회 테이블 생성 비용은 프로세스당 1회이므로 별도로 측정
+    start = time.perf_counter()
+    vectorized(make_dates(10))
+    print(f"Calendar table build: {time.perf_counter() - start:.4f}s\n")
+
+    print(f"{'rows':>8} | {'per-row':>10} | {'vectorized':>10} | {'speedup':>8}")
+    for n in ROW_COUNTS:
+        dates = make_dates(n)
+        (old_week, old_month), old_time = timed(per_row, dates)
+        (new_week, new_month), new_time = timed(vectorized, dates)
+
+        # 결과 문자열이 기존 로직과 완전히 같은지 검증
+        assert as_list(old_week) == as_list(new_week), "Week Name mismatch"
+        assert as_list(old_month) == as_list(new_month), "Month mismatch"
+
+        print(f"{n:>8} | {old_time:>9.3f}s | {new_time:>9.4f}s | {old_time / new_time:>7.1f}x")
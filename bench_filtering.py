@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'server'))
+sys.path.insert(0, os.path.join(ROOT, 'driver'))
+
+from model_filter import filter_by_series
+
+# Micro-benchmark: save_to_db 모델 필터링 (기존 lambda 방식 vs 벡터화 + factorize 방식)
+ROW_COUNTS = [1000, 10000, 100000, 1000000]
+
+valid_series = {f"{size}{code}" for size in ('22', '24', '27', '32', '34') for code in ('GQ50F', 'GS60QC', 'MR400', 'U631A', 'BA450', 'G600A')}
+
+
+def make_models(n, seed=0):
+    rng = np.random.default_rng(seed)
+    series = sorted(valid_series) + ['INVALID', '27XX999', 'AnotherBadModel']
+    suffixes = ['-B.AUS', '-B.AEKQ', '.KR', '-W.AEU', '']
+    models = [s + suffixes[i % len(suffixes)] for i, s in enumerate(series)] * 3
+    sample = np.array(models, dtype=object)[rng.integers(0, len(models), size=n)]
+    sample[rng.random(n) < 0.01] = np.nan  # 빈 Model 셀
+    return pd.Series(sample)
+
+
+def lambda_filter(models):
+    """
+    driver/main.py 의 기존 로직.
+    당시 pandas의 astype(str)은 빈 값을 'nan'/'None' 문자열로 바꿨으므로 map(str)로 같은 동작을 재현
+    """
+    temp_series = models.map(str).apply(lambda x: x.split('-')[0].split('.')[0])
+    excluded_mask = ~temp_series.isin(valid_series)
+    excluded_models = temp_series.loc[excluded_mask].unique()
+    return (~excluded_mask).to_numpy(), list(excluded_models)
+
+
+def check_missing_models():
+    """빈 Model(NaN/None) 행이 기존 로직과 같이 제외되는지 검증"""
+    models = pd.Series(['24GQ40W-B.AUS', np.nan, 'BAD-X', '27GQ50F.KR', None, np.nan, '24GQ40W-B.AUS'], dtype=object)
+    valid = {'24GQ40W', '27GQ50F'}
+    old_series = models.map(str).apply(lambda x: x.split('-')[0].split('.')[0])
+    old_mask = old_series.isin(valid).to_numpy()
+    new_mask, new_excluded = filter_by_series(models, valid)
+    assert (old_mask == new_mask).all(), f"Missing-model mask mismatch: {new_mask}"
+    assert new_excluded == list(old_series[~old_mask].unique()), f"Missing-model excluded list mismatch: {new_excluded}"
+
+
+def timed(func, models):
+    start = time.perf_counter()
+    result = func(models)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    check_missing_models()
+    print(f"{'rows':>8} | {'lambda':>10} | {'vectorized':>10} | {'speedup':>8}")
+    for n in ROW_COUNTS:
+        models = make_models(n)
+        (old_mask, old_excluded), old_time = timed(lambda_filter, models)
+        (new_mask, new_excluded), new_time = timed(lambda m: filter_by_series(m, valid_series), models)
+
+        # 제외되는 행과 [알림] 로그에 출력되는 모델 목록(순서 포함)이 같은지 검증
+        assert (old_mask == new_mask).all(), "Filter mask mismatch"
+        assert old_excluded == new_excluded, "Excluded model list mismatch"
+
+        print(f"{n:>8} | {old_time:>9.4f}s | {new_time:>9.4f}s | {old_time / new_time:>7.1f}x")
@@ -0,0 +1,162 @@
+"""
+다운로드 폴더에 새로 생긴 엑셀 파일이 '다 써졌는지'를 감지하는 모듈.
+
+- Linux: inotify (ctypes로 libc 직접 호출). 파일이 닫히거나(IN_CLOSE_WRITE) 임시 파일에서
+  이름이 바뀌어 들어오면(IN_MOVED_TO, Chrome의 .crdownload → .xls) 즉시 완료로 판단
+- 그 외 OS(Windows 등) 또는 inotify 사용 불가: 폴더를 짧은 간격으로 확인하고,
+  크기와 수정 시각이 settle초 동안 변하지 않으면 완료로 판단
+
+사용법 (다운로드 클릭 전에 감시 시작 → 이후 생긴 파일만 대상):
+    watcher = DownloadWatcher(download_dir)
+    try:
+        excel_btn.click()
+        new_file = watcher.wait_for_file(timeout=60)
+    finally:
+        watcher.close()
+
+여러 파일이 한꺼번에 생기면 완료된 순서대로 wait_for_file 호출마다 하나씩 돌려줍니다.
+다른 다운로드와 섞이지 않도록 실행(세션)마다 전용 폴더를 사용하세요.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+DOWNLOAD_EXTENSIONS = ('.xls', '.xlsx')
+# 다운로드 중인 임시 파일 (Chrome / Firefox / Edge)
+PARTIAL_SUFFIXES = ('.crdownload', '.part', '.tmp')
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _open_inotify(directory):
+    """directory를 감시하는 inotify fd (inotify를 쓸 수 없으면 None)"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory),
+                                    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE)
+        if wd < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+class DownloadWatcher:
+    def __init__(self, directory, extensions=DOWNLOAD_EXTENSIONS, settle=0.5, poll_interval=0.2):
+        """
+        directory: 감시할 다운로드 폴더. 생성 시점에 있던 파일은 무시합니다.
+        settle: 크기 기준 판단 시 변화가 없어야 하는 시간(초), poll_interval: 폴링 간격(초)
+        """
+        self.directory = directory
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self._baseline = set(os.listdir(directory))
+        self._pending = {}     # 파일명 -> (크기, 수정 시각, 그 상태가 처음 관찰된 시각)
+        self._completed = []   # 완료 순서대로, 아직 돌려주지 않은 파일명
+        self._reported = set()
+        self._fd = _open_inotify(directory)
+
+    @property
+    def uses_inotify(self):
+        return self._fd is not None
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _is_candidate(self, name):
+        lower = name.lower()
+        return (name not in self._baseline and name not in self._reported
+                and lower.endswith(self.extensions) and not lower.endswith(PARTIAL_SUFFIXES))
+
+    def _mark_complete(self, name):
+        self._pending.pop(name, None)
+        if name not in self._completed:
+            self._completed.append(name)
+
+    def _read_events(self, timeout):
+        """inotify 이벤트를 timeout초까지 기다려 반영합니다."""
+        ready, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not ready:
+            return
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                self._scan()  # 이벤트 유실: 폴더를 다시 확인
+            elif self._is_candidate(name):
+                if mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                    self._mark_complete(name)
+                else:
+                    self._pending.setdefault(name, None)
+
+    def _scan(self):
+        """폴링 방식: 새 파일을 대기 목록에 추가"""
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if self._is_candidate(entry.name) and entry.name not in self._completed:
+                    self._pending.setdefault(entry.name, None)
+
+    def _check_stable(self, now):
+        """대기 중인 파일 중 크기·수정 시각이 settle초 동안 그대로인 파일을 완료 처리"""
+        for name, last in list(self._pending.items()):
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                self._pending.pop(name, None)
+                continue
+            state = (stat.st_size, stat.st_mtime_ns)
+            if last is None or last[:2] != state:
+                self._pending[name] = (*state, now)
+            elif stat.st_size > 0 and now - last[2] >= self.settle:
+                self._mark_complete(name)
+
+    def wait_for_file(self, timeout=60):
+        """다 써진 새 파일의 전체 경로 (timeout초 안에 없으면 None)"""
+        deadline = time.monotonic() + timeout
+        while not self._completed:
+            now = time.monotonic()
+            if now >= deadline:
+                return None
+            wait = min(self.poll_interval, deadline - now)
+            if self._fd is not None:
+                # 대기 중인 파일이 없으면 이벤트가 올 때까지 깨어나지 않음
+                self._read_events(wait if self._pending else deadline - now)
+            else:
+                time.sleep(wait)
+                self._scan()
+            self._check_stable(time.monotonic())
+
+        name = self._completed.pop(0)
+        self._reported.add(name)
+        return os.path.join(self.directory, name)
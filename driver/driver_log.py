@@ -0,0 +1,10 @@
+"""
+드라이버 진행 로그 출력 (main.py, waits.py 등 드라이버 모듈 공용).
+"""
+
+
+def log_msg(message, log_queue=None):
+    """로그 메시지를 출력하거나 큐에 전송하는 함수"""
+    print(message)
+    if log_queue:
+        log_queue.put({'type': 'log', 'message': str(message)})
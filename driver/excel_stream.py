@@ -0,0 +1,192 @@
+import pandas as pd
+
+# 한 번에 메모리에 올리는 최대 행 수
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def iter_excel_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    GLOP에서 다운로드한 엑셀 파일을 chunk_size 행 단위의 DataFrame으로 나누어 돌려주는 제너레이터.
+    - .xlsx: openpyxl read-only 모드로 한 행씩 읽기
+    - .xls: xlrd로 읽고, 실제로는 HTML인 파일(xlrd 실패)은 lxml iterparse로 한 행씩 읽기
+    파일 형식 오류는 첫 번째 chunk를 요청하는 시점에 예외로 전달됩니다.
+    컬럼 타입은 첫 번째 chunk에서 한 번만 정하고 이후 chunk에도 같게 적용하므로, 빈 셀 위치에 따라
+    chunk마다 int / float / object가 달라지지 않습니다 (정수 컬럼은 빈 값을 허용하는 Int64).
+    """
+    parse_numbers = False
+    if file_path.lower().endswith('.xls'):
+        try:
+            rows = _iter_xls_rows(file_path)
+        except Exception:
+            rows = _iter_html_rows(file_path)
+            parse_numbers = True
+    else:
+        rows = _iter_xlsx_rows(file_path)
+
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = _make_columns(header)
+
+    dtypes = None
+    batch = []
+    for row in rows:
+        batch.append(_fit_row(row, len(columns)))
+        if len(batch) >= chunk_size:
+            df, dtypes = _to_frame(batch, columns, dtypes, parse_numbers)
+            yield df
+            batch = []
+    if batch:
+        yield _to_frame(batch, columns, dtypes, parse_numbers)[0]
+
+
+def _iter_xls_rows(file_path):
+    """xlrd로 .xls 파일을 열어 행 iterator를 돌려줍니다. (열기 실패 시 즉시 예외 발생)"""
+    import xlrd
+
+    book = xlrd.open_workbook(file_path, on_demand=True)
+    sheet = book.sheet_by_index(0)
+
+    def generate():
+        try:
+            for r in range(sheet.nrows):
+                yield [_xls_value(cell, book.datemode) for cell in sheet.row(r)]
+        finally:
+            book.release_resources()
+
+    return generate()
+
+
+def _xls_value(cell, datemode):
+    import xlrd
+
+    if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+        return None
+    if cell.ctype == xlrd.XL_CELL_DATE:
+        return xlrd.xldate_as_datetime(cell.value, datemode)
+    if cell.ctype == xlrd.XL_CELL_NUMBER and float(cell.value).is_integer():
+        return int(cell.value)
+    if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(cell.value)
+    return cell.value
+
+
+def _iter_xlsx_rows(file_path):
+    """openpyxl read-only 모드로 첫 번째 시트의 행을 순서대로 돌려줍니다."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def _iter_html_rows(file_path):
+    """
+    HTML 형식의 .xls 파일에서 첫 번째 <table>의 <tr>을 lxml iterparse로 하나씩 읽어 돌려줍니다.
+    처리가 끝난 행은 바로 트리에서 제거하여 메모리 사용량을 일정하게 유지합니다.
+    """
+    from lxml import etree
+
+    depth = 0
+    seen_table = False
+    for event, elem in etree.iterparse(file_path, events=('start', 'end'), html=True):
+        if elem.tag == 'table':
+            if event == 'start':
+                if seen_table and depth == 0:
+                    break  # 첫 번째 테이블만 읽음 (pd.read_html(...)[0]과 동일)
+                seen_table = True
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    break
+        elif event == 'end' and elem.tag == 'tr' and depth == 1:
+            cells = [''.join(cell.itertext()).strip() for cell in elem if cell.tag in ('td', 'th')]
+            yield [c if c != '' else None for c in cells]
+            elem.clear()
+            parent = elem.getparent()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def _make_columns(header):
+    """pandas와 동일하게 빈 헤더는 'Unnamed: n', 중복 헤더는 'name.1' 형태로 만듭니다."""
+    columns = []
+    seen = {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None or str(name).strip() == '' else str(name).strip()
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _fit_row(row, width):
+    if len(row) < width:
+        return row + [None] * (width - len(row))
+    return row[:width]
+
+
+def _parse_numbers(values):
+    """HTML 셀 문자열을 pd.read_html처럼 숫자로 변환 (천 단위 구분자 ',' 제거). 숫자가 아닌 값은 NaN"""
+    return pd.to_numeric(values.str.replace(',', '', regex=False), errors='coerce')
+
+
+def _column_dtypes(df, parse_numbers):
+    """
+    첫 chunk의 값으로 컬럼별 타입을 정합니다.
+    정수만 있으면 Int64, 숫자면 float64, 날짜/시각이면 datetime64, 그 외(빈 컬럼 포함)는 object
+    """
+    dtypes = {}
+    for col in df.columns:
+        values = df[col].dropna()
+        if parse_numbers and len(values):
+            converted = _parse_numbers(values)
+            if converted.isna().any():
+                dtypes[col] = object
+                continue
+            values = converted
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind == 'integer':
+            dtypes[col] = 'Int64'
+        elif kind in ('floating', 'mixed-integer-float'):
+            dtypes[col] = 'float64'
+        elif kind in ('datetime', 'datetime64'):
+            dtypes[col] = 'datetime64[ns]'
+        else:
+            dtypes[col] = object
+    return dtypes
+
+
+def _to_frame(rows, columns, dtypes, parse_numbers):
+    """
+    한 chunk의 행으로 DataFrame을 만들고 (DataFrame, dtypes)를 돌려줍니다.
+    dtypes가 None이면 이 chunk(첫 chunk)에서 정합니다. 정해진 타입으로 바꿀 수 없는 값(숫자 컬럼의
+    문자열 등)이 섞인 컬럼은 읽은 값 그대로(object) 둡니다.
+    """
+    df = pd.DataFrame(rows, columns=columns, dtype=object)
+    if dtypes is None:
+        dtypes = _column_dtypes(df, parse_numbers)
+    for col, dtype in dtypes.items():
+        if dtype is object:
+            continue
+        values = df[col]
+        if parse_numbers:
+            converted = _parse_numbers(values)
+            if converted.notna().sum() != values.notna().sum():
+                continue
+            values = converted
+        # 정수 컬럼에 소수가 섞인 chunk는 float64로
+        for target in ((dtype, 'float64') if dtype == 'Int64' else (dtype,)):
+            try:
+                df[col] = values.astype(target)
+                break
+            except (TypeError, ValueError):
+                continue
+    return df, dtypes
@@ -1,29 +1,77 @@
 import time
 import os
-import glob
+import shutil
+import tempfile
 import datetime
+import itertools
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
-import sqlite3
+import sys
+from week_calendar import weekname_series, month_series
+from excel_stream import iter_excel_chunks
+from download_watcher import DownloadWatcher
+from driver_log import log_msg
+from waits import wait_loading, wait_present, wait_clickable, wait_idle, switch_to_frame, accept_alert
+
+# 서버 폴더의 공용 모듈(기준 정보 캐시 등) 사용
+SERVER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server')
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from db_connection import DB_PATH, connect
+from master_cache import get_valid_series, get_site_mapping
+from db_indexes import SHIPMENT_KEY_COLUMNS, ensure_indexes
+from glop_actuals import ensure_actuals_table, record_scope, apply_deltas
+from model_filter import filter_by_series
 
 # 다운로드 디렉토리 설정
 DOWNLOAD_DIR = os.path.join(os.path.expanduser("~"), "Downloads")
 
-# Chrome WebDriver 경로 (driver 폴더 내의 chromedriver.exe 사용)
+# Chrome WebDriver 경로 (driver 폴더 내의 chromedriver.exe 사용, 없으면 Selenium Manager가 찾음)
 CHROME_DRIVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chromedriver.exe')
 
-def log_msg(message, log_queue=None):
-    """로그 메시지를 출력하거나 큐에 전송하는 함수"""
-    print(message)
-    if log_queue:
-        log_queue.put({'type': 'log', 'message': str(message)})
+# GLOP 접속 주소 (테스트 시 mock_glop.py 주소로 변경: GLOP_URL=http://127.0.0.1:8765/index.jsp)
+GLOP_URL = os.environ.get('GLOP_URL', 'https://glopp.lge.com/index.jsp')
+
+# 동시에 띄울 브라우저 세션 수 (1이면 기존처럼 한 세션에서 순차 처리, 2 이상이면 parallel_driver 사용)
+GLOP_SESSIONS = int(os.environ.get('GLOP_SESSIONS', 1))
+
+# 업체 목록 정의
+COMPANIES = {
+    'LGEKR': {
+        'monitor': ['AU OPTRONICS / Monitor', 'BOEVT / MONITOR', 'TCL MOKA / Monitor', 'TCL TTE / Monitor', 'TPV / MNT'],
+        'pc': ['PEGATRON / PC', 'QUANTA / PC', 'WANLIDA / PC']
+    },
+    'LGECH': {
+        'monitor': ['GAO CHUANG / Monitor', 'KTC / Commercial Display', 'MO JIA / Monitor'],
+        'pc': []  # 현재 LGECH에 PC 업체 없음
+    }
+}
+
+# 법인 전환 시 선택하는 첫 업체 (법인, 업체 표시명)
+CORPORATION_SUPPLIERS = {
+    'LGEKR': 'AU OPTRONICS (GMZ)',
+    'LGECH': 'GAO CHUANG (GMZ)',
+}
+
+# 클릭 후 로딩 마스크가 나타나기를 기다리는 최대 시간(초). 이 시간 안에 마스크가 보이지 않으면 로딩 없이 처리된 것으로 봄
+MASK_APPEAR = 0.5
+# 다운로드 클릭 후 네이티브 alert를 기다리는 시간(초)
+ALERT_TIMEOUT = 1
+
+# 메뉴 목록 정의 (NERP 및 GERP)
+MENUS = [
+    {'text': 'Shipping & Invoicing (NERP)', 'source': 'NERP', 'type': 'text'},
+    {'text': 'Shipping & Invoicing', 'source': 'GERP', 'type': 'href', 'keyword': 'SR00301'}
+]
+
+# 특수 Ship To 매핑 (TCL MOKA / Monitor, GERP): (원래 값, 변환 값)
+SHIP_TO_REPLACEMENT = ('ООО "РК Дистрибьюшен"', 'ERRA_MINSK_DO')
 
 def get_weekname(date):
     """
@@ -50,34 +98,226 @@ def get_month_from_date(date):
             return i
     return None
 
-def wait_for_new_file(download_dir, initial_files, timeout=60):
+def prepare_chunk(df, site_name, data_source, valid_series, site_mapping, stats, log_queue=None):
     """
-    새로운 파일이 다운로드 완료될 때까지 대기하는 함수
+    엑셀에서 읽은 chunk 하나에 대해 컬럼 정리, 모델 필터링, 날짜 변환, Site Mapping을 수행하는 함수.
+    여러 chunk에 걸친 알림 정보(제외 모델, 매핑 누락 Ship To 등)는 stats에 누적합니다.
     """
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        current_files = set(os.listdir(download_dir))
-        new_files = current_files - initial_files
+    # 'Unnamed:' 으로 시작하는 불필요한 컬럼 제거
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    
+    # 'From Site' 컬럼 추가
+    df['From Site'] = site_name
+    
+    # 'Data Source' 컬럼 추가 (NERP/GERP)
+    df['Data Source'] = data_source
+
+    # --- [추가] 특수 Ship To 매핑 (TCL MOKA / Monitor, GERP) ---
+    if site_name == 'TCL MOKA / Monitor' and data_source == 'GERP' and 'Ship To' in df.columns:
+        mask = df['Ship To'] == SHIP_TO_REPLACEMENT[0]
+        if mask.any():
+            df.loc[mask, 'Ship To'] = SHIP_TO_REPLACEMENT[1]
+            stats['ship_to_replaced'] += int(mask.sum())
+
+    # --- [추가] 모델 필터링 로직 (PC 업체는 스킵) ---
+    stats['rows_read'] += len(df)
+    if valid_series is not None:
+        try:
+            if 'Model' in df.columns:
+                stats['model_filtered'] = True
+                # 모델명에서 Series 추출 후 os_models와 비교 (예: 27GQ50F-B.AUS -> 27GQ50F)
+                keep_mask, excluded_models = filter_by_series(df['Model'], valid_series)
+                for m in excluded_models:
+                    stats['excluded_models'][m] = None
+
+                # 필터링 적용
+                df = df[keep_mask].copy()
+        except Exception as e:
+            log_msg(f"모델 필터링 중 오류 발생: {e}", log_queue)
+    stats['rows_kept'] += len(df)
+    
+    # --- [추가] 날짜 변환 및 데이터 보강 로직 ---
+    
+    # 1. RSD 기준 Week 컬럼 업데이트
+    if 'RSD' in df.columns:
+        df['RSD'] = pd.to_datetime(df['RSD'], errors='coerce')
+        df['Week'] = weekname_series(df['RSD'])
+    
+    # 2. Ship Date 기준 Week Name 및 Month 생성 (Month: yyyy-mm 형식)
+    if 'Ship Date' in df.columns:
+        df['Ship Date'] = pd.to_datetime(df['Ship Date'], errors='coerce')
+        df['Week Name'] = weekname_series(df['Ship Date'])
+        df['Month'] = month_series(df['Ship Date'])
+
+    # 3. Site Mapping (Region, Country) 추가 및 검증
+    if 'Ship To' in df.columns:
+        # 매핑되지 않는 Ship To 확인 (매핑 정보가 없어도 진행, NULL로 들어감)
+        excel_ship_tos = set(df['Ship To'].dropna().unique())
+        for ship_to in excel_ship_tos - site_mapping.keys():
+            stats['missing_ship_tos'][ship_to] = None
         
-        # .crdownload (크롬 임시 파일) 제외하고 실제 파일이 생겼는지 확인
-        finished_files = [f for f in new_files if not f.endswith('.crdownload') and (f.endswith('.xls') or f.endswith('.xlsx'))]
+        # Ship To -> (Region, Country) 해시 맵 조회 (Left Join과 동일)
+        mapped = df['Ship To'].map(site_mapping).astype(object)
+        df['Region'] = mapped.str[0]
+        df['Country'] = mapped.str[1]
+
+    return df
+
+def to_db_rows(df):
+    """DataFrame을 sqlite3 executemany에 넘길 수 있는 튜플 목록으로 변환 (날짜는 문자열, 결측값은 None)"""
+    out = df.copy()
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+    out = out.astype(object).where(out.notna(), None)
+    return list(out.itertuples(index=False, name=None))
+
+def quote_col(col):
+    return '"' + str(col).replace('"', '""') + '"'
+
+def _canonical_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def canonical_text(values):
+    """
+    Line Seq 키와 Row Hash에 쓰는 문자열. chunk의 dtype과 관계없이 같은 값은 같은 문자열이 되도록
+    정수 값의 float은 정수로('4500123.0' -> '4500123'), 날짜는 항상 '%Y-%m-%d %H:%M:%S'로,
+    결측값(None/NaN/NaT/NA)은 ''로 표현합니다.
+    """
+    missing = values.isna()
+    if pd.api.types.is_datetime64_any_dtype(values):
+        text = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif values.dtype == object or pd.api.types.is_float_dtype(values):
+        text = values.map(_canonical_value, na_action='ignore')
+    else:
+        text = values.astype(str)
+    return text.where(~missing, '').astype(object)
+
+def stage_chunk(cursor, df, seq_counts):
+    """
+    chunk 하나에 Line Seq / Row Hash 컬럼을 붙여 임시 테이블(temp.shipment_stage)에 적재하는 함수.
+    - Line Seq: 같은 (PO No., Model) 행이 파일 안에서 몇 번째로 등장했는지 (분할 선적 구분, chunk 간 누적)
+    - Row Hash: 키를 제외한 모든 데이터 컬럼의 지문. 기존 행과 비교해 변경 여부를 판단
+    둘 다 canonical_text 기준이므로 빈 셀 때문에 chunk의 dtype이 달라져도 같은 값은 같은 키/지문이 됩니다.
+    """
+    df = df.copy()
+    for col in SHIPMENT_KEY_COLUMNS[:-1]:
+        if col not in df.columns:
+            df[col] = None
+
+    key = canonical_text(df['PO No.']) + '\x1f' + canonical_text(df['Model'])
+    df['Line Seq'] = df.groupby(key, sort=False).cumcount() + key.map(seq_counts).fillna(0).astype(int)
+    for k, n in key.value_counts().items():
+        seq_counts[k] = seq_counts.get(k, 0) + n
+
+    data_cols = sorted(c for c in df.columns if c != 'Line Seq')
+    hashes = pd.util.hash_pandas_object(df[data_cols].apply(canonical_text), index=False)
+    df['Row Hash'] = hashes.to_numpy().view('int64')
+
+    cursor.execute("SELECT name FROM sqlite_temp_master WHERE type='table' AND name='shipment_stage'")
+    if not cursor.fetchone():
+        cursor.execute(f"CREATE TEMP TABLE shipment_stage ({', '.join(quote_col(c) for c in df.columns)})")
+        keys = ', '.join(quote_col(c) for c in SHIPMENT_KEY_COLUMNS)
+        cursor.execute(f"CREATE INDEX temp.ix_shipment_stage_key ON shipment_stage ({keys})")
+
+    columns = ', '.join(quote_col(c) for c in df.columns)
+    placeholders = ', '.join(['?'] * len(df.columns))
+    cursor.executemany(f"INSERT INTO temp.shipment_stage ({columns}) VALUES ({placeholders})", to_db_rows(df))
+    return df.head(0)
+
+def apply_staged(cursor, site_name, schema_df):
+    """
+    임시 테이블에 적재된 이번 파일의 데이터를 shipment_data에 반영하는 함수.
+    자연키(SHIPMENT_KEY_COLUMNS) 기준으로
+    - 새 행은 INSERT, Row Hash가 달라진 행만 UPDATE
+    - 해당 업체(From Site)의 이번 파일 PO 중 파일에서 사라진 행은 DELETE
+    하고, 각 건수를 dict로 돌려줍니다. 변경 없는 행은 다시 쓰지 않습니다.
+    GLOP Report용 주차별 실적 집계(shipment_actuals_weekly)도 같은 트랜잭션에서
+    이번 파일 범위(From Site + PO)의 반영 전/후 차이만큼 갱신합니다.
+    """
+    # 1. 테이블 존재 여부 확인 및 컬럼 동기화
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='shipment_data'")
+    if not cursor.fetchone():
+        cursor.execute(pd.io.sql.get_schema(schema_df, 'shipment_data', con=cursor.connection))
+    else:
+        # 기존 컬럼 확인
+        cursor.execute("PRAGMA table_info(shipment_data)")
+        existing_cols = [info[1] for info in cursor.fetchall()]
         
-        if finished_files:
-            # 파일이 완전히 써질 때까지 아주 잠깐 대기
-            time.sleep(1)
-            return os.path.join(download_dir, finished_files[0])
-            
-        time.sleep(1)
-    return None
+        # 새 컬럼이 있으면 추가 (Schema Evolution)
+        for col in schema_df.columns:
+            if col not in existing_cols:
+                try:
+                    cursor.execute(f"ALTER TABLE shipment_data ADD COLUMN {quote_col(col)} TEXT")
+                    print(f"새 컬럼 추가됨: {col}")
+                except Exception as e:
+                    print(f"컬럼 추가 중 오류 (무시 가능): {e}")
+
+    # 자연키 유니크 인덱스 및 조회용 인덱스 생성 (새 컬럼이 추가된 경우 포함)
+    ensure_indexes(cursor.connection, 'shipment_data')
+
+    # 주차별 실적 집계: 반영 전 범위의 집계를 빼 둠 (테이블이 없으면 전체 데이터로 한 번 생성)
+    ensure_actuals_table(cursor)
+    record_scope(cursor, site_name, -1)
+
+    match = ' AND '.join(f"d.{quote_col(c)} IS s.{quote_col(c)}" for c in SHIPMENT_KEY_COLUMNS)
+    columns = [c for c in schema_df.columns]
+    column_list = ', '.join(quote_col(c) for c in columns)
+
+    # 2. 파일에서 사라진 행 삭제 (해당 업체이면서 이번 엑셀에 포함된 PO 범위 안에서만)
+    cursor.execute(f"""
+        DELETE FROM shipment_data AS d
+        WHERE d."From Site" = ?
+          AND d."PO No." IN (SELECT "PO No." FROM temp.shipment_stage)
+          AND NOT EXISTS (SELECT 1 FROM temp.shipment_stage AS s WHERE {match})
+    """, [site_name])
+    deleted = cursor.rowcount
+
+    # 3. 내용이 바뀐 행만 갱신
+    assignments = ', '.join(f"{quote_col(c)} = s.{quote_col(c)}" for c in columns if c not in SHIPMENT_KEY_COLUMNS)
+    cursor.execute(f"""
+        UPDATE shipment_data AS d SET {assignments}
+        FROM temp.shipment_stage AS s
+        WHERE {match} AND d."Row Hash" IS NOT s."Row Hash"
+    """)
+    updated = cursor.rowcount
+
+    # 4. 새 행 삽입
+    cursor.execute(f"""
+        INSERT INTO shipment_data ({column_list})
+        SELECT {column_list} FROM temp.shipment_stage AS s
+        WHERE NOT EXISTS (SELECT 1 FROM shipment_data AS d WHERE {match})
+    """)
+    inserted = cursor.rowcount
+
+    # 5. 반영 후 범위의 집계를 더해 주차별 실적 집계에 차이만 반영
+    record_scope(cursor, site_name, 1)
+    apply_deltas(cursor)
+
+    cursor.execute("SELECT COUNT(*) FROM temp.shipment_stage")
+    staged = cursor.fetchone()[0]
+    cursor.execute("DROP TABLE temp.shipment_stage")
+
+    return {
+        'inserted': inserted,
+        'updated': updated,
+        'deleted': deleted,
+        'unchanged': staged - inserted - updated,
+    }
 
 def save_to_db(file_path, site_name, data_source, skip_model_filter=False, log_queue=None):
     """
     다운로드된 엑셀 파일을 읽어 DB(SQLite)에 저장하는 함수.
-    엑셀에 포함된 PO 번호들에 대해서만 기존 데이터를 삭제하고 새로 입력하여
-    분할 선적을 처리하고 과거 데이터(3개월 이전)를 보존합니다.
+    엑셀에 포함된 PO 번호들에 대해서만 기존 데이터와 비교하여 신규/변경/삭제된 행만 반영하므로
+    분할 선적을 처리하고 과거 데이터(3개월 이전)를 보존하면서 변경 없는 행은 다시 쓰지 않습니다.
+    파일은 chunk 단위로 읽고 처리하므로 파일 크기와 관계없이 메모리 사용량이 일정하며,
+    전체 파일이 하나의 트랜잭션으로 반영됩니다.
+    반환값: {'inserted', 'updated', 'deleted', 'unchanged'} 건수 dict (실패 시 None)
     """
-    # 루트 폴더의 통합 DB (mnt_data.db) 사용
-    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mnt_data.db")
+    # 루트 폴더의 통합 DB (mnt_data.db) 사용 - 서버와 같은 연결 설정(WAL, busy_timeout 등) 적용
+    db_path = DB_PATH
     try:
         if not file_path or not os.path.exists(file_path):
             log_msg(f"파일을 찾을 수 없습니다: {file_path}", log_queue)
@@ -85,360 +325,323 @@ def save_to_db(file_path, site_name, data_source, skip_model_filter=False, log_q
 
         log_msg(f"DB 저장 중: {os.path.basename(file_path)} (Site: {site_name})", log_queue)
         
-        df = None
-        # 1. 엑셀 읽기 (HTML 형식 포함 처리)
+        # 1. 엑셀 읽기 (HTML 형식 포함 처리) - 첫 chunk를 읽어 파일 형식 오류를 미리 확인
         try:
-            if file_path.lower().endswith('.xls'):
-                try:
-                    df = pd.read_excel(file_path, engine='xlrd')
-                except:
-                    tables = pd.read_html(file_path)
-                    if tables:
-                        df = tables[0]
-            else:
-                df = pd.read_excel(file_path)
+            chunks = iter_excel_chunks(file_path)
+            first_chunk = next(chunks, None)
         except Exception as e:
             log_msg(f"엑셀 읽기 실패: {e}", log_queue)
             return
 
-        if df is not None:
-            # 'Unnamed:' 으로 시작하는 불필요한 컬럼 제거
-            df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-            
-            # 'From Site' 컬럼 추가
-            df['From Site'] = site_name
-            
-            # 'Data Source' 컬럼 추가 (NERP/GERP)
-            df['Data Source'] = data_source
-
-            # --- [추가] 특수 Ship To 매핑 (TCL MOKA / Monitor, GERP) ---
-            if site_name == 'TCL MOKA / Monitor' and data_source == 'GERP' and 'Ship To' in df.columns:
-                original_value = 'ООО "РК Дистрибьюшен"'
-                replacement_value = 'ERRA_MINSK_DO'
-                mask = df['Ship To'] == original_value
-                if mask.any():
-                    df.loc[mask, 'Ship To'] = replacement_value
-                    log_msg(f"[알림] Ship To '{original_value}' → '{replacement_value}' 로 {mask.sum()}건 변환 완료", log_queue)
-
-            # --- [추가] 모델 필터링 로직 (PC 업체는 스킵) ---
+        if first_chunk is None:
+            return
+
+        conn = connect(db_path)
+        try:
+            # 기준 정보는 프로세스 공용 캐시에서 조회 (Master Data 수정 시에만 DB에서 다시 읽음)
+            valid_series = None
             if not skip_model_filter:
                 try:
-                    # DB에서 os_models 조회
-                    with sqlite3.connect(db_path) as tmp_conn:
-                        os_models_df = pd.read_sql("SELECT Series FROM os_models", tmp_conn)
-                    
-                    valid_series = set(os_models_df['Series'].dropna().unique())
-
-                    if 'Model' in df.columns:
-                        # 모델명에서 Series 추출 (예: 27GQ50F-B.AUS -> 27GQ50F)
-                        # 사용자 요청 로직: x.split('-')[0].split('.')[0]
-                        temp_series = df['Model'].astype(str).apply(lambda x: x.split('-')[0].split('.')[0])
-
-                        # 제외될 모델 식별
-                        excluded_mask = ~temp_series.isin(valid_series)
-                        excluded_models = df.loc[excluded_mask, 'Model'].apply(lambda x: x.split('-')[0].split('.')[0]).unique()
-
-                        if len(excluded_models) > 0:
-                            log_msg(f"\n[알림] 다음 {len(excluded_models)}개 모델은 os_models에 없어 제외되었습니다:", log_queue)
-                            for m in excluded_models:
-                                log_msg(f"- {m}", log_queue)
-
-                        # 필터링 적용
-                        original_count = len(df)
-                        df = df[~excluded_mask].copy()
-                        log_msg(f"모델 필터링 완료: {original_count} -> {len(df)} 행", log_queue)
-
+                    valid_series = get_valid_series(db_path)
                 except Exception as e:
                     log_msg(f"모델 필터링 중 오류 발생: {e}", log_queue)
-            else:
-                log_msg(f"[알림] PC 업체 - 모델 필터링 스킵 ({len(df)} 행)", log_queue)
-            
-            # --- [추가] 날짜 변환 및 데이터 보강 로직 ---
+            site_mapping = get_site_mapping(db_path)
+
+            stats = {
+                'rows_read': 0,
+                'rows_kept': 0,
+                'model_filtered': False,
+                'ship_to_replaced': 0,
+                'excluded_models': {},
+                'missing_ship_tos': {},
+            }
+            seq_counts = {}
+            schema_df = None
+            cursor = conn.cursor()
+            cursor.execute("DROP TABLE IF EXISTS temp.shipment_stage")
+
+            for df in itertools.chain([first_chunk], chunks):
+                df = prepare_chunk(df, site_name, data_source, valid_series, site_mapping, stats, log_queue)
+                if not df.empty:
+                    staged = stage_chunk(cursor, df, seq_counts)
+                    if schema_df is None:
+                        schema_df = staged
+
+            if stats['ship_to_replaced']:
+                log_msg(f"[알림] Ship To '{SHIP_TO_REPLACEMENT[0]}' → '{SHIP_TO_REPLACEMENT[1]}' 로 {stats['ship_to_replaced']}건 변환 완료", log_queue)
+
+            if skip_model_filter:
+                log_msg(f"[알림] PC 업체 - 모델 필터링 스킵 ({stats['rows_read']} 행)", log_queue)
+            elif stats['model_filtered']:
+                excluded_models = list(stats['excluded_models'])
+                if len(excluded_models) > 0:
+                    log_msg(f"\n[알림] 다음 {len(excluded_models)}개 모델은 os_models에 없어 제외되었습니다:", log_queue)
+                    for m in excluded_models:
+                        log_msg(f"- {m}", log_queue)
+                log_msg(f"모델 필터링 완료: {stats['rows_read']} -> {stats['rows_kept']} 행", log_queue)
+
+            if stats['missing_ship_tos']:
+                print(f"\n[알림] 다음 Ship To에 대한 Region/Country 정보가 site_mapping 테이블에 없습니다 (NULL로 저장됨):")
+                for ship_to in stats['missing_ship_tos']:
+                    print(f"- {ship_to}")
+
+            counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+            if schema_df is not None:
+                counts = apply_staged(cursor, site_name, schema_df)
+
+            conn.commit()
+            log_msg(f"DB 저장 완료 [{site_name}]: 신규 {counts['inserted']}, 변경 {counts['updated']}, "
+                    f"삭제 {counts['deleted']}, 동일 {counts['unchanged']} 행", log_queue)
             
-            # 1. RSD 기준 Week 컬럼 업데이트
-            if 'RSD' in df.columns:
-                df['RSD'] = pd.to_datetime(df['RSD'], errors='coerce')
-                df['Week'] = df['RSD'].apply(get_weekname)
-            
-            # 2. Ship Date 기준 Week Name 및 Month 생성
-            if 'Ship Date' in df.columns:
-                df['Ship Date'] = pd.to_datetime(df['Ship Date'], errors='coerce')
-                df['Week Name'] = df['Ship Date'].apply(get_weekname)
-                
-                # Month 생성 (yyyy-mm 형식)
-                def calculate_month(week_name):
-                    if not week_name: return None
-                    try:
-                        dt = datetime.date.fromisoformat(week_name[:10])
-                        iso_year = dt.isocalendar().year
-                        month = get_month_from_date(dt)
-                        return f"{iso_year}-{month:02d}"
-                    except:
-                        return None
-                
-                df['Month'] = df['Week Name'].apply(calculate_month)
-
-            # 3. Site Mapping (Region, Country) 추가 및 검증
-            conn = sqlite3.connect(db_path)
+            # 4. 임시 파일 삭제
             try:
-                mapping_df = pd.read_sql("SELECT * FROM site_mapping", conn)
-                
-                if 'Ship To' in df.columns:
-                    # 매핑되지 않는 Ship To 확인
-                    excel_ship_tos = set(df['Ship To'].dropna().unique())
-                    mapped_tos = set(mapping_df['to_site'].unique())
-                    missing_tos = excel_ship_tos - mapped_tos
-                    
-                    if missing_tos:
-                        print(f"\n[알림] 다음 Ship To에 대한 Region/Country 정보가 site_mapping 테이블에 없습니다 (NULL로 저장됨):")
-                        for ship_to in missing_tos:
-                            print(f"- {ship_to}")
-                        # return 제거: 매핑 정보가 없어도 진행 (Left Join으로 인해 NULL로 들어감)
-                    
-                    # Join 수행
-                    df = df.merge(mapping_df[['to_site', 'region', 'country']], 
-                                 left_on='Ship To', right_on='to_site', how='left')
-                    
-                    # 컬럼명 정리 (필요시)
-                    df = df.rename(columns={'region': 'Region', 'country': 'Country'})
-                    if 'to_site' in df.columns:
-                        df = df.drop(columns=['to_site'])
-
-                # --- [기존 로직 계속] ---
-                
-                cursor = conn.cursor()
-                # 2. 테이블 존재 여부 확인 및 컬럼 동기화
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='shipment_data'")
-                table_exists = cursor.fetchone()
-                
-                if table_exists:
-                    # 기존 컬럼 확인
-                    cursor.execute("PRAGMA table_info(shipment_data)")
-                    existing_cols = [info[1] for info in cursor.fetchall()]
-                    
-                    # 새 컬럼이 있으면 추가 (Schema Evolution)
-                    for col in df.columns:
-                        if col not in existing_cols:
-                            try:
-                                cursor.execute(f"ALTER TABLE shipment_data ADD COLUMN `{col}` TEXT")
-                                print(f"새 컬럼 추가됨: {col}")
-                            except Exception as e:
-                                print(f"컬럼 추가 중 오류 (무시 가능): {e}")
-
-                    # 3. 이번 엑셀에 포함된 PO 번호 리스트 추출
-                    if 'PO No.' in df.columns:
-                        po_list = df['PO No.'].dropna().unique().tolist()
-                        
-                        if po_list:
-                            # 해당 업체(From Site)이면서 이번 엑셀에 포함된 PO들만 삭제
-                            placeholders = ', '.join(['?'] * len(po_list))
-                            query = f"DELETE FROM shipment_data WHERE `From Site` = ? AND `PO No.` IN ({placeholders})"
-                            cursor.execute(query, [site_name] + po_list)
-                            print(f"기존 [{site_name}]의 {len(po_list)}개 PO 관련 데이터 삭제 완료 (Selective Refresh)")
-                
-                # 4. 새로운 데이터 삽입
-                df.to_sql('shipment_data', conn, if_exists='append', index=False)
-                conn.commit()
-                print(f"DB 저장 완료: {len(df)} 행 삽입됨")
-                
-                # 5. 임시 파일 삭제
-                try:
-                    os.remove(file_path)
-                    print(f"임시 파일 삭제 완료: {file_path}")
-                except:
-                    pass
-            finally:
-                conn.close()
+                os.remove(file_path)
+                print(f"임시 파일 삭제 완료: {file_path}")
+            except:
+                pass
+            return counts
+        finally:
+            conn.close()
                 
     except Exception as e:
         log_msg(f"DB 저장 중 오류 발생: {e}", log_queue)
 
-def download_excel_for_companies(driver, target_companies, skip_model_filter=False, log_queue=None):
+def create_driver(download_dir=DOWNLOAD_DIR, headless=False):
     """
-    지정된 업체 목록에 대해 업체 선택, 메뉴 이동 및 엑셀 다운로드를 수행하는 함수
+    Chrome 세션을 생성하는 함수. download_dir로 다운로드 폴더를 지정하므로
+    병렬 세션마다 서로 다른 폴더를 사용할 수 있습니다.
     """
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_experimental_option('prefs', {
+        'download.default_directory': download_dir,
+        'download.prompt_for_download': False,
+    })
+
+    service = Service(CHROME_DRIVER_PATH) if os.path.exists(CHROME_DRIVER_PATH) else Service()
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    if headless:
+        # headless 모드에서는 다운로드 허용을 명시적으로 지정
+        driver.execute_cdp_cmd('Page.setDownloadBehavior', {'behavior': 'allow', 'downloadPath': download_dir})
+    else:
+        driver.maximize_window()
+    return driver
+
+def login(driver, log_queue=None):
+    """GLOP 접속 및 로그인 후 첫 화면 로딩(L-gen4)까지 대기하는 함수"""
+    driver.get(GLOP_URL)
+
+    id_input = wait_present(driver, (By.ID, 'userId'), 20, '로그인 화면 표시', log_queue)
+    pw_input = driver.find_element(By.ID, 'userPwd')
+    id_input.send_keys('paul76.lee')
+    pw_input.send_keys('paul243756')
+
+    login_img = driver.find_element(By.XPATH, "//img[contains(@src, 'login_btn.png')]")
+    try:
+        login_img.click()
+    except Exception:
+        parent_form = login_img.find_element(By.XPATH, './ancestor::form')
+        submit_btn = parent_form.find_element(By.XPATH, ".//input[@type='submit' or @type='image']")
+        submit_btn.click()
+    log_msg('로그인 시도 완료', log_queue)
 
-    for company_name in target_companies:
-        log_msg(f"\n--- [{company_name}] 처리 시작 ---", log_queue)
-        
-        # 커스텀 드롭다운 UI에서 업체 선택
+    wait_loading(driver, 'L-gen4', 20, '로딩 완료, 메뉴 선택 가능', log_queue)
+
+def switch_corporation(driver, corporation, hide_corporation=None, log_queue=None):
+    """
+    OPEN 탭의 법인 지도(iframe)에서 법인을 전환하고 해당 법인의 첫 업체를 선택하는 함수.
+    hide_corporation이 있으면 먼저 그 법인의 그리드를 숨깁니다.
+    """
+    open_tab = wait_clickable(driver, (By.XPATH, "//div[@id='quickMenu']//img"), 10, "'OPEN' 탭 표시", log_queue)
+    open_tab.click()
+    log_msg("'OPEN' 탭 클릭 완료", log_queue)
+
+    # 법인 지도 iframe 전환 (iframe 문서 로딩 완료까지 대기)
+    switch_to_frame(driver, "goGlobalMap.glop", 15, "iframe 전환 성공", log_queue)
+
+    # 기존 법인 클릭 (그리드 숨기기)
+    if hide_corporation:
         try:
-            trigger_elem = driver.find_element(By.XPATH, "//select[@id='gnbUserCompany']/preceding-sibling::*[1] | //select[@id='gnblserCompany']/following-sibling::*[1]")
-            trigger_elem.click()
-            time.sleep(1)
-            
-            # 업체명으로 요소 찾기
-            company_xpath = f"//div[@id='gnbUserCompany_DIALOG']//span[text()='{company_name}']"
-            company_elem = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, company_xpath))
-            )
-            company_elem.click()
-            log_msg(f'업체 선택 완료: {company_name}', log_queue)
-            
-            # 업체 선택 후에도 spin 요소가 사라질 때까지 대기
-            try:
-                WebDriverWait(driver, 20).until(
-                    lambda d: "L-hide-display" in d.find_element(By.ID, "L-gen4").get_attribute("class")
-                )
-                log_msg('업체 선택 후 로딩 완료', log_queue)
-            except Exception as e:
-                log_msg(f'업체 선택 후 로딩 대기 중 오류: {e}', log_queue)
+            hide_span = wait_present(driver, (By.ID, hide_corporation), 15, f"'{hide_corporation}' 표시", log_queue)
+            driver.execute_script("arguments[0].click();", hide_span.find_element(By.TAG_NAME, "a"))
+            log_msg(f"'{hide_corporation}' 그리드 숨기기 완료", log_queue)
+            wait_idle(driver, 10, f"'{hide_corporation}' 그리드 갱신 완료", log_queue)
+        except Exception:
+            pass
+
+    # 법인 클릭
+    corporation_span = wait_present(driver, (By.ID, corporation), 15, f"'{corporation}' 표시", log_queue)
+    driver.execute_script("arguments[0].click();", corporation_span.find_element(By.TAG_NAME, "a"))
+    log_msg(f"'{corporation}' 선택 완료", log_queue)
+
+    # 법인의 첫 업체 선택 (업체 목록이 표시될 때까지 대기)
+    supplier_label = CORPORATION_SUPPLIERS[corporation]
+    supplier_element = wait_present(
+        driver, (By.XPATH, f"//span[contains(text(), '{supplier_label}')]"), 20, f"'{supplier_label}' 표시", log_queue
+    )
+    driver.execute_script("arguments[0].click();", supplier_element)
+    log_msg(f"'{supplier_label}' 업체 선택 완료", log_queue)
+    wait_idle(driver, 20, "업체 선택 요청 완료", log_queue)
+
+    driver.switch_to.default_content()
+    ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+    log_msg("모달 닫기 완료", log_queue)
+
+    # 법인 전환 후 로딩 대기
+    wait_loading(driver, 'L-gen4', 20, "법인 전환 후 로딩 완료", log_queue, appear=MASK_APPEAR)
+
+def select_company(driver, company_name, log_queue=None):
+    """커스텀 드롭다운 UI에서 업체를 선택하는 함수. 성공 여부를 돌려줍니다."""
+    try:
+        trigger_elem = driver.find_element(By.XPATH, "//select[@id='gnbUserCompany']/preceding-sibling::*[1] | //select[@id='gnblserCompany']/following-sibling::*[1]")
+        trigger_elem.click()
+
+        # 업체명으로 요소 찾기 (드롭다운이 열릴 때까지 대기)
+        company_xpath = f"//div[@id='gnbUserCompany_DIALOG']//span[text()='{company_name}']"
+        company_elem = wait_clickable(driver, (By.XPATH, company_xpath), 10, '업체 목록 표시', log_queue)
+        company_elem.click()
+        log_msg(f'업체 선택 완료: {company_name}', log_queue)
+
+        # 업체 선택 후에도 spin 요소가 사라질 때까지 대기
+        try:
+            wait_loading(driver, 'L-gen4', 20, '업체 선택 후 로딩 완료', log_queue, appear=MASK_APPEAR)
         except Exception as e:
-            log_msg(f'업체 선택 중 오류 ({company_name}): {e}', log_queue)
-            continue # 다음 업체로 진행
+            log_msg(f'업체 선택 후 로딩 대기 중 오류: {e}', log_queue)
+        return True
+    except Exception as e:
+        log_msg(f'업체 선택 중 오류 ({company_name}): {e}', log_queue)
+        return False
 
-        # 메뉴 목록 정의 (NERP 및 GERP)
-        menus = [
-            {'text': 'Shipping & Invoicing (NERP)', 'source': 'NERP', 'type': 'text'},
-            {'text': 'Shipping & Invoicing', 'source': 'GERP', 'type': 'href', 'keyword': 'SR00301'}
-        ]
+def download_menu(driver, menu, download_dir=DOWNLOAD_DIR, log_queue=None):
+    """
+    현재 선택된 업체에 대해 메뉴(NERP/GERP)로 이동해 엑셀을 다운로드하는 함수.
+    download_dir에 새로 생긴 파일 경로를 돌려줍니다 (실패 시 None).
+    """
+    menu_text = menu['text']
+    log_msg(f"  >> 메뉴 처리 시작: {menu_text} (Source: {menu['source']})", log_queue)
 
-        for menu in menus:
-            menu_text = menu['text']
-            source_name = menu['source']
-            log_msg(f"  >> 메뉴 처리 시작: {menu_text} (Source: {source_name})", log_queue)
+    # Shipping & Invoicing 상단 메뉴에 마우스 오버 및 하위 메뉴 클릭
+    try:
+        menu_li = wait_present(driver, (By.ID, "mNavi_2"), 10, '상단 Shipping & Invoicing 메뉴 표시', log_queue)
+        ActionChains(driver).move_to_element(menu_li).perform()
+        log_msg('상단 Shipping & Invoicing 메뉴에 마우스 오버 완료', log_queue)
+
+        # 메뉴 찾기 (Text 또는 Href)
+        if menu['type'] == 'href':
+            # GERP: href 속성에 'SR00301'이 포함된 요소 찾기
+            xpath = f"//a[contains(@href, '{menu['keyword']}')]"
+        else:
+            # NERP: 텍스트 정확히 일치하는 메뉴 찾기
+            xpath = f"//a[normalize-space(text())='{menu_text}']"
+
+        # 하위 메뉴가 펼쳐져 클릭 가능해질 때까지 대기
+        submenu = wait_clickable(driver, (By.XPATH, xpath), 10, f'하위 {menu_text} 메뉴 표시', log_queue)
+        submenu.click()
+        log_msg(f'하위 {menu_text} 메뉴 클릭 완료', log_queue)
+
+        # 하위 메뉴 클릭 후 spin 요소가 사라질 때까지 대기
+        try:
+            # L-gen7 (로딩 패널)이 숨겨질 때까지 대기 (class에 L-hide-display 포함 여부 확인)
+            wait_loading(driver, 'L-gen7', 30, '하위 메뉴 이동 후 로딩 완료 (L-gen7 확인)', log_queue, appear=MASK_APPEAR)
 
-            # Shipping & Invoicing 상단 메뉴에 마우스 오버 및 하위 메뉴 클릭
+            # spin 사라진 후 엑셀 다운로드 버튼 클릭
             try:
-                menu_li = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.ID, "mNavi_2"))
-                )
-                ActionChains(driver).move_to_element(menu_li).perform()
-                log_msg('상단 Shipping & Invoicing 메뉴에 마우스 오버 완료', log_queue)
-                time.sleep(1)
-                
-                # 메뉴 찾기 (Text 또는 Href)
-                if menu['type'] == 'href':
-                    # GERP: href 속성에 'SR00301'이 포함된 요소 찾기
-                    xpath = f"//a[contains(@href, '{menu['keyword']}')]"
-                else:
-                    # NERP: 텍스트 정확히 일치하는 메뉴 찾기
-                    xpath = f"//a[normalize-space(text())='{menu_text}']"
-
-                submenu = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, xpath))
-                )
-                submenu.click()
-                log_msg(f'하위 {menu_text} 메뉴 클릭 완료', log_queue)
-                
-                # 하위 메뉴 클릭 후 spin 요소가 사라질 때까지 대기
+                excel_btn = wait_clickable(driver, (By.ID, "informationExcelDownloadIod"), 10, '엑셀 다운로드 버튼 표시', log_queue)
+
+                # 팝업(alert/confirm)을 무시하고 자동으로 수락하도록 JS 주입
+                driver.execute_script("window.confirm = function(msg){ return true; };")
+                driver.execute_script("window.alert = function(msg){ return true; };")
+                # print("JS Alert/Confirm Override 적용 완료")
+
+                # 다운로드 클릭 전 감시 시작 (이후 download_dir에 생긴 파일만 대상)
+                watcher = DownloadWatcher(download_dir)
                 try:
-                    # L-gen7 (로딩 패널)이 숨겨질 때까지 대기 (class에 L-hide-display 포함 여부 확인)
-                    WebDriverWait(driver, 30).until(
-                        lambda d: "L-hide-display" in d.find_element(By.ID, "L-gen7").get_attribute("class")
-                    )
-                    log_msg('하위 메뉴 이동 후 로딩 완료 (L-gen7 확인)', log_queue)
-                    
-                    # spin 사라진 후 엑셀 다운로드 버튼 클릭
+                    # [수정] L-gen7 (로딩 패널)이 숨겨질 때까지 대기 (class에 L-hide-display 포함 여부 확인)
                     try:
-                        excel_btn = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.ID, "informationExcelDownloadIod"))
-                        )
-                        
-                        # 팝업(alert/confirm)을 무시하고 자동으로 수락하도록 JS 주입
-                        driver.execute_script("window.confirm = function(msg){ return true; };")
-                        driver.execute_script("window.alert = function(msg){ return true; };")
-                        # print("JS Alert/Confirm Override 적용 완료")
-
-                        # 다운로드 클릭 전 파일 목록 캡처
-                        initial_files = set(os.listdir(DOWNLOAD_DIR))
-
-                        # [수정] L-gen7 (로딩 패널)이 숨겨질 때까지 대기 (class에 L-hide-display 포함 여부 확인)
-                        try:
-                            WebDriverWait(driver, 20).until(
-                                lambda d: "L-hide-display" in d.find_element(By.ID, "L-gen7").get_attribute("class")
-                            )
-                            log_msg('로딩 마스크(L-gen7) 해제 확인 완료', log_queue)
-                        except Exception as e:
-                            log_msg(f'로딩 대기 중 타임아웃 또는 오류: {e}', log_queue)
-                            pass
-
-                        excel_btn.click()
-                        log_msg('엑셀 다운로드 버튼 클릭 완료', log_queue)
-
-                        # Native Alert 시도 (안전장치)
-                        try:
-                            WebDriverWait(driver, 3).until(EC.alert_is_present())
-                            alert = driver.switch_to.alert
-                            alert.accept()
-                            log_msg('Native Alert 수락 완료', log_queue)
-                        except:
-                            pass
-                        
-                        # 파일 다운로드 대기 및 업데이트
-                        log_msg(f"파일 다운로드 대기 중 (Max 60s)...", log_queue)
-                        new_file = wait_for_new_file(DOWNLOAD_DIR, initial_files)
-                        if new_file:
-                            log_msg(f"새 파일 감지됨: {new_file}", log_queue)
-                            save_to_db(new_file, company_name, source_name, skip_model_filter, log_queue)
-                        else:
-                            log_msg("다운로드된 새 파일을 찾지 못했습니다.", log_queue)
-                            
+                        wait_loading(driver, 'L-gen7', 20, '로딩 마스크(L-gen7) 해제 확인 완료', log_queue)
                     except Exception as e:
-                        log_msg(f'엑셀 다운로드 버튼 클릭 중 오류: {e}', log_queue)
+                        log_msg(f'로딩 대기 중 타임아웃 또는 오류: {e}', log_queue)
+                        pass
+
+                    excel_btn.click()
+                    log_msg('엑셀 다운로드 버튼 클릭 완료', log_queue)
+
+                    # Native Alert 시도 (안전장치, JS Override로 보통은 뜨지 않음)
+                    try:
+                        accept_alert(driver, ALERT_TIMEOUT, log_queue)
+                    except Exception:
+                        pass
+
+                    # 파일 쓰기가 끝날 때까지 대기 (inotify 또는 크기 변화 확인)
+                    log_msg(f"파일 다운로드 대기 중 (Max 60s)...", log_queue)
+                    started = time.perf_counter()
+                    new_file = watcher.wait_for_file(timeout=60)
+                finally:
+                    watcher.close()
+
+                if new_file:
+                    log_msg(f"새 파일 감지됨: {new_file} ({time.perf_counter() - started:.2f}s)", log_queue)
+                else:
+                    log_msg("다운로드된 새 파일을 찾지 못했습니다.", log_queue)
+                return new_file
 
-                except Exception as e:
-                    log_msg(f'하위 메뉴 이동 후 로딩 대기 중 오류: {e}', log_queue)
             except Exception as e:
-                log_msg(f'메뉴 자동화 중 오류 ({menu_text}): {e}', log_queue)
-            
-            time.sleep(1) # 메뉴 간 잠시 대기
-        
-        log_msg(f"--- [{company_name}] 처리 완료 ---\n", log_queue)
-        time.sleep(2)
+                log_msg(f'엑셀 다운로드 버튼 클릭 중 오류: {e}', log_queue)
 
-def main(product_category=None, supplier_category=None, log_queue=None):
+        except Exception as e:
+            log_msg(f'하위 메뉴 이동 후 로딩 대기 중 오류: {e}', log_queue)
+    except Exception as e:
+        log_msg(f'메뉴 자동화 중 오류 ({menu_text}): {e}', log_queue)
+    return None
+
+def download_excel_for_companies(driver, target_companies, skip_model_filter=False, log_queue=None, download_dir=DOWNLOAD_DIR):
+    """
+    지정된 업체 목록에 대해 업체 선택, 메뉴 이동 및 엑셀 다운로드를 수행하는 함수
+    """
+
+    for company_name in target_companies:
+        log_msg(f"\n--- [{company_name}] 처리 시작 ---", log_queue)
+        started = time.perf_counter()
+
+        if not select_company(driver, company_name, log_queue):
+            continue # 다음 업체로 진행
+
+        for menu in MENUS:
+            new_file = download_menu(driver, menu, download_dir, log_queue)
+            if new_file:
+                save_to_db(new_file, company_name, menu['source'], skip_model_filter, log_queue)
+
+        log_msg(f"--- [{company_name}] 처리 완료 ({time.perf_counter() - started:.1f}s) ---\n", log_queue)
+
+def main(product_category=None, supplier_category=None, log_queue=None, sessions=None):
     # ========== 사용자 설정 영역 ==========
     if product_category is None:
         product_category = 'pc'  # 'monitor' 또는 'pc'
     if supplier_category is None:
         supplier_category = 'LGEKR'   # 'LGEKR' 또는 'LGECH'
+    if sessions is None:
+        sessions = GLOP_SESSIONS
     # =====================================
 
-    # 업체 목록 정의
-    COMPANIES = {
-        'LGEKR': {
-            'monitor': ['AU OPTRONICS / Monitor', 'BOEVT / MONITOR', 'TCL MOKA / Monitor', 'TCL TTE / Monitor', 'TPV / MNT'],
-            'pc': ['PEGATRON / PC', 'QUANTA / PC', 'WANLIDA / PC']
-        },
-        'LGECH': {
-            'monitor': ['GAO CHUANG / Monitor', 'KTC / Commercial Display', 'MO JIA / Monitor'],
-            'pc': []  # 현재 LGECH에 PC 업체 없음
-        }
-    }
+    started = time.perf_counter()
 
-    chrome_options = Options()
-    # chrome_options.add_argument('--headless')
-    
-    service = Service(CHROME_DRIVER_PATH)
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    driver.maximize_window()
+    # 여러 세션으로 업체 x 메뉴를 나누어 다운로드 (DB 저장은 한 곳에서 순차 처리)
+    if sessions > 1:
+        from parallel_driver import run_parallel
+        run_parallel(product_category, supplier_category, sessions=sessions, log_queue=log_queue)
+        log_msg(f"\n전체 소요 시간: {time.perf_counter() - started:.1f}s", log_queue)
+        return
 
-    try:
-        # 사이트 접속
-        driver.get('https://glopp.lge.com/index.jsp')
-        time.sleep(1)
+    # 이번 실행 전용 다운로드 폴더 (다른 파일과 섞이지 않도록)
+    download_dir = tempfile.mkdtemp(prefix='glop_run_')
+    driver = None
 
-        # 로그인
+    try:
+        driver = create_driver(download_dir=download_dir)
         try:
-            id_input = driver.find_element(By.ID, 'userId')
-            pw_input = driver.find_element(By.ID, 'userPwd')
-            id_input.send_keys('paul76.lee')
-            pw_input.send_keys('paul243756')
-            
-            login_img = driver.find_element(By.XPATH, "//img[contains(@src, 'login_btn.png')]")
-            try:
-                login_img.click()
-            except Exception:
-                parent_form = login_img.find_element(By.XPATH, './ancestor::form')
-                submit_btn = parent_form.find_element(By.XPATH, ".//input[@type='submit' or @type='image']")
-                submit_btn.click()
-            log_msg('로그인 시도 완료', log_queue)
-            
-            WebDriverWait(driver, 20).until(
-                lambda d: "L-hide-display" in d.find_element(By.ID, "L-gen4").get_attribute("class")
-            )
-            log_msg('로딩 완료, 메뉴 선택 가능', log_queue)
+            login(driver, log_queue)
             log_msg(f"\n[설정] Product: {product_category}, Supplier: {supplier_category}", log_queue)
 
             # LGEKR 업체 처리 (LGEKR 선택 시)
@@ -446,7 +649,7 @@ def main(product_category=None, supplier_category=None, log_queue=None):
                 target_companies_kr = COMPANIES['LGEKR'].get(product_category, [])
                 if target_companies_kr:
                     log_msg(f"\n>>> LGEKR 관할 {product_category.upper()} 업체 처리 시작 <<<", log_queue)
-                    download_excel_for_companies(driver, target_companies_kr, skip_model_filter=(product_category == 'pc'), log_queue=log_queue)
+                    download_excel_for_companies(driver, target_companies_kr, skip_model_filter=(product_category == 'pc'), log_queue=log_queue, download_dir=download_dir)
                 else:
                     log_msg(f"\n[알림] LGEKR에 {product_category} 업체가 없습니다.", log_queue)
 
@@ -455,61 +658,7 @@ def main(product_category=None, supplier_category=None, log_queue=None):
                 # 먼저 LGECH로 법인 전환
                 try:
                     log_msg("\n>>> 법인 전환 시도 (LGEKR -> LGECH) <<<", log_queue)
-                    open_tab = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[@id='quickMenu']//img"))
-                    )
-                    open_tab.click()
-                    log_msg("'OPEN' 탭 클릭 완료", log_queue)
-                    
-                    # iframe 전환
-                    iframes = driver.find_elements(By.TAG_NAME, "iframe")
-                    target_iframe = None
-                    for frame in iframes:
-                        try:
-                            if "goGlobalMap.glop" in frame.get_attribute("src"):
-                                target_iframe = frame
-                                break
-                        except: continue
-                    
-                    if target_iframe:
-                        driver.switch_to.frame(target_iframe)
-                    else:
-                        WebDriverWait(driver, 15).until(EC.frame_to_be_available_and_switch_to_it((By.TAG_NAME, "iframe")))
-                    log_msg("iframe 전환 성공", log_queue)
-                    time.sleep(2)
-
-                    # LGEKR 클릭 (그리드 숨기기)
-                    try:
-                        lgekr_span = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "LGEKR")))
-                        driver.execute_script("arguments[0].click();", lgekr_span.find_element(By.TAG_NAME, "a"))
-                        log_msg("'LGEKR' 그리드 숨기기 완료", log_queue)
-                    except: pass
-                    time.sleep(1)
-
-                    # LGECH 클릭
-                    lgech_span = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "LGECH")))
-                    driver.execute_script("arguments[0].click();", lgech_span.find_element(By.TAG_NAME, "a"))
-                    log_msg("'LGECH' 선택 완료", log_queue)
-                    time.sleep(3)
-
-                    # GAO CHUANG (GMZ) 선택 (LGECH 첫 업체)
-                    supplier_element = WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.XPATH, "//span[contains(text(), 'GAO CHUANG (GMZ)')]"))
-                    )
-                    driver.execute_script("arguments[0].click();", supplier_element)
-                    log_msg("'GAO CHUANG (GMZ)' 업체 선택 완료", log_queue)
-                    time.sleep(2)
-
-                    driver.switch_to.default_content()
-                    ActionChains(driver).send_keys(Keys.ESCAPE).perform()
-                    log_msg("모달 닫기 완료", log_queue)
-                    
-                    # 법인 전환 후 로딩 대기
-                    WebDriverWait(driver, 20).until(
-                        lambda d: "L-hide-display" in d.find_element(By.ID, "L-gen4").get_attribute("class")
-                    )
-                    log_msg("법인 전환 후 로딩 완료", log_queue)
-
+                    switch_corporation(driver, 'LGECH', hide_corporation='LGEKR', log_queue=log_queue)
                 except Exception as e_switch:
                     log_msg(f"법인 전환 실패: {e_switch}", log_queue)
                     raise e_switch
@@ -518,62 +667,26 @@ def main(product_category=None, supplier_category=None, log_queue=None):
                 target_companies_ch = COMPANIES['LGECH'].get(product_category, [])
                 if target_companies_ch:
                     log_msg(f"\n>>> LGECH 관할 {product_category.upper()} 업체 처리 시작 <<<", log_queue)
-                    download_excel_for_companies(driver, target_companies_ch, skip_model_filter=(product_category == 'pc'), log_queue=log_queue)
+                    download_excel_for_companies(driver, target_companies_ch, skip_model_filter=(product_category == 'pc'), log_queue=log_queue, download_dir=download_dir)
                 else:
                     log_msg(f"\n[알림] LGECH에 {product_category} 업체가 없습니다.", log_queue)
 
                 # 최종 원복 (LGECH -> LGEKR) 및 AU OPTRONICS (GMZ) 선택
                 try:
                     log_msg("\n>>> 최종 원복 시도 (LGECH -> LGEKR) <<<", log_queue)
-                    open_tab = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[@id='quickMenu']//img"))
-                    )
-                    open_tab.click()
-                    log_msg("'OPEN' 탭 클릭 완료", log_queue)
-                    
-                    # iframe 전환
-                    iframes = driver.find_elements(By.TAG_NAME, "iframe")
-                    target_iframe = None
-                    for frame in iframes:
-                        try:
-                            if "goGlobalMap.glop" in frame.get_attribute("src"):
-                                target_iframe = frame
-                                break
-                        except: continue
-                    
-                    if target_iframe:
-                        driver.switch_to.frame(target_iframe)
-                    else:
-                        WebDriverWait(driver, 15).until(EC.frame_to_be_available_and_switch_to_it((By.TAG_NAME, "iframe")))
-                    log_msg("iframe 전환 성공", log_queue)
-                    time.sleep(2)
-
-                    # LGEKR 클릭
-                    lgekr_span = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "LGEKR")))
-                    driver.execute_script("arguments[0].click();", lgekr_span.find_element(By.TAG_NAME, "a"))
-                    log_msg("'LGEKR' 선택 완료", log_queue)
-                    time.sleep(3)
-
-                    # AU OPTRONICS (GMZ) 선택
-                    supplier_element = WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.XPATH, "//span[contains(text(), 'AU OPTRONICS (GMZ)')]"))
-                    )
-                    driver.execute_script("arguments[0].click();", supplier_element)
-                    log_msg("'AU OPTRONICS (GMZ)' 업체 선택 완료", log_queue)
-                    time.sleep(2)
-
-                    driver.switch_to.default_content()
-                    ActionChains(driver).send_keys(Keys.ESCAPE).perform()
-                    log_msg("모달 닫기 완료 및 최종 원복 성공", log_queue)
-
+                    switch_corporation(driver, 'LGEKR', log_queue=log_queue)
+                    log_msg("최종 원복 성공", log_queue)
                 except Exception as e_revert:
                     log_msg(f"최종 원복 실패: {e_revert}", log_queue)
 
         except Exception as e:
             log_msg(f'자동화 프로세스 중 오류: {e}', log_queue)
 
+        log_msg(f"\n전체 소요 시간: {time.perf_counter() - started:.1f}s", log_queue)
     finally:
-        driver.quit()
+        if driver is not None:
+            driver.quit()
+        shutil.rmtree(download_dir, ignore_errors=True)
 
 if __name__ == '__main__':
     main()
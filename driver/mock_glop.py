@@ -0,0 +1,243 @@
+"""
+드라이버 테스트용 로컬 mock GLOP 사이트.
+
+main.py / parallel_driver.py가 사용하는 화면 요소만 흉내 냅니다.
+- 로그인 (userId, userPwd, login_btn.png), 로딩 마스크 L-gen4 / L-gen7 (class L-hide-display)
+- 업체 드롭다운 (gnbUserCompany, gnbUserCompany_DIALOG), 상단 메뉴 mNavi_2와 하위 메뉴 (NERP / SR00301)
+- 엑셀 다운로드 버튼 informationExcelDownloadIod → HTML 형식 .xls 파일 (업체·source별 고정 데이터)
+- OPEN 탭(quickMenu)의 법인 지도 iframe (goGlobalMap.glop, LGEKR / LGECH 전환)
+
+실행: python mock_glop.py [--port 8765] [--latency 0.5]
+드라이버: GLOP_URL=http://127.0.0.1:8765/index.jsp GLOP_SESSIONS=3 python main.py
+--latency는 로딩 마스크 표시 시간과 다운로드 응답 지연(초)입니다.
+"""
+import argparse
+import datetime
+import html
+import json
+import random
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from main import COMPANIES, CORPORATION_SUPPLIERS
+
+MODELS = ['24BA450-B.AEKQ', '27GQ50F-B.AUS', '24GQ40W-B.AUS', '32UN880-B.AEU', '27UL500-W.AEU']
+SHIP_TOS = ['EEUK', 'EEPT', 'EEDG', 'ERRA_MINSK_DO']
+ROWS_PER_FILE = 200
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Mock GLOP</title>
+<style>
+  .L-hide-display { display: none !important; }
+  .mask { position: fixed; inset: 0; background: rgba(0,0,0,0.2); }
+  #mNavi_2 ul { display: none; }
+  #mNavi_2:hover ul { display: block; }
+  #gnbUserCompany_DIALOG { border: 1px solid #999; }
+  #gnbUserCompany_DIALOG span { display: block; cursor: pointer; }
+  #corpModal iframe { width: 600px; height: 300px; }
+</style></head>
+<body>
+<div id="L-gen4" class="mask"></div>
+<div id="L-gen7" class="mask L-hide-display"></div>
+
+<form id="loginForm" onsubmit="return false;">
+  <input id="userId" type="text"><input id="userPwd" type="password">
+  <img src="/images/login_btn.png" alt="login" onclick="doLogin()" width="60" height="20" style="background:#336">
+</form>
+
+<div id="app" class="L-hide-display">
+  <div id="quickMenu"><img src="/images/open_tab.png" alt="OPEN" width="40" height="20" style="background:#663" onclick="openCorpModal()"></div>
+  <div>
+    <span id="companyTrigger" onclick="toggleCompanies()">__COMPANY__</span><select id="gnbUserCompany"></select>
+  </div>
+  <div id="gnbUserCompany_DIALOG" class="L-hide-display"></div>
+  <ul><li id="mNavi_2">Shipping &amp; Invoicing
+    <ul>
+      <li><a href="javascript:void(0)" onclick="openMenu('NERP')">Shipping &amp; Invoicing (NERP)</a></li>
+      <li><a href="javascript:openMenu('GERP') /* SR00301 */">Shipping &amp; Invoicing</a></li>
+    </ul>
+  </li></ul>
+  <div id="content" class="L-hide-display">
+    <h3 id="menuTitle"></h3>
+    <button id="informationExcelDownloadIod" onclick="download()">Excel</button>
+  </div>
+  <div id="corpModal" class="L-hide-display"><iframe src="/goGlobalMap.glop"></iframe></div>
+</div>
+
+<script>
+const LATENCY = __LATENCY__;
+const COMPANIES = __COMPANIES__;
+const SUPPLIERS = __SUPPLIERS__;
+let corporation = 'LGEKR', company = SUPPLIERS['LGEKR'], source = null, pendingCorp = null;
+
+function mask(id, done) {
+  const el = document.getElementById(id);
+  el.classList.remove('L-hide-display');
+  setTimeout(() => { el.classList.add('L-hide-display'); if (done) done(); }, LATENCY * 1000);
+}
+function doLogin() {
+  document.getElementById('loginForm').classList.add('L-hide-display');
+  document.getElementById('app').classList.remove('L-hide-display');
+  mask('L-gen4');
+}
+function renderCompanies() {
+  const dialog = document.getElementById('gnbUserCompany_DIALOG');
+  dialog.innerHTML = '';
+  for (const name of COMPANIES[corporation]) {
+    const span = document.createElement('span');
+    span.textContent = name;
+    span.onclick = () => selectCompany(name);
+    dialog.appendChild(span);
+  }
+}
+function toggleCompanies() {
+  renderCompanies();
+  document.getElementById('gnbUserCompany_DIALOG').classList.toggle('L-hide-display');
+}
+function selectCompany(name) {
+  company = name;
+  document.getElementById('companyTrigger').textContent = name;
+  document.getElementById('gnbUserCompany_DIALOG').classList.add('L-hide-display');
+  document.getElementById('content').classList.add('L-hide-display');
+  mask('L-gen4');
+}
+function openMenu(menuSource) {
+  source = menuSource;
+  document.getElementById('content').classList.add('L-hide-display');
+  mask('L-gen7', () => {
+    document.getElementById('menuTitle').textContent = `${company} - ${source}`;
+    document.getElementById('content').classList.remove('L-hide-display');
+  });
+}
+function download() {
+  if (!confirm('Download?')) return;
+  const params = new URLSearchParams({ company, source });
+  window.location.href = `/download?${params}`;
+}
+function openCorpModal() {
+  document.getElementById('corpModal').classList.remove('L-hide-display');
+}
+function closeCorpModal() {
+  document.getElementById('corpModal').classList.add('L-hide-display');
+}
+// called from the goGlobalMap.glop iframe
+function pickCorporation(corp) { pendingCorp = corp; }
+function pickSupplier(label) {
+  if (pendingCorp) corporation = pendingCorp;
+  company = label;
+  document.getElementById('companyTrigger').textContent = label;
+  mask('L-gen4');
+}
+document.addEventListener('keydown', e => { if (e.key === 'Escape') closeCorpModal(); });
+</script>
+</body></html>
+"""
+
+MAP_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body>
+  <span id="LGEKR"><a href="javascript:void(0)" onclick="pick('LGEKR')">LGEKR</a></span>
+  <span id="LGECH"><a href="javascript:void(0)" onclick="pick('LGECH')">LGECH</a></span>
+  <div id="suppliers"></div>
+<script>
+const SUPPLIERS = __SUPPLIERS__;
+function pick(corp) {
+  parent.pickCorporation(corp);
+  const box = document.getElementById('suppliers');
+  box.innerHTML = '';
+  const span = document.createElement('span');
+  span.textContent = SUPPLIERS[corp];
+  span.onclick = () => parent.pickSupplier(SUPPLIERS[corp]);
+  box.appendChild(span);
+}
+document.addEventListener('keydown', e => { if (e.key === 'Escape') parent.closeCorpModal(); });
+</script>
+</body></html>
+"""
+
+
+def excel_rows(company, source, rows=ROWS_PER_FILE):
+    """업체·source별로 항상 같은 GLOP 선적 데이터 (헤더 포함)"""
+    rng = random.Random(f'{company}|{source}')
+    base = datetime.date.today() - datetime.timedelta(days=60)
+    prefix = ''.join(ch for ch in company.upper() if ch.isalpha())[:3]
+    header = ['Biz Type', 'Model', 'PO No.', 'Ship To', 'Ship', 'RSD', 'Ship Date']
+    body = []
+    for i in range(rows):
+        ship_date = base + datetime.timedelta(days=rng.randrange(120))
+        body.append([
+            'Thru', rng.choice(MODELS), f'{prefix}{source}{100000 + i // 3}', rng.choice(SHIP_TOS),
+            str(rng.randrange(1, 500)), str(ship_date + datetime.timedelta(days=rng.randrange(-7, 8))),
+            str(ship_date),
+        ])
+    return [header, *body]
+
+
+def excel_html(rows):
+    """GLOP 다운로드와 같은 HTML 테이블 형식의 .xls 내용"""
+    lines = ['<html><head><meta charset="utf-8"></head><body><table border="1">']
+    for i, row in enumerate(rows):
+        tag = 'th' if i == 0 else 'td'
+        lines.append('<tr>' + ''.join(f'<{tag}>{html.escape(v)}</{tag}>' for v in row) + '</tr>')
+    lines.append('</table></body></html>')
+    return '\n'.join(lines).encode('utf-8')
+
+
+def make_handler(latency):
+    corporations = {corp: sorted({c for companies in products.values() for c in companies})
+                    for corp, products in COMPANIES.items()}
+    index_page = (INDEX_PAGE.replace('__LATENCY__', json.dumps(latency))
+                  .replace('__COMPANIES__', json.dumps(corporations))
+                  .replace('__SUPPLIERS__', json.dumps(CORPORATION_SUPPLIERS))
+                  .replace('__COMPANY__', html.escape(CORPORATION_SUPPLIERS['LGEKR']))).encode('utf-8')
+    map_page = MAP_PAGE.replace('__SUPPLIERS__', json.dumps(CORPORATION_SUPPLIERS)).encode('utf-8')
+
+    class MockGlopHandler(BaseHTTPRequestHandler):
+        def _send(self, body, content_type, headers=None):
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path in ('/', '/index.jsp'):
+                self._send(index_page, 'text/html; charset=utf-8')
+            elif url.path == '/goGlobalMap.glop':
+                self._send(map_page, 'text/html; charset=utf-8')
+            elif url.path.startswith('/images/'):
+                self._send(b'', 'image/png')
+            elif url.path == '/download':
+                query = parse_qs(url.query)
+                company = query.get('company', [''])[0]
+                source = query.get('source', [''])[0]
+                time.sleep(latency)
+                filename = f"Shipping_{source}_{datetime.datetime.now():%Y%m%d%H%M%S%f}.xls"
+                self._send(excel_html(excel_rows(company, source)), 'application/vnd.ms-excel',
+                           {'Content-Disposition': f'attachment; filename="{filename}"'})
+            else:
+                self.send_error(404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockGlopHandler
+
+
+def serve(port=8765, latency=0.5):
+    """mock 서버를 만들어 돌려줍니다 (serve_forever는 호출한 쪽에서 실행)"""
+    return ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock GLOP site for driver tests')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5)
+    args = parser.parse_args()
+    server = serve(args.port, args.latency)
+    print(f"Mock GLOP: http://127.0.0.1:{args.port}/index.jsp")
+    server.serve_forever()
@@ -0,0 +1,25 @@
+import pandas as pd
+from model_series import extract_series
+
+
+def filter_by_series(models, valid_series):
+    """
+    엑셀의 Model 값을 os_models의 Series(valid_series)와 비교하는 함수.
+    GLOP 엑셀은 같은 모델이 반복되므로 고유 모델마다 한 번만 Series를 추출하고,
+    factorize 코드로 행 단위 결과를 만듭니다.
+    빈 Model(None/NaN)은 기존 로직(str(x) → 'None'/'nan')과 같이 그 문자열을 Series로 보고 제외됩니다.
+
+    반환값: (keep_mask, excluded_series) - models와 같은 길이의 bool numpy 배열,
+    제외된 Series 코드 목록 (처음 등장한 순서)
+    """
+    models = pd.Series(models, dtype=object)
+    missing = models.isna()
+    if missing.any():
+        models = models.where(~missing, models[missing].map(str))
+
+    codes, uniques = pd.factorize(models.astype(str))
+    unique_series = extract_series(uniques)
+    unique_valid = unique_series.isin(valid_series).to_numpy()
+    keep_mask = unique_valid[codes]
+    excluded_series = pd.unique(unique_series[~unique_valid]).tolist()
+    return keep_mask, excluded_series
@@ -0,0 +1,148 @@
+"""
+여러 headless Chrome 세션으로 GLOP 엑셀을 병렬 다운로드하는 모듈.
+
+- 업체 x 메뉴(NERP/GERP) 작업 목록을 공용 큐에 넣고, 세션(worker)마다 하나씩 가져가 처리
+- 세션마다 전용 다운로드 폴더를 사용하므로 파일 감지가 서로 섞이지 않음
+- 다운로드된 파일의 파싱과 DB 저장(save_to_db)은 호출한 스레드 하나(writer)가 순서대로 처리
+  → mnt_data.db에 쓰는 연결은 항상 하나
+
+사용: main(..., sessions=3) 또는 환경 변수 GLOP_SESSIONS=3
+로컬 테스트: python mock_glop.py 실행 후 GLOP_URL=http://127.0.0.1:8765/index.jsp
+"""
+import queue
+import shutil
+import tempfile
+import threading
+from main import (COMPANIES, MENUS, log_msg, create_driver, login, switch_corporation,
+                  select_company, download_menu, save_to_db)
+
+# writer에게 worker 종료를 알리는 표시
+_DONE = object()
+
+
+class PrefixedLog:
+    """worker의 로그 앞에 세션 번호를 붙여 원래 log_queue로 전달하는 래퍼"""
+
+    def __init__(self, log_queue, prefix):
+        self._log_queue = log_queue
+        self._prefix = prefix
+
+    def put(self, event):
+        if event is not None and 'message' in event:
+            event = {**event, 'message': f"{self._prefix} {event['message']}"}
+        self._log_queue.put(event)
+
+
+def build_tasks(product_category, supplier_category):
+    """(업체명, 메뉴) 작업 목록. 같은 업체의 메뉴가 연달아 오도록 정렬되어 업체 재선택이 줄어듭니다."""
+    companies = COMPANIES.get(supplier_category, {}).get(product_category, [])
+    return [(company_name, menu) for company_name in companies for menu in MENUS]
+
+
+def session_worker(index, supplier_category, tasks, results, stop, headless=True, log_queue=None):
+    """
+    세션 하나를 열어 tasks 큐가 빌 때까지 (업체, 메뉴)를 다운로드하고,
+    받은 파일을 (파일 경로, 업체명, source) 형태로 results 큐에 넣는 함수.
+    """
+    worker_log = PrefixedLog(log_queue, f"[S{index}]") if log_queue else None
+    download_dir = tempfile.mkdtemp(prefix=f'glop_session{index}_')
+    driver = None
+    current_company = None
+    try:
+        driver = create_driver(download_dir=download_dir, headless=headless)
+        login(driver, worker_log)
+        if supplier_category == 'LGECH':
+            switch_corporation(driver, 'LGECH', hide_corporation='LGEKR', log_queue=worker_log)
+
+        while not stop.is_set():
+            try:
+                company_name, menu = tasks.get_nowait()
+            except queue.Empty:
+                break
+
+            if company_name != current_company:
+                if not select_company(driver, company_name, worker_log):
+                    current_company = None
+                    continue
+                current_company = company_name
+
+            new_file = download_menu(driver, menu, download_dir, worker_log)
+            if new_file:
+                results.put((new_file, company_name, menu['source']))
+
+        # 법인 원복 (기존 순차 실행과 동일하게 세션 종료 전 LGEKR로 되돌림)
+        if supplier_category == 'LGECH':
+            try:
+                switch_corporation(driver, 'LGEKR', log_queue=worker_log)
+            except Exception as e_revert:
+                log_msg(f"최종 원복 실패: {e_revert}", worker_log)
+    except Exception as e:
+        log_msg(f'세션 {index} 자동화 중 오류: {e}', worker_log)
+    finally:
+        if driver is not None:
+            driver.quit()
+        results.put((_DONE, download_dir))
+
+
+def run_parallel(product_category, supplier_category, sessions=3, headless=True, log_queue=None):
+    """
+    세션 sessions개로 업체 x 메뉴 작업을 나누어 다운로드하고, 받은 파일을 순서대로 DB에 저장하는 함수.
+    반환값: 저장된 파일별 {'company', 'source', 'inserted', 'updated', 'deleted', 'unchanged'} 목록
+    """
+    task_list = build_tasks(product_category, supplier_category)
+    if not task_list:
+        log_msg(f"\n[알림] {supplier_category}에 {product_category} 업체가 없습니다.", log_queue)
+        return []
+
+    sessions = max(1, min(sessions, len(task_list)))
+    log_msg(f"\n>>> {supplier_category} 관할 {product_category.upper()} 병렬 다운로드 시작 "
+            f"(작업 {len(task_list)}개, 세션 {sessions}개) <<<", log_queue)
+
+    tasks = queue.Queue()
+    for task in task_list:
+        tasks.put(task)
+    results = queue.Queue()
+    stop = threading.Event()
+    errors = []
+
+    def run_worker(index):
+        try:
+            session_worker(index, supplier_category, tasks, results, stop, headless, log_queue)
+        except BaseException as e:  # 작업 취소 등 (log_queue.put에서 발생)
+            errors.append(e)
+            stop.set()
+
+    workers = [threading.Thread(target=run_worker, args=(i + 1,), name=f'glop-session-{i + 1}')
+               for i in range(sessions)]
+    for worker in workers:
+        worker.start()
+
+    # writer: 다운로드된 파일을 한 번에 하나씩 파싱하여 DB에 반영
+    saved = []
+    download_dirs = []
+    try:
+        while len(download_dirs) < sessions:
+            item = results.get()
+            if item[0] is _DONE:
+                download_dirs.append(item[1])
+                continue
+            file_path, company_name, source_name = item
+            counts = save_to_db(file_path, company_name, source_name, product_category == 'pc', log_queue)
+            if counts is not None:
+                saved.append({'company': company_name, 'source': source_name, **counts})
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+        while not results.empty():
+            item = results.get_nowait()
+            if item[0] is _DONE:
+                download_dirs.append(item[1])
+        for download_dir in download_dirs:
+            shutil.rmtree(download_dir, ignore_errors=True)
+
+    if errors:
+        raise errors[0]
+
+    log_msg(f"\n>>> 병렬 다운로드 완료: 파일 {len(saved)}/{len(task_list)}개 저장 <<<", log_queue)
+    return saved
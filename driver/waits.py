@@ -0,0 +1,121 @@
+"""
+GLOP 화면 대기 도구 모음 (고정 time.sleep 대신 조건 대기).
+
+- wait_loading: 로딩 마스크(L-gen4, L-gen7)의 class에 L-hide-display가 붙을 때까지 대기.
+  클릭 직후 마스크가 아직 나타나지 않은 경우를 위해 appear초 동안 먼저 마스크 표시를 기다림
+- wait_present / wait_clickable: 요소 존재 / 클릭 가능 대기
+- switch_to_frame: src에 keyword가 들어간 iframe이 생길 때까지 기다려 전환하고 문서 로딩 완료까지 대기
+- wait_idle: 현재 문서의 로딩과 jQuery AJAX 요청이 끝날 때까지 대기
+- accept_alert: 네이티브 alert가 뜨면 수락
+
+모든 함수는 label과 실제 대기 시간을 로그로 남기므로 실행 시간이 화면 응답 속도를 그대로 반영합니다.
+시간 초과 시 label이 담긴 TimeoutException이 발생합니다.
+"""
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from driver_log import log_msg
+
+# 조건 확인 간격 (WebDriverWait 기본값 0.5초보다 촘촘하게)
+POLL_INTERVAL = 0.1
+
+HIDDEN_CLASS = 'L-hide-display'
+
+
+def timed_wait(driver, condition, timeout, label, log_queue=None):
+    """WebDriverWait(driver, timeout).until(condition)의 결과를 돌려주고 대기 시간을 로그로 남기는 함수"""
+    started = time.perf_counter()
+    result = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+        condition, message=f"{label}: {timeout}초 대기 초과"
+    )
+    log_msg(f"{label} ({time.perf_counter() - started:.2f}s)", log_queue)
+    return result
+
+
+def mask_hidden(mask_id):
+    """로딩 마스크가 숨겨졌는지 확인하는 조건"""
+    return lambda d: HIDDEN_CLASS in (d.find_element(By.ID, mask_id).get_attribute("class") or '')
+
+
+def mask_shown(mask_id):
+    """로딩 마스크가 표시 중인지 확인하는 조건"""
+    return lambda d: HIDDEN_CLASS not in (d.find_element(By.ID, mask_id).get_attribute("class") or '')
+
+
+def wait_loading(driver, mask_id, timeout, label, log_queue=None, appear=0.0):
+    """
+    로딩 마스크(mask_id)가 숨겨질 때까지 대기. appear > 0이면 먼저 마스크가 나타나기를
+    최대 appear초 기다립니다 (클릭 직후 아직 로딩이 시작되지 않아 바로 통과하는 것 방지).
+    """
+    started = time.perf_counter()
+    if appear > 0:
+        try:
+            WebDriverWait(driver, appear, poll_frequency=POLL_INTERVAL / 2).until(mask_shown(mask_id))
+        except TimeoutException:
+            pass  # 이미 끝났거나 로딩 없이 처리됨
+    WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+        mask_hidden(mask_id), message=f"{label}: {timeout}초 대기 초과"
+    )
+    log_msg(f"{label} ({time.perf_counter() - started:.2f}s)", log_queue)
+
+
+def wait_present(driver, locator, timeout, label, log_queue=None):
+    return timed_wait(driver, EC.presence_of_element_located(locator), timeout, label, log_queue)
+
+
+def wait_clickable(driver, locator, timeout, label, log_queue=None):
+    return timed_wait(driver, EC.element_to_be_clickable(locator), timeout, label, log_queue)
+
+
+def _document_ready(d):
+    return d.execute_script(
+        "return document.readyState === 'complete' && "
+        "(typeof window.jQuery === 'undefined' || window.jQuery.active === 0);"
+    )
+
+
+def wait_idle(driver, timeout, label, log_queue=None):
+    """현재 문서(또는 iframe)의 로딩과 진행 중인 jQuery AJAX 요청이 끝날 때까지 대기"""
+    return timed_wait(driver, _document_ready, timeout, label, log_queue)
+
+
+def switch_to_frame(driver, src_keyword, timeout, label, log_queue=None):
+    """
+    src에 src_keyword가 포함된 iframe이 생길 때까지 기다려 전환하고, iframe 문서 로딩 완료까지 대기.
+    해당 iframe이 없으면 첫 번째 iframe으로 전환합니다.
+    """
+    def frame_available(d):
+        frames = d.find_elements(By.TAG_NAME, "iframe")
+        for frame in frames:
+            try:
+                if src_keyword in (frame.get_attribute("src") or ''):
+                    d.switch_to.frame(frame)
+                    return True
+            except Exception:
+                continue
+        if frames:
+            return EC.frame_to_be_available_and_switch_to_it(frames[0])(d)
+        return False
+
+    started = time.perf_counter()
+    WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+        frame_available, message=f"{label}: {timeout}초 대기 초과"
+    )
+    WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+        _document_ready, message=f"{label}: {timeout}초 대기 초과"
+    )
+    log_msg(f"{label} ({time.perf_counter() - started:.2f}s)", log_queue)
+
+
+def accept_alert(driver, timeout, log_queue=None):
+    """네이티브 alert가 timeout초 안에 뜨면 수락하고 True를 돌려줍니다."""
+    started = time.perf_counter()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(EC.alert_is_present())
+    except TimeoutException:
+        return False
+    driver.switch_to.alert.accept()
+    log_msg(f"Native Alert 수락 완료 ({time.perf_counter() - started:.2f}s)", log_queue)
+    return True
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# 미리 계산해 두는 달력 범위 (월요일 시작). 범위 밖 날짜는 동일한 산식으로 직접 계산합니다.
+CALENDAR_START = pd.Timestamp('2015-01-05')
+CALENDAR_END = pd.Timestamp('2035-12-31')
+
+_calendar_table = None
+
+
+def _compute_week_fields(dates):
+    """
+    DatetimeIndex/Series 전체에 대해 Week Name과 Month를 한 번에 계산하는 함수.
+    - Week Name: 해당 주 월요일 날짜 + ISO 주차 (예: 2025-01-06(W02))
+    - Month: 해당 주 7일 중 가장 많은 날이 속한 월 = 목요일이 속한 월 (ISO 연도 기준, 예: 2025-01)
+    """
+    dates = pd.DatetimeIndex(dates).normalize()
+    weekday = dates.dayofweek.to_numpy()
+    monday = dates - pd.to_timedelta(weekday, unit='D')
+    thursday = monday + pd.Timedelta(days=3)
+
+    week_no = pd.Index(dates.isocalendar().week.to_numpy(dtype='int64'))
+    week_name = monday.strftime('%Y-%m-%d') + '(W' + week_no.astype(str).str.zfill(2) + ')'
+    month = thursday.strftime('%Y-%m')
+    return np.asarray(week_name, dtype=object), np.asarray(month, dtype=object)
+
+
+def get_calendar_table():
+    """
+    CALENDAR_START ~ CALENDAR_END 구간의 날짜별 Week Name / Month 조회 테이블을 돌려주는 함수.
+    최초 호출 시 한 번만 생성하여 프로세스 내에서 재사용합니다.
+    """
+    global _calendar_table
+    if _calendar_table is None:
+        days = pd.date_range(CALENDAR_START, CALENDAR_END, freq='D')
+        week_name, month = _compute_week_fields(days)
+        _calendar_table = pd.DataFrame({'Week Name': week_name, 'Month': month}, index=days)
+    return _calendar_table
+
+
+def _lookup(dates, field):
+    dates = pd.to_datetime(pd.Series(dates), errors='coerce')
+    result = np.full(len(dates), None, dtype=object)
+
+    valid = dates.notna().to_numpy()
+    if not valid.any():
+        return pd.Series(result, index=dates.index, dtype=object)
+
+    table = get_calendar_table()
+    normalized = pd.DatetimeIndex(dates[valid]).normalize()
+    offsets = (normalized - CALENDAR_START).days.to_numpy()
+    in_range = (offsets >= 0) & (offsets < len(table))
+
+    values = np.empty(len(normalized), dtype=object)
+    values[in_range] = table[field].to_numpy()[offsets[in_range]]
+    if not in_range.all():
+        # 조회 테이블 범위를 벗어난 날짜는 직접 계산
+        week_name, month = _compute_week_fields(normalized[~in_range])
+        values[~in_range] = week_name if field == 'Week Name' else month
+
+    result[valid] = values
+    return pd.Series(result, index=dates.index, dtype=object)
+
+
+def weekname_series(dates):
+    """
+    datetime 컬럼 전체를 입력받아 isocalendar 기준 week name 컬럼을 돌려주는 함수.
+    get_weekname()을 행마다 적용한 결과와 동일하며, 결측값은 None으로 돌려줍니다.
+    """
+    return _lookup(dates, 'Week Name')
+
+
+def month_series(dates):
+    """
+    datetime 컬럼 전체를 입력받아 해당 주가 속한 월(yyyy-mm, ISO 연도 기준) 컬럼을 돌려주는 함수.
+    Week Name으로부터 get_month_from_date()를 적용하던 기존 결과와 동일합니다.
+    """
+    return _lookup(dates, 'Month')
@@ -1,18 +1,29 @@
 from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, Response
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 import pandas as pd
-from sqlalchemy import and_
-from database import init_db, upsert_dataframe, db_session, engine
-from models import ShipmentPlan, User, LoginHistory, MonitorStuffing, SiteMapping, OSModel, WorkDiary, Comment
+from sqlalchemy import and_, or_, func, select
+from database import init_db, upsert_dataframe, upsert_columns, db_session, engine, begin_immediate
+from master_cache import bump_version, cached_count
+from diary_search import init_search_index, search_subquery, format_snippet
+from diary_tags import migrate_hashtags, normalize_tag
+from master_io import ImportValidationError, iter_upload_chunks, import_rows, stream_csv, stream_xlsx, spool_xlsx
+from plan_ingest import read_body, decode_plan_payload, records_to_columns
+from plan_upload import (UploadSessionError, init_upload_staging, open_session, session_status,
+                         put_chunk, commit_session, abort_session)
+from plan_snapshots import init_snapshots, uploading, refresh_registry, list_snapshots, compact, latest_planweek
+from container_sim import simulate, simulate_packing
+from sp_cube import init_cube, refresh_cube, query_cube, dimension_values, DIMENSIONS
+from glop_report import init_actuals, report_page, iter_report_rows, REPORT_COLUMNS
+from glop_jobs import JobManager
+from models import ShipmentPlan, User, LoginHistory, MonitorStuffing, SiteMapping, OSModel, WorkDiary, Comment, DiaryHashtag, HashtagCount
 import os
 import uuid
 import base64
 import logging
 import socket
 import json
-import queue
-import threading
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from sqlalchemy import inspect
 
 app = Flask(__name__)
@@ -41,6 +52,12 @@ User.get_id = lambda self: str(self.id)
 # Initialize database
 with app.app_context():
     init_db()
+    init_search_index(engine)
+    migrate_hashtags(engine)
+    init_upload_staging(ShipmentPlan)
+    init_snapshots()
+    init_cube()
+    init_actuals()
     # Create default admin if not exists
     admin = db_session.query(User).filter_by(userid='admin').first()
     if not admin:
@@ -157,22 +174,22 @@ def glop_driver():
 @app.route('/glop-report')
 @login_required
 def glop_report():
-    return render_template('placeholder.html', title='GLOP Report')
+    return render_template('glop_report.html')
 
 @app.route('/forecast')
 @login_required
 def forecast():
-    return render_template('placeholder.html', title='Forecast')
+    return render_template('forecast.html')
 
 @app.route('/sp-visualization')
 @login_required
 def sp_visualization():
-    return render_template('placeholder.html', title='SP Visualization')
+    return render_template('sp_visualization.html')
 
 @app.route('/container-simulation')
 @login_required
 def container_simulation():
-    return render_template('placeholder.html', title='Container Simulation')
+    return render_template('container_simulation.html')
 
 @app.route('/work-diary')
 @login_required
@@ -211,53 +228,140 @@ def admin():
 
 # ==================== MASTER DATA API ====================
 
+def _model_meta(model):
+    """Column metadata of a master-data model, computed once at import"""
+    mapper = inspect(model)
+    columns = [c.key for c in mapper.column_attrs]
+    return {
+        'model': model,
+        'columns': columns,
+        'attrs': {key: getattr(model, key) for key in columns},
+        # Attribute key, not the DB column name ('ship_to', not 'Ship To')
+        'pk': mapper.get_property_by_column(mapper.primary_key[0]).key,
+    }
+
 MODEL_MAP = {
-    'monitor_stuffing': MonitorStuffing,
-    'site_mapping': SiteMapping,
-    'os_models': OSModel
+    'monitor_stuffing': _model_meta(MonitorStuffing),
+    'site_mapping': _model_meta(SiteMapping),
+    'os_models': _model_meta(OSModel)
 }
 
+def _encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def _decode_cursor(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+def _after_cursor(sort_attr, pk_attr, last_value, last_pk, descending):
+    """
+    Rows after (last_value, last_pk) in ORDER BY sort, pk (both ASC or both DESC).
+    SQLite sorts NULLs first, so they come first in ASC order and last in DESC order.
+    """
+    if descending:
+        if last_value is None:
+            return and_(sort_attr.is_(None), pk_attr < last_pk)
+        return or_(sort_attr < last_value, sort_attr.is_(None),
+                   and_(sort_attr == last_value, pk_attr < last_pk))
+    if last_value is None:
+        return or_(sort_attr.isnot(None), and_(sort_attr.is_(None), pk_attr > last_pk))
+    return or_(sort_attr > last_value, and_(sort_attr == last_value, pk_attr > last_pk))
+
 @app.route('/api/master-data/<table_name>', methods=['GET'])
 @login_required
 def get_master_data(table_name):
-    model = MODEL_MAP.get(table_name)
-    if not model:
+    """
+    Query parameters:
+      per_page       page size (default 20, max 500)
+      cursor         next_cursor of the previous page (keyset on sort column + primary key)
+      columns        comma-separated projection (the primary key is always included)
+      sort, order    sort column (default: primary key) and asc/desc
+      filter_<col>   case-insensitive substring filter on a column
+    """
+    meta = MODEL_MAP.get(table_name)
+    if not meta:
         return jsonify({"error": "Invalid table name"}), 400
-    
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
-    query = db_session.query(model)
-    total = query.count()
-    items = query.offset((page - 1) * per_page).limit(per_page).all()
-    
-    # Convert to dict
-    data = []
-    for item in items:
-        item_dict = {c.key: getattr(item, c.key) for c in inspect(model).mapper.column_attrs}
-        data.append(item_dict)
-        
+    attrs, pk = meta['attrs'], meta['pk']
+
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), 500))
+
+    columns = meta['columns']
+    if request.args.get('columns'):
+        requested = [c.strip() for c in request.args['columns'].split(',') if c.strip()]
+        unknown = [c for c in requested if c not in attrs]
+        if unknown:
+            return jsonify({"error": f"Unknown columns: {', '.join(unknown)}"}), 400
+        columns = [pk] + [c for c in requested if c != pk]
+
+    sort = request.args.get('sort', pk)
+    if sort not in attrs:
+        return jsonify({"error": f"Unknown sort column: {sort}"}), 400
+    descending = request.args.get('order', 'asc').lower() == 'desc'
+
+    filters = []
+    for arg, value in sorted(request.args.items()):
+        if not arg.startswith('filter_') or value == '':
+            continue
+        key = arg[len('filter_'):]
+        if key not in attrs:
+            return jsonify({"error": f"Unknown filter column: {key}"}), 400
+        filters.append((key, value))
+
+    query = db_session.query(*[attrs[c] for c in columns])
+    for key, value in filters:
+        query = query.filter(attrs[key].ilike(f"%{value}%"))
+
+    # Total only changes on writes (bump_version), so it is counted once per filter set
+    filtered = query
+    total = cached_count(table_name, tuple(filters), lambda: filtered.order_by(None).count())
+
+    if request.args.get('cursor'):
+        try:
+            last_value, last_pk = _decode_cursor(request.args['cursor'])
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.filter(_after_cursor(attrs[sort], attrs[pk], last_value, last_pk, descending))
+
+    if sort == pk:
+        order = [attrs[pk].desc() if descending else attrs[pk].asc()]
+    else:
+        order = [attrs[sort].desc(), attrs[pk].desc()] if descending else [attrs[sort].asc(), attrs[pk].asc()]
+    if sort not in columns:
+        query = query.add_columns(attrs[sort])
+
+    rows = query.order_by(*order).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    data = [dict(zip(columns, row)) for row in rows]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        last_value = last[len(columns)] if sort not in columns else last[columns.index(sort)]
+        next_cursor = _encode_cursor([last_value, last[columns.index(pk)]])
+
     return jsonify({
         "items": data,
         "total": total,
-        "page": page,
         "per_page": per_page,
-        "total_pages": (total + per_page - 1) // per_page,
-        "columns": [c.key for c in inspect(model).mapper.column_attrs]
+        "next_cursor": next_cursor,
+        "columns": columns,
+        "pk": pk
     })
 
 @app.route('/api/master-data/<table_name>', methods=['POST'])
 @login_required
 def create_master_data(table_name):
-    model = MODEL_MAP.get(table_name)
-    if not model:
+    meta = MODEL_MAP.get(table_name)
+    if not meta:
         return jsonify({"error": "Invalid table name"}), 400
+    model = meta['model']
     
     data = request.get_json()
     try:
         new_item = model(**data)
         db_session.add(new_item)
         db_session.commit()
+        bump_version(table_name)
         return jsonify({"message": "Created successfully"}), 201
     except Exception as e:
         db_session.rollback()
@@ -266,12 +370,12 @@ def create_master_data(table_name):
 @app.route('/api/master-data/<table_name>/<path:pk_value>', methods=['PUT'])
 @login_required
 def update_master_data(table_name, pk_value):
-    model = MODEL_MAP.get(table_name)
-    if not model:
+    meta = MODEL_MAP.get(table_name)
+    if not meta:
         return jsonify({"error": "Invalid table name"}), 400
+    model = meta['model']
     
-    # Get PK attribute name
-    pk_column = inspect(model).primary_key[0].key
+    pk_column = meta['pk']
     item = db_session.query(model).filter(getattr(model, pk_column) == pk_value).first()
     
     if not item:
@@ -283,6 +387,7 @@ def update_master_data(table_name, pk_value):
             if hasattr(item, key) and key != pk_column:
                 setattr(item, key, value)
         db_session.commit()
+        bump_version(table_name)
         return jsonify({"message": "Updated successfully"}), 200
     except Exception as e:
         db_session.rollback()
@@ -291,11 +396,12 @@ def update_master_data(table_name, pk_value):
 @app.route('/api/master-data/<table_name>/<path:pk_value>', methods=['DELETE'])
 @login_required
 def delete_master_data(table_name, pk_value):
-    model = MODEL_MAP.get(table_name)
-    if not model:
+    meta = MODEL_MAP.get(table_name)
+    if not meta:
         return jsonify({"error": "Invalid table name"}), 400
+    model = meta['model']
     
-    pk_column = inspect(model).primary_key[0].key
+    pk_column = meta['pk']
     item = db_session.query(model).filter(getattr(model, pk_column) == pk_value).first()
     
     if not item:
@@ -304,11 +410,131 @@ def delete_master_data(table_name, pk_value):
     try:
         db_session.delete(item)
         db_session.commit()
+        bump_version(table_name)
         return jsonify({"message": "Deleted successfully"}), 200
     except Exception as e:
         db_session.rollback()
         return jsonify({"error": str(e)}), 500
 
+MAX_BATCH_OPERATIONS = 1000
+
+@app.route('/api/master-data/<table_name>/batch', methods=['PATCH'])
+@login_required
+def batch_master_data(table_name):
+    """
+    Apply a list of operations in one transaction:
+      {"operations": [{"op": "create", "data": {...}},
+                      {"op": "update", "id": pk, "data": {...}},
+                      {"op": "delete", "id": pk}]}
+    Each operation runs in its own SAVEPOINT, so a failing item is rolled back and reported
+    without affecting the others. Returns one result per operation, in order.
+    """
+    meta = MODEL_MAP.get(table_name)
+    if not meta:
+        return jsonify({"error": "Invalid table name"}), 400
+    model, pk_column = meta['model'], meta['pk']
+
+    operations = (request.get_json(silent=True) or {}).get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "operations must be a non-empty list"}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({"error": f"At most {MAX_BATCH_OPERATIONS} operations per batch"}), 400
+
+    try:
+        begin_immediate(db_session)
+
+        # Load every row targeted by an update/delete with one query
+        target_ids = {str(op.get('id')) for op in operations if isinstance(op, dict) and op.get('op') in ('update', 'delete')}
+        items = {}
+        if target_ids:
+            for item in db_session.query(model).filter(meta['attrs'][pk_column].in_(target_ids)):
+                items[str(getattr(item, pk_column))] = item
+
+        results = []
+        for index, op in enumerate(operations):
+            kind = op.get('op') if isinstance(op, dict) else None
+            result = {"index": index, "op": kind}
+            savepoint = db_session.begin_nested()
+            try:
+                data = (op.get('data') or {}) if kind else {}
+                if kind == 'create':
+                    item = model(**data)
+                    db_session.add(item)
+                    db_session.flush()
+                    result["id"] = getattr(item, pk_column)
+                elif kind in ('update', 'delete'):
+                    result["id"] = op.get('id')
+                    item = items.get(str(op.get('id')))
+                    if item is None:
+                        raise LookupError("Item not found")
+                    if kind == 'update':
+                        for key, value in data.items():
+                            if key not in meta['attrs']:
+                                raise KeyError(f"Unknown column: {key}")
+                            if key != pk_column:
+                                setattr(item, key, value)
+                    else:
+                        db_session.delete(item)
+                    db_session.flush()
+                    if kind == 'delete':
+                        items.pop(str(op.get('id')))
+                else:
+                    raise ValueError(f"Unknown op: {kind}")
+                savepoint.commit()
+                result["status"] = "ok"
+            except Exception as e:
+                savepoint.rollback()
+                result["status"] = "error"
+                result["error"] = str(e.args[0]) if isinstance(e, (LookupError, KeyError)) and e.args else str(e)
+            results.append(result)
+
+        db_session.commit()
+        succeeded = sum(1 for r in results if r["status"] == "ok")
+        if succeeded:
+            bump_version(table_name)
+        return jsonify({"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}), 200
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/master-data/<table_name>/import', methods=['POST'])
+@login_required
+def import_master_data(table_name):
+    """Upsert rows from an uploaded CSV/XLSX file (multipart field 'file') in one transaction"""
+    meta = MODEL_MAP.get(table_name)
+    if not meta:
+        return jsonify({"error": "Invalid table name"}), 400
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    try:
+        result = import_rows(db_session, meta, iter_upload_chunks(upload))
+        db_session.commit()
+        bump_version(table_name)
+        return jsonify({"message": f"Imported {result['rows']} rows", **result}), 200
+    except ImportValidationError as e:
+        db_session.rollback()
+        return jsonify({"error": str(e), "errors": e.errors}), 400
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/master-data/<table_name>/export', methods=['GET'])
+@login_required
+def export_master_data(table_name):
+    """Stream the table as CSV (default) or XLSX (?format=xlsx)"""
+    meta = MODEL_MAP.get(table_name)
+    if not meta:
+        return jsonify({"error": "Invalid table name"}), 400
+
+    if request.args.get('format', 'csv').lower() == 'xlsx':
+        body, mimetype, ext = stream_xlsx(engine, meta), 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'
+    else:
+        body, mimetype, ext = stream_csv(engine, meta), 'text/csv; charset=utf-8', 'csv'
+    filename = f"{table_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}"
+    return Response(body, mimetype=mimetype, headers={"Content-Disposition": f"attachment; filename={filename}"})
+
 # ==================== WORK DIARY API ====================
 
 @app.route('/api/work-diary', methods=['GET'])
@@ -320,17 +546,34 @@ def get_work_entries():
     hashtag_filter = request.args.get('hashtag')
     from_date = request.args.get('from_date')
     to_date = request.args.get('to_date')
+    cursor = request.args.get('cursor')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
 
-    query = db_session.query(WorkDiary)
+    # Author via join and comment count via a correlated COUNT on comments(work_entry_id),
+    # so one query returns the whole page without loading authors/comments per entry
+    comment_count = (
+        select(func.count(Comment.id))
+        .where(Comment.work_entry_id == WorkDiary.id)
+        .correlate(WorkDiary)
+        .scalar_subquery()
+    )
+    query = (
+        db_session.query(
+            WorkDiary.id, WorkDiary.title, WorkDiary.status, WorkDiary.created_at, WorkDiary.author_id,
+            User.userid, comment_count.label('comment_count')
+        )
+        .outerjoin(User, WorkDiary.author_id == User.id)
+    )
     
     if status_filter:
         query = query.filter(WorkDiary.status == status_filter)
     if author_filter:
-        query = query.join(User).filter(User.userid.like(f"%{author_filter}%"))
-    if keyword_filter:
-        query = query.filter(WorkDiary.title.like(f"%{keyword_filter}%"))
+        query = query.filter(User.userid.like(f"%{author_filter}%"))
     if hashtag_filter:
-        query = query.filter(WorkDiary.hashtags.like(f"%{hashtag_filter}%"))
+        # Exact match on the normalized tag (ix_diary_hashtags_tag), so #ship does not match #shipping
+        query = query.filter(WorkDiary.id.in_(
+            select(DiaryHashtag.work_entry_id).where(DiaryHashtag.tag == normalize_tag(hashtag_filter))
+        ))
     if from_date:
         query = query.filter(WorkDiary.created_at >= datetime.strptime(from_date, '%Y-%m-%d'))
     if to_date:
@@ -338,19 +581,64 @@ def get_work_entries():
         end_date = datetime.strptime(to_date, '%Y-%m-%d') + timedelta(days=1)
         query = query.filter(WorkDiary.created_at < end_date)
     
-    entries = query.order_by(WorkDiary.created_at.desc()).all()
+    # Keyword search goes through the full-text index (title, content, hashtags, comments)
+    # and orders by relevance; otherwise newest first.
+    # Keyset pagination on (sort key, id): cursor is "<sort key>|<id>" of the last entry seen
+    if keyword_filter:
+        fts = search_subquery(keyword_filter)
+        query = query.join(fts, fts.c.entry_id == WorkDiary.id).add_columns(fts.c.rank, fts.c.snippet)
+        sort_col, parse_key = fts.c.rank, float
+        order = (fts.c.rank.asc(), WorkDiary.id.desc())
+    else:
+        sort_col, parse_key = WorkDiary.created_at, datetime.fromisoformat
+        order = (WorkDiary.created_at.desc(), WorkDiary.id.desc())
+
+    if cursor:
+        try:
+            cursor_key, cursor_id = cursor.rsplit('|', 1)
+            cursor_key, cursor_id = parse_key(cursor_key), int(cursor_id)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        after = sort_col > cursor_key if keyword_filter else sort_col < cursor_key
+        query = query.filter(or_(after, and_(sort_col == cursor_key, WorkDiary.id < cursor_id)))
+
+    rows = query.order_by(*order).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
     data = []
-    for entry in entries:
-        data.append({
-            "id": entry.id,
-            "title": entry.title,
-            "author": entry.author.userid,
-            "status": entry.status,
-            "created_at": entry.created_at.strftime('%Y-%m-%d %H:%M'),
-            "comment_count": len(entry.comments),
-            "is_author": entry.author_id == current_user.id or current_user.is_admin
-        })
-    return jsonify(data)
+    for row in rows:
+        item = {
+            "id": row.id,
+            "title": row.title,
+            "author": row.userid,
+            "status": row.status,
+            "created_at": row.created_at.strftime('%Y-%m-%d %H:%M'),
+            "comment_count": row.comment_count,
+            "is_author": row.author_id == current_user.id or current_user.is_admin
+        }
+        if keyword_filter:
+            item["snippet"] = format_snippet(row.snippet, keyword_filter)
+        data.append(item)
+
+    next_cursor = None
+    if has_more:
+        last_key = repr(rows[-1].rank) if keyword_filter else rows[-1].created_at.isoformat()
+        next_cursor = f"{last_key}|{rows[-1].id}"
+    return jsonify({"items": data, "next_cursor": next_cursor})
+
+@app.route('/api/work-diary/hashtags', methods=['GET'])
+@login_required
+def get_work_hashtags():
+    """Tag cloud: entry count per tag from the hashtag_counts aggregate"""
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    rows = (
+        db_session.query(HashtagCount.tag, HashtagCount.entry_count)
+        .order_by(HashtagCount.entry_count.desc(), HashtagCount.tag)
+        .limit(limit)
+        .all()
+    )
+    return jsonify([{"tag": row.tag, "count": row.entry_count} for row in rows])
 
 @app.route('/api/work-diary', methods=['POST'])
 @login_required
@@ -517,69 +805,107 @@ def reject_user(user_id):
     
     return redirect(url_for('admin'))
 
-# ==================== GLOP DRIVER SSE ====================
+# ==================== GLOP DRIVER JOBS ====================
 
-# Global queue for log messages
-log_queues = {}
+def run_glop_driver(product, supplier, log_queue):
+    """Run the GLOP driver; logs go to log_queue (see glop_jobs.JobEvents)"""
+    import sys
+    driver_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'driver')
+    if driver_dir not in sys.path:
+        sys.path.insert(0, driver_dir)
+
+    from main import main as drive_main
+
+    # 실제 드라이버 실행
+    drive_main(product_category=product, supplier_category=supplier, log_queue=log_queue)
+
+glop_jobs = JobManager(lambda product, supplier, log_queue: run_glop_driver(product, supplier, log_queue))
+glop_jobs.recover()
+
+def job_event_stream(job_id):
+    """SSE stream of a job's events; the job keeps running when the client disconnects"""
+    job = glop_jobs.get(job_id)
+    try:
+        last_seq = int(request.headers.get('Last-Event-ID', -1))
+    except ValueError:
+        last_seq = -1
+    events = glop_jobs.subscribe(job_id, last_seq=last_seq)
 
-@app.route('/api/drive_glop')
-@login_required
-def drive_glop():
-    product = request.args.get('product', 'monitor')
-    supplier = request.args.get('supplier', 'LGEKR')
-    user_id = current_user.id
-    
     def generate():
-        q = queue.Queue()
-        session_id = f"{user_id}_{datetime.now().timestamp()}"
-        log_queues[session_id] = q
-        
-        # Start driver in background thread
-        thread = threading.Thread(
-            target=run_glop_driver,
-            args=(product, supplier, q)
-        )
-        thread.start()
-        
-        try:
-            while True:
-                try:
-                    msg = q.get(timeout=120)
-                    if msg is None:
-                        break
-                    yield f"data: {json.dumps(msg)}\n\n"
-                except queue.Empty:
-                    yield f"data: {json.dumps({'type': 'heartbeat'})}\n\n"
-        finally:
-            if session_id in log_queues:
-                del log_queues[session_id]
-    
+        yield f"data: {json.dumps({'type': 'job', 'job': job})}\n\n"
+        if events is None:
+            # Job was run by an earlier server process: only its final state is known
+            yield f"data: {json.dumps({'type': 'status', 'message': job['status'], 'status': job['status']})}\n\n"
+            return
+        for item in events:
+            if item is None:
+                yield f"data: {json.dumps({'type': 'heartbeat'})}\n\n"
+                continue
+            seq, event = item
+            if seq is None:
+                yield f"data: {json.dumps(event)}\n\n"
+            else:
+                yield f"id: {seq}\ndata: {json.dumps(event)}\n\n"
+
     return Response(generate(), mimetype='text/event-stream')
 
-def run_glop_driver(product, supplier, log_queue):
-    """Run GLOP driver and send logs to queue"""
+@app.route('/api/glop-jobs', methods=['POST'])
+@login_required
+def submit_glop_job():
+    payload = request.get_json(silent=True) or {}
+    product = payload.get('product') or 'monitor'
+    supplier = payload.get('supplier') or 'LGEKR'
     try:
-        log_queue.put({'type': 'log', 'message': f'GLOP Driver 시작: Product={product}, Supplier={supplier}'})
-        log_queue.put({'type': 'status', 'message': '실행 중', 'status': 'pending'})
-        
-        # Import and run driver
-        import sys
-        import os
-        driver_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'driver')
-        if driver_dir not in sys.path:
-            sys.path.insert(0, driver_dir)
-        
-        from main import main as drive_main
-        
-        # 실제 드라이버 실행
-        drive_main(product_category=product, supplier_category=supplier, log_queue=log_queue)
-        
-        log_queue.put({'type': 'complete'})
-        
+        job, reused = glop_jobs.submit(product, supplier, user_id=current_user.id)
+        if job is None:
+            return jsonify({"error": "An identical GLOP job is being submitted, try again"}), 409
+        return jsonify({"job": job, "reused": reused}), 200 if reused else 201
     except Exception as e:
-        log_queue.put({'type': 'error', 'message': f"드라이버 실행 중 오류 발생: {str(e)}"})
-    finally:
-        log_queue.put(None)
+        logger.error(f"GLOP job submit error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/glop-jobs', methods=['GET'])
+@login_required
+def list_glop_jobs():
+    active_only = request.args.get('active') in ('1', 'true')
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    return jsonify({"jobs": glop_jobs.list(limit=limit, active_only=active_only)}), 200
+
+@app.route('/api/glop-jobs/<job_id>', methods=['GET'])
+@login_required
+def get_glop_job(job_id):
+    job = glop_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"job": job}), 200
+
+@app.route('/api/glop-jobs/<job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_glop_job(job_id):
+    job = glop_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not current_user.is_admin and job['requested_by'] != current_user.id:
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify({"job": glop_jobs.cancel(job_id)}), 200
+
+@app.route('/api/glop-jobs/<job_id>/events')
+@login_required
+def glop_job_events(job_id):
+    if glop_jobs.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+    return job_event_stream(job_id)
+
+@app.route('/api/drive_glop')
+@login_required
+def drive_glop():
+    """Submit (or join the identical running) job and subscribe to its events"""
+    product = request.args.get('product', 'monitor')
+    supplier = request.args.get('supplier', 'LGEKR')
+    job, _ = glop_jobs.submit(product, supplier, user_id=current_user.id)
+    if job is None:
+        return jsonify({"error": "An identical GLOP job is being submitted, try again"}), 409
+    return job_event_stream(job['id'])
 
 # ==================== API ROUTES ====================
 
@@ -589,32 +915,249 @@ def health_check():
 
 @app.route('/upsert_shipment_plan', methods=['POST'])
 def upsert_shipment_plan():
+    """
+    Accepts a JSON array of records, or a column-oriented body (columnar JSON, Arrow IPC,
+    Parquet; optionally gzip-encoded) which is bound with executemany without a dict per row.
+    See plan_ingest for the accepted Content-Types.
+    """
+    started = time.perf_counter()
     try:
-        data = request.get_json()
+        try:
+            fmt, data = decode_plan_payload(read_body(request), request.content_type)
+        except (ValueError, OSError) as e:
+            return jsonify({"error": str(e)}), 400
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
-        df = pd.DataFrame(data)
-        
-        df = df.rename(columns={
-            'From Site': 'From_Site',
-            'To Site': 'To_Site',
-            'Mapping Model.Suffix': 'Mapping_Model_Suffix',
-            'Rep PMS': 'Rep_PMS',
-            'Week Name': 'Week_Name'
-        })
-        
-        row_count = upsert_dataframe(df, ShipmentPlan)
+        planweeks = ({r.get('Planweek') for r in data} if fmt == 'records'
+                     else set(data.get('Planweek') or []))
+        # Re-uploading an old plan: bring its sealed/archived snapshot back to shipment_plans first;
+        # compact() leaves these Planweeks alone until the upsert is done
+        with uploading(planweeks):
+            if fmt == 'records':
+                df = pd.DataFrame(data)
+
+                df = df.rename(columns={
+                    'From Site': 'From_Site',
+                    'To Site': 'To_Site',
+                    'Mapping Model.Suffix': 'Mapping_Model_Suffix',
+                    'Rep PMS': 'Rep_PMS',
+                    'Week Name': 'Week_Name'
+                })
 
+                row_count = upsert_dataframe(df, ShipmentPlan)
+                rows = len(df)
+            else:
+                try:
+                    row_count = upsert_columns(data, ShipmentPlan)
+                except ValueError as e:
+                    return jsonify({"error": str(e)}), 400
+                rows = len(next(iter(data.values())))
+            refresh_registry(planweeks)
+        refresh_cube(planweeks)
+
+        elapsed = time.perf_counter() - started
         return jsonify({
             "message": "Upsert successful",
-            "rows_affected": row_count
+            "rows_affected": row_count,
+            "rows": rows,
+            "format": fmt,
+            "elapsed_sec": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed) if elapsed > 0 else None
         }), 200
 
     except Exception as e:
         logger.error(f"Error during upsert: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Resumable chunked upload (see plan_upload.py for the protocol)
+
+@app.route('/upsert_shipment_plan/sessions', methods=['POST'])
+def open_plan_upload():
+    body = request.get_json(silent=True) or {}
+    try:
+        session_id = open_session(body.get('total_chunks'))
+        return jsonify({"session_id": session_id}), 201
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        logger.error(f"Error opening upload session: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/upsert_shipment_plan/sessions/<session_id>', methods=['GET'])
+def get_plan_upload(session_id):
+    try:
+        return jsonify(session_status(session_id)), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+
+@app.route('/upsert_shipment_plan/sessions/<session_id>/chunks/<int:chunk_no>', methods=['PUT'])
+def put_plan_upload_chunk(session_id, chunk_no):
+    try:
+        try:
+            fmt, data = decode_plan_payload(read_body(request), request.content_type)
+            columns = records_to_columns(data) if fmt == 'records' else data
+            return jsonify(put_chunk(session_id, chunk_no, columns, ShipmentPlan)), 200
+        except (ValueError, OSError) as e:
+            return jsonify({"error": str(e)}), 400
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        logger.error(f"Error staging chunk {chunk_no} of {session_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/upsert_shipment_plan/sessions/<session_id>/commit', methods=['POST'])
+def commit_plan_upload(session_id):
+    started = time.perf_counter()
+    body = request.get_json(silent=True) or {}
+    try:
+        result = commit_session(session_id, ShipmentPlan, body.get('total_chunks'))
+        elapsed = time.perf_counter() - started
+        return jsonify({"message": "Upsert successful", **result, "elapsed_sec": round(elapsed, 3)}), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        logger.error(f"Error committing upload session {session_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/upsert_shipment_plan/sessions/<session_id>', methods=['DELETE'])
+def abort_plan_upload(session_id):
+    try:
+        abort_session(session_id)
+        return jsonify({"message": "Upload session aborted"}), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+
+# Planweek snapshots (see plan_snapshots.py)
+
+@app.route('/api/plan-snapshots', methods=['GET'])
+@login_required
+def get_plan_snapshots():
+    return jsonify(list_snapshots()), 200
+
+@app.route('/api/plan-snapshots/compact', methods=['POST'])
+@login_required
+def compact_plan_snapshots():
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+    body = request.get_json(silent=True) or {}
+    try:
+        kwargs = {k: int(body[k]) for k in ('keep_live', 'keep_sealed') if k in body}
+        return jsonify(compact(**kwargs)), 200
+    except Exception as e:
+        logger.error(f"Error compacting plan snapshots: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/container-simulation', methods=['GET'])
+@login_required
+def get_container_simulation():
+    """
+    mode=pivot (default): per-model division pivot for the page.
+    mode=packing: mixed-load container counts and fill rates per (week, To Site);
+    exact=true adds the branch-and-bound refinement, week= / to_site= narrow the groups.
+    """
+    planweek = request.args.get('planweek') or None
+    try:
+        if request.args.get('mode') == 'packing':
+            result, cached = simulate_packing(
+                planweek,
+                exact=request.args.get('exact', '').lower() in ('1', 'true', 'yes'),
+                week=request.args.get('week') or None,
+                to_site=request.args.get('to_site') or None,
+            )
+        else:
+            result, cached = simulate(planweek)
+        return jsonify({**result, "cached": cached}), 200
+    except KeyError as e:
+        return jsonify({"error": str(e.args[0])}), 404
+    except Exception as e:
+        logger.error(f"Error running container simulation: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+# SP cube (see sp_cube.py); filters are repeated query parameters, e.g. ?region=EU&region=CIS
+
+def _cube_filters():
+    filters = {dim: request.args.getlist(dim) for dim in DIMENSIONS if request.args.getlist(dim)}
+    if filters.get('planweek') == ['latest']:
+        filters['planweek'] = [latest_planweek()]
+    return filters
+
+@app.route('/api/sp-cube', methods=['GET'])
+@login_required
+def get_sp_cube():
+    started = time.perf_counter()
+    group_by = [d for d in request.args.get('group_by', 'week_name').split(',') if d]
+    try:
+        rows = query_cube(group_by, _cube_filters())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "group_by": group_by,
+        "rows": rows,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }), 200
+
+@app.route('/api/sp-cube/dimensions', methods=['GET'])
+@login_required
+def get_sp_cube_dimensions():
+    try:
+        return jsonify({"latest_planweek": latest_planweek(), **dimension_values(_cube_filters())}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+# GLOP Report (see glop_report.py)
+
+GLOP_REPORT_FILTERS = ('week_from', 'week_to', 'month', 'to_site', 'region', 'model', 'only_variance')
+
+def _glop_report_filters():
+    return {key: request.args.get(key) for key in GLOP_REPORT_FILTERS if request.args.get(key)}
+
+@app.route('/api/glop-report', methods=['GET'])
+@login_required
+def get_glop_report():
+    try:
+        result = report_page(
+            request.args.get('planweek') or None,
+            _glop_report_filters(),
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', 100, type=int),
+            sort=request.args.get('sort', 'week'),
+            level=request.args.get('level', 'detail'),
+        )
+        return jsonify(result), 200
+    except KeyError as e:
+        return jsonify({"error": str(e.args[0])}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error building GLOP report: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/glop-report/export', methods=['GET'])
+@login_required
+def export_glop_report():
+    planweek = request.args.get('planweek') or latest_planweek()
+    if planweek is None:
+        # No snapshots uploaded yet (the JSON report answers 404 as well)
+        return jsonify({"error": "No shipment plan snapshots"}), 404
+    try:
+        rows = iter_report_rows(planweek, _glop_report_filters(), sort=request.args.get('sort', 'week'))
+        body = spool_xlsx('GLOP Report', REPORT_COLUMNS, rows)
+        # Start the generator so unknown Planweeks / sorts fail before the response starts
+        first = next(body, b'')
+    except KeyError as e:
+        return jsonify({"error": str(e.args[0])}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def stream():
+        yield first
+        yield from body
+
+    filename = f"glop_report_{planweek}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    return Response(stream(), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
 def get_local_ip():
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -0,0 +1,79 @@
+"""
+Benchmark: /upsert_shipment_plan with the original JSON records body against the
+column-oriented bodies (gzip columnar JSON, Arrow IPC, Parquet).
+
+Bodies are built with test_client.encode_dataframe, the same wire format the upload
+client sends. Requests go through the Flask test client, so body decoding is included
+in the timing.
+A scratch database is used so mnt_data.db is never touched.
+
+    python server/bench_plan_ingest.py [--no-records] [rows ...]    (default: 100000 1000000)
+
+The records path compiles one multi-row INSERT per 5000 rows and runs at a few hundred
+rows/s, so 1M rows takes about half an hour; --no-records skips it.
+"""
+import os
+import sys
+import tempfile
+import time
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix='plan_ingest_bench_')
+os.environ['ORCA_DB_PATH'] = os.path.join(SCRATCH_DIR, 'bench.db')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from sqlalchemy import text
+from app import app
+from database import engine
+from test_client import encode_dataframe
+
+
+def make_plan(n):
+    weeks = [f"2025-{(i % 12) + 1:02d}-{(i % 4) * 7 + 1:02d}(W{i:02d})" for i in range(52)]
+    return pd.DataFrame({
+        'Planweek': '202501',
+        'Created_at': '2025-01-06',
+        'Division': 'MNT',
+        'From Site': [f"SITE{i % 8}" for i in range(n)],
+        'Region': 'EU',
+        'To Site': [f"TO{(i // 52) % 997}" for i in range(n)],
+        'Mapping Model.Suffix': [f"27GQ50F-B.{(i // (52 * 997)):05d}" for i in range(n)],
+        'Rep PMS': 'PMS',
+        'Category': 'MNT',
+        'Frozen': 'N',
+        'Month': '2025-01',
+        'Week Name': [weeks[i % 52] for i in range(n)],
+        'SP': [i % 500 for i in range(n)],
+    })
+
+
+def run(client, df, fmt):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM shipment_plans"))
+    body, headers = encode_dataframe(df, fmt)
+
+    started = time.perf_counter()
+    response = client.post('/upsert_shipment_plan', data=body, headers=headers)
+    elapsed = time.perf_counter() - started
+    result = response.get_json()
+    assert response.status_code == 200, result
+
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT COUNT(*) FROM shipment_plans")).scalar()
+    assert stored == len(df), (fmt, stored)
+    print(f"  {fmt:<13} body {len(body) / 1e6:8.1f} MB  {elapsed:7.2f} s  {len(df) / elapsed:10,.0f} rows/s")
+    return elapsed
+
+
+if __name__ == '__main__':
+    with_records = '--no-records' not in sys.argv
+    sizes = [int(a) for a in sys.argv[1:] if not a.startswith('--')] or [100000, 1000000]
+    client = app.test_client()
+    for n in sizes:
+        df = make_plan(n)
+        print(f"\n{n:,} rows")
+        baseline = run(client, df, 'records') if with_records else None
+        for fmt in ('columns', 'arrow', 'parquet'):
+            elapsed = run(client, df, fmt)
+            if baseline:
+                print(f"  {'':<13} {baseline / elapsed:.1f}x vs records")
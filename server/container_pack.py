@@ -0,0 +1,180 @@
+"""
+Mixed-load container packing.
+
+A container of type T holds qty_T units of a single model (monitor_stuffing), so one unit of
+model m takes 1/qty_T(m) of the container. Packing one (week, To Site) shipment into as few
+containers as possible is bin packing with those fractional sizes:
+
+1. Dominance reduction: every full container of one model (SP // qty units) is part of some
+   optimal packing, so only the remainders (SP % qty) are packed below.
+2. First-fit decreasing over the remainders, largest unit first. Identical units are placed
+   as a group (as many as fit per container), which is the same as unit-wise FFD.
+3. Optional exact refinement: a depth-first branch-and-bound tries to fit the remainders in
+   k = lower bound .. FFD - 1 containers, within a node budget per container count.
+
+This module has no database imports so it can run on a process pool (see pack_groups).
+"""
+import atexit
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+CONTAINER_TYPES = ('20FT', '40FT', '40HC')
+EPS = 1e-9
+DEFAULT_NODE_BUDGET = 100000
+# Fewer groups than this are solved in-process; pool start-up would cost more than it saves
+MIN_POOL_GROUPS = 64
+MAX_WORKERS = int(os.environ.get('ORCA_PACKING_WORKERS', os.cpu_count() or 1))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _ffd(items):
+    """items: [(size, count)] sorted by size desc. Returns the number of containers used."""
+    free = []
+    for size, count in items:
+        for b in range(len(free)):
+            if count == 0:
+                break
+            take = min(count, int((free[b] + EPS) / size))
+            free[b] -= take * size
+            count -= take
+        while count:
+            take = min(count, int((1 + EPS) / size))
+            free.append(1.0 - take * size)
+            count -= take
+    return len(free)
+
+
+def _fits(items, k, budget):
+    """
+    True/False if items fit in k containers; None if the node budget ran out first.
+    Units of one model are distributed over the containers in order, largest count first.
+    """
+    free = [1.0] * k
+    tail_volume = [0.0] * (len(items) + 1)
+    for i in range(len(items) - 1, -1, -1):
+        tail_volume[i] = tail_volume[i + 1] + items[i][0] * items[i][1]
+    nodes = 0
+
+    def place(i, b, left):
+        nonlocal nodes
+        nodes += 1
+        if nodes > budget:
+            raise _BudgetExceeded
+        if left == 0:
+            return i + 1 == len(items) or place(i + 1, 0, items[i + 1][1])
+        if b == k:
+            return False
+        size = items[i][0]
+        if left * size + tail_volume[i + 1] > sum(free) + EPS:
+            return False
+        most = min(left, int((free[b] + EPS) / size))
+        # Empty containers are interchangeable: if the previous one stayed empty, so does this one
+        if b > 0 and free[b - 1] > 1 - EPS and free[b] > 1 - EPS:
+            most = 0
+        for c in range(most, -1, -1):
+            free[b] -= c * size
+            if place(i, b + 1, left - c):
+                return True
+            free[b] += c * size
+        return False
+
+    try:
+        return place(0, 0, items[0][1]) if items else True
+    except _BudgetExceeded:
+        return None
+
+
+def pack(quantities, exact=False, node_budget=DEFAULT_NODE_BUDGET):
+    """
+    quantities: [(qty, capacity)] for one container type (capacity = units per container).
+    Returns {containers, fill_rate, lower_bound, optimal}.
+    """
+    full = 0
+    volume = 0.0
+    remainders = {}
+    for qty, capacity in quantities:
+        if qty <= 0:
+            continue
+        full += qty // capacity
+        volume += qty / capacity
+        if qty % capacity:
+            remainders[capacity] = remainders.get(capacity, 0) + qty % capacity
+
+    items = sorted(((1.0 / capacity, count) for capacity, count in remainders.items()), reverse=True)
+    rest = _ffd(items)
+    rest_bound = math.ceil(sum(size * count for size, count in items) - EPS)
+    optimal = rest == rest_bound
+
+    if exact and not optimal:
+        proven = True
+        for k in range(rest_bound, rest):
+            found = _fits(items, k, node_budget)
+            if found:
+                rest = k
+                break
+            proven = proven and found is False
+        optimal = proven
+
+    containers = full + rest
+    return {
+        "containers": containers,
+        "fill_rate": round(volume / containers, 4) if containers else 0.0,
+        "lower_bound": math.ceil(volume - EPS),
+        "optimal": optimal,
+    }
+
+
+def pack_group(lines, exact=False, node_budget=DEFAULT_NODE_BUDGET):
+    """
+    lines: [(qty, (qty_20ft, qty_40ft, qty_40hc))] of one shipment group.
+    Returns {type: pack() result + unpacked (qty of models without capacity for that type)}.
+    """
+    result = {}
+    for t, container_type in enumerate(CONTAINER_TYPES):
+        packable = [(qty, caps[t]) for qty, caps in lines if caps[t] and caps[t] > 0]
+        result[container_type] = pack(packable, exact, node_budget)
+        result[container_type]["unpacked"] = sum(qty for qty, caps in lines if not (caps[t] and caps[t] > 0))
+    return result
+
+
+def _pack_chunk(args):
+    groups, exact, node_budget = args
+    return [pack_group(lines, exact, node_budget) for lines in groups]
+
+
+def _get_executor(workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(shutdown_executor)
+        return _executor
+
+
+def shutdown_executor():
+    """Stop the packing pool's worker processes (registered with atexit when the pool starts)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def pack_groups(groups, exact=False, node_budget=DEFAULT_NODE_BUDGET, workers=MAX_WORKERS):
+    """Solve every group independently; large inputs are split across a process pool"""
+    if workers <= 1 or len(groups) < MIN_POOL_GROUPS:
+        return _pack_chunk((groups, exact, node_budget))
+    chunk = max(1, len(groups) // (workers * 4))
+    chunks = [(groups[i:i + chunk], exact, node_budget) for i in range(0, len(groups), chunk)]
+    results = []
+    for part in _get_executor(workers).map(_pack_chunk, chunks):
+        results.extend(part)
+    return results
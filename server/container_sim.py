@@ -0,0 +1,206 @@
+"""
+Container simulation for the /container-simulation page.
+
+For every row of a shipment plan snapshot (docs/detailed_design.md, 5. Container Simulation Logic):
+
+    series        = Mapping Model.Suffix up to the first '-' or '.'   (27GQ50F-B.AUS -> 27GQ50F)
+    Required_20FT = SP / monitor_stuffing.qty_20ft   (same for 40FT and 40HC)
+
+The series is extracted once per distinct model, matched against the cached stuffing table
+(master_cache.get_stuffing) and broadcast back to the rows, and the requirements are one NumPy
+division over the whole plan. The result is pivoted by Month / Week Name (columns) and To Site
+(rows) and memoized per (Planweek, snapshot updated_at, monitor_stuffing version), so only the
+first page load after an upload or a stuffing edit does the work.
+
+simulate_packing() answers the mixed-load question instead: how many physical containers each
+(week, To Site) shipment takes when models share containers (see container_pack).
+"""
+import threading
+import time
+import numpy as np
+import pandas as pd
+from container_pack import CONTAINER_TYPES, DEFAULT_NODE_BUDGET, pack_groups
+from master_cache import get_stuffing, get_version
+from model_series import extract_series
+from plan_snapshots import snapshot_source, read_snapshot
+
+PLAN_COLUMNS = ['Month', 'Week Name', 'To Site', 'Mapping Model.Suffix', 'SP']
+MAX_CACHED_RESULTS = 16
+
+_lock = threading.Lock()
+_results = {}
+
+
+def _capacity_table(stuffing):
+    """(Index of series, float array [n_series, 3]); missing or non-positive capacities are NaN"""
+    series = pd.Index(list(stuffing), dtype=object)
+    capacity = np.array([[np.nan if q is None else q for q in stuffing[s]] for s in series], dtype=float)
+    capacity = capacity.reshape(len(series), len(CONTAINER_TYPES))
+    capacity[~(capacity > 0)] = np.nan
+    return series, capacity
+
+
+def _rounded(values):
+    return np.round(values, 2).tolist()
+
+
+def simulate_plan(plan, stuffing):
+    """
+    plan: DataFrame with PLAN_COLUMNS. stuffing: dict of series -> (qty_20ft, qty_40ft, qty_40hc).
+    Returns the JSON-ready pivot (see simulate()).
+    """
+    qty = pd.to_numeric(plan['SP'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    codes, models = pd.factorize(plan['Mapping Model.Suffix'].fillna('').astype(str))
+    model_series = extract_series(models)
+    series_index, capacity = _capacity_table(stuffing)
+    row_slot = series_index.get_indexer(model_series)[codes]  # -1: no stuffing data
+    matched = row_slot >= 0
+
+    row_capacity = np.full((len(plan), len(CONTAINER_TYPES)), np.nan)
+    row_capacity[matched] = capacity[row_slot[matched]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        containers = np.nan_to_num(qty[:, None] / row_capacity, nan=0.0)
+
+    frame = pd.DataFrame(containers, columns=list(CONTAINER_TYPES))
+    frame['SP'] = qty
+    frame['Month'] = plan['Month'].fillna('').astype(str).to_numpy()
+    frame['Week Name'] = plan['Week Name'].fillna('').astype(str).to_numpy()
+    frame['To Site'] = plan['To Site'].fillna('').astype(str).to_numpy()
+    values = ['SP', *CONTAINER_TYPES]
+
+    by_cell = frame.groupby(['To Site', 'Month', 'Week Name'], sort=True)[values].sum()
+    by_week = frame.groupby(['Month', 'Week Name'], sort=True)[values].sum()
+    by_month = frame.groupby('Month', sort=True)[values].sum()
+    by_site = frame.groupby('To Site', sort=True)[values].sum()
+
+    weeks = by_week.index
+    sites = by_site.index
+    pivot = {}
+    for value in values:
+        matrix = by_cell[value].unstack(['Month', 'Week Name']).reindex(index=sites, columns=weeks, fill_value=0)
+        pivot[value] = _rounded(matrix.fillna(0).to_numpy())
+
+    unmatched = (
+        pd.DataFrame({'series': extract_series(plan['Mapping Model.Suffix'].fillna('').astype(str))[~matched].to_numpy(),
+                      'SP': qty[~matched]})
+        .groupby('series')['SP'].sum().sort_values(ascending=False)
+    )
+
+    return {
+        "rows": len(plan),
+        "container_types": list(CONTAINER_TYPES),
+        "weeks": [{"month": m, "week": w} for m, w in weeks],
+        "sites": sites.tolist(),
+        "pivot": pivot,
+        "week_totals": {value: _rounded(by_week[value].to_numpy()) for value in values},
+        "month_totals": [{"month": m, **{v: round(float(by_month.at[m, v]), 2) for v in values}} for m in by_month.index],
+        "site_totals": {value: _rounded(by_site[value].to_numpy()) for value in values},
+        "totals": {value: round(float(frame[value].sum()), 2) for value in values},
+        "unmatched": [{"series": s, "SP": float(q)} for s, q in unmatched.items()],
+    }
+
+
+def _memoized(key, compute):
+    with _lock:
+        result = _results.get(key)
+    if result is not None:
+        return result, True
+
+    started = time.perf_counter()
+    result = compute()
+    result.update(elapsed_sec=round(time.perf_counter() - started, 3))
+    with _lock:
+        if len(_results) >= MAX_CACHED_RESULTS:
+            _results.clear()
+        _results[key] = result
+    return result, False
+
+
+def simulate(planweek=None):
+    """
+    Container pivot of one Planweek snapshot (default: latest). Raises KeyError for an unknown
+    Planweek. Returned dicts are shared between callers and must not be modified.
+    """
+    source = snapshot_source(planweek)
+    key = ('pivot', source['planweek'], source['updated_at'], get_version('monitor_stuffing'))
+
+    def compute():
+        result = simulate_plan(read_snapshot(columns=PLAN_COLUMNS, source=source), get_stuffing())
+        result.update(planweek=source['planweek'])
+        return result
+
+    return _memoized(key, compute)
+
+
+def packing_groups(plan, stuffing):
+    """
+    ([(month, week, to_site)], [[(qty, capacities), ...]]): plan quantities summed per model series
+    within each (Month, Week Name, To Site) group. Series without stuffing data get (None, None, None).
+    """
+    frame = pd.DataFrame({
+        'Month': plan['Month'].fillna('').astype(str).to_numpy(),
+        'Week Name': plan['Week Name'].fillna('').astype(str).to_numpy(),
+        'To Site': plan['To Site'].fillna('').astype(str).to_numpy(),
+        'series': extract_series(plan['Mapping Model.Suffix'].fillna('').astype(str)).to_numpy(),
+        'SP': pd.to_numeric(plan['SP'], errors='coerce').fillna(0).astype(int).to_numpy(),
+    })
+    lines = frame.groupby(['Month', 'Week Name', 'To Site', 'series'], sort=True)['SP'].sum()
+    lines = lines[lines > 0]
+
+    keys, groups = [], []
+    missing = (None,) * len(CONTAINER_TYPES)
+    for (month, week, site, series), qty in lines.items():
+        if not keys or keys[-1] != (month, week, site):
+            keys.append((month, week, site))
+            groups.append([])
+        groups[-1].append((int(qty), stuffing.get(series, missing)))
+    return keys, groups
+
+
+def simulate_packing(planweek=None, exact=False, week=None, to_site=None, node_budget=DEFAULT_NODE_BUDGET):
+    """
+    Mixed-load container counts and fill rates per (week, To Site) of one Planweek snapshot,
+    for each container type. `week` / `to_site` restrict the groups that are solved.
+    Memoized like simulate(); raises KeyError for an unknown Planweek.
+    """
+    source = snapshot_source(planweek)
+    key = ('packing', source['planweek'], source['updated_at'], get_version('monitor_stuffing'),
+           bool(exact), week, to_site, node_budget)
+
+    def compute():
+        plan = read_snapshot(columns=PLAN_COLUMNS, source=source)
+        if week:
+            plan = plan[plan['Week Name'] == week]
+        if to_site:
+            plan = plan[plan['To Site'] == to_site]
+        keys, groups = packing_groups(plan, get_stuffing())
+        solved = pack_groups(groups, exact=exact, node_budget=node_budget)
+
+        totals = {t: {"containers": 0, "lower_bound": 0, "unpacked": 0, "volume": 0.0} for t in CONTAINER_TYPES}
+        result_groups = []
+        for (month, week_name, site), lines, packed in zip(keys, groups, solved):
+            result_groups.append({
+                "month": month, "week": week_name, "to_site": site,
+                "SP": sum(qty for qty, _ in lines), **packed
+            })
+            for t in CONTAINER_TYPES:
+                totals[t]["containers"] += packed[t]["containers"]
+                totals[t]["lower_bound"] += packed[t]["lower_bound"]
+                totals[t]["unpacked"] += packed[t]["unpacked"]
+                totals[t]["volume"] += packed[t]["fill_rate"] * packed[t]["containers"]
+        for t in CONTAINER_TYPES:
+            volume = totals[t].pop("volume")
+            totals[t]["fill_rate"] = round(volume / totals[t]["containers"], 4) if totals[t]["containers"] else 0.0
+            totals[t]["optimal_groups"] = sum(1 for g in result_groups if g[t]["optimal"])
+
+        return {
+            "planweek": source['planweek'],
+            "mode": "packing",
+            "exact": bool(exact),
+            "container_types": list(CONTAINER_TYPES),
+            "groups": result_groups,
+            "totals": totals,
+        }
+
+    return _memoized(key, compute)
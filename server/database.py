@@ -1,16 +1,20 @@
-from sqlalchemy import create_engine
+import itertools
+from sqlalchemy import inspect
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.sqlite import insert
 import pandas as pd
-import os
+from db_connection import DB_PATH, create_db_engine
+from db_indexes import ensure_indexes, quote_ident
 
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mnt_data.db")
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(DATABASE_URL)
+engine = create_db_engine()
 db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 
+# Natural key of shipment_plans (_shipment_plan_uc)
+SHIPMENT_PLAN_KEYS = ['Planweek', 'Created_at', 'Division', 'From Site', 'To Site', 'Mapping Model.Suffix', 'Category', 'Week Name']
+
 Base = declarative_base()
 Base.query = db_session.query_property()
 
@@ -18,6 +22,25 @@ def init_db():
     import models
     Base.metadata.create_all(bind=engine)
 
+    # Managed indexes for shipment_data / shipment_plans (no-op when they already exist)
+    conn = engine.raw_connection()
+    try:
+        ensure_indexes(conn)
+        conn.commit()
+    finally:
+        conn.close()
+
+def begin_immediate(session):
+    """
+    Start the session's transaction with BEGIN IMMEDIATE (no-op if one is already open).
+    pysqlite only emits BEGIN right before the first INSERT/UPDATE/DELETE, so a SAVEPOINT
+    issued first would become the outermost transaction and RELEASE would commit it.
+    Taking the write lock up front also avoids a failed read->write upgrade under WAL.
+    """
+    conn = session.connection()
+    if not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
 def upsert_dataframe(df, model_class, batch_size=5000):
     """
     Upserts a pandas DataFrame into the database using the model_class.
@@ -28,7 +51,7 @@ def upsert_dataframe(df, model_class, batch_size=5000):
     if not data:
         return 0
 
-    unique_keys = ['Planweek', 'Created_at', 'Division', 'From Site', 'To Site', 'Mapping Model.Suffix', 'Category', 'Week Name']
+    unique_keys = SHIPMENT_PLAN_KEYS
     total_affected = 0
 
     # Use a single transaction for the entire chunk
@@ -48,3 +71,77 @@ def upsert_dataframe(df, model_class, batch_size=5000):
             total_affected += result.rowcount
             
     return total_affected
+
+def resolve_columns(columns, model_class, unique_keys=SHIPMENT_PLAN_KEYS):
+    """
+    DB column names for the keys of a column-oriented payload {column: values}.
+    Names may be DB names ('From Site') or attribute keys ('From_Site'); the autoincrement
+    id is never accepted. Raises ValueError for unknown/missing key columns or ragged columns.
+    """
+    name_of = {}
+    for prop in inspect(model_class).column_attrs:
+        column = prop.columns[0]
+        if column.primary_key and column.autoincrement:
+            continue
+        name_of[prop.key] = column.name
+        name_of[column.name] = column.name
+
+    unknown = [c for c in columns if c not in name_of]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    names = [name_of[c] for c in columns]
+    missing = [k for k in unique_keys if k not in names]
+    if missing:
+        raise ValueError(f"Missing key columns: {', '.join(missing)}")
+    if len({len(v) for v in columns.values()}) > 1:
+        raise ValueError("All columns must have the same length")
+    return names
+
+def upsert_sql(table_name, names, unique_keys=SHIPMENT_PLAN_KEYS, source=None):
+    """
+    INSERT ... ON CONFLICT (unique_keys) DO UPDATE statement for the columns `names`.
+    Binds one row per execution (VALUES (?, ...)), or reads from a `source` SELECT, which
+    must have a WHERE clause so SQLite does not parse ON CONFLICT as a join constraint.
+    """
+    column_list = ', '.join(quote_ident(n) for n in names)
+    update_cols = [n for n in names if n not in unique_keys]
+    return (
+        f"INSERT INTO {quote_ident(table_name)} ({column_list}) "
+        + (source if source else f"VALUES ({', '.join('?' for _ in names)})")
+        + f" ON CONFLICT ({', '.join(quote_ident(k) for k in unique_keys)}) "
+        + (f"DO UPDATE SET {', '.join(f'{quote_ident(n)} = excluded.{quote_ident(n)}' for n in update_cols)}"
+           if update_cols else "DO NOTHING")
+    )
+
+def upsert_columns(columns, model_class, unique_keys=SHIPMENT_PLAN_KEYS, batch_size=50000):
+    """
+    Upserts column-oriented data: {column: sequence of values}, all of the same length.
+    Column names may be DB names ('From Site') or attribute keys ('From_Site').
+    Rows are bound straight from the columns with executemany on one prepared
+    INSERT ... ON CONFLICT DO UPDATE statement, in a single transaction.
+    """
+    names = resolve_columns(columns, model_class, unique_keys)
+    values = list(columns.values())
+    if not values or not len(values[0]):
+        return 0
+
+    sql = upsert_sql(model_class.__tablename__, names, unique_keys)
+
+    rows = zip(*values)
+    total_affected = 0
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            cursor.executemany(sql, batch)
+            total_affected += cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return total_affected
@@ -0,0 +1,73 @@
+"""
+Shared connection settings for mnt_data.db.
+
+The Flask app (SQLAlchemy engine in database.py) and the GLOP driver (raw sqlite3 in
+driver/main.py) write to the same file from different threads. Every connection is
+opened through this module so that all of them use the same journal mode, locking and
+cache settings. Each value can be overridden with an ORCA_SQLITE_* environment variable.
+"""
+import os
+import sqlite3
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+DB_PATH = os.environ.get(
+    'ORCA_DB_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mnt_data.db")
+)
+
+SQLITE_SETTINGS = {
+    # WAL lets web requests keep reading while the driver holds the write lock
+    'journal_mode': os.environ.get('ORCA_SQLITE_JOURNAL_MODE', 'WAL'),
+    # NORMAL is durable across application crashes in WAL mode and skips the fsync per commit
+    'synchronous': os.environ.get('ORCA_SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.environ.get('ORCA_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    # Negative value = KiB (64 MB page cache per connection)
+    'cache_size': int(os.environ.get('ORCA_SQLITE_CACHE_SIZE', -64000)),
+    # Milliseconds a writer waits for the lock before raising "database is locked"
+    'busy_timeout': int(os.environ.get('ORCA_SQLITE_BUSY_TIMEOUT', 30000)),
+}
+
+POOL_SIZE = int(os.environ.get('ORCA_DB_POOL_SIZE', 10))
+POOL_MAX_OVERFLOW = int(os.environ.get('ORCA_DB_POOL_MAX_OVERFLOW', 20))
+
+
+def apply_pragmas(dbapi_conn, settings=None):
+    """Apply the SQLite PRAGMA settings to a freshly opened DB-API connection."""
+    settings = SQLITE_SETTINGS if settings is None else settings
+    cursor = dbapi_conn.cursor()
+    try:
+        for name, value in settings.items():
+            if value is None:
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def connect(db_path=None, settings=None):
+    """Open a raw sqlite3 connection with the shared settings (used by the GLOP driver)."""
+    settings = SQLITE_SETTINGS if settings is None else settings
+    timeout = (settings.get('busy_timeout') or 5000) / 1000
+    conn = sqlite3.connect(db_path or DB_PATH, timeout=timeout)
+    apply_pragmas(conn, settings)
+    return conn
+
+
+def create_db_engine(db_path=None, settings=None, pool_size=None, max_overflow=None):
+    """Create the SQLAlchemy engine with a connection pool shared by the Flask threads."""
+    settings = SQLITE_SETTINGS if settings is None else settings
+    engine = create_engine(
+        f"sqlite:///{db_path or DB_PATH}",
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=POOL_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        pool_pre_ping=True,
+        connect_args={'check_same_thread': False, 'timeout': (settings.get('busy_timeout') or 5000) / 1000},
+    )
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_conn, connection_record):
+        apply_pragmas(dbapi_conn, settings)
+
+    return engine
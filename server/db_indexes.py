@@ -0,0 +1,61 @@
+"""
+Managed index set for the hot queries.
+
+shipment_data is created by the GLOP driver from whatever columns the Excel export has,
+so its indexes cannot be declared on an ORM model, and create_all() never adds indexes to
+tables that already exist. All indexes for the hot queries are listed here and created
+idempotently at startup (init_db) and after the driver adds new columns. An index whose
+table or columns do not exist yet is skipped and picked up on a later call.
+"""
+
+# shipment_data natural key used by the driver's hash-diffed upsert.
+# Line Seq is the position of the row among rows with the same PO No./Model in the file.
+SHIPMENT_KEY_COLUMNS = ['From Site', 'Data Source', 'PO No.', 'Model', 'Line Seq']
+
+# (index name, table, columns, unique)
+MANAGED_INDEXES = [
+    ('ux_shipment_data_key', 'shipment_data', SHIPMENT_KEY_COLUMNS, True),
+    ('ix_shipment_data_site_po', 'shipment_data', ['From Site', 'PO No.'], False),
+    ('ix_shipment_data_week_name', 'shipment_data', ['Week Name'], False),
+    ('ix_shipment_data_month', 'shipment_data', ['Month'], False),
+    ('ix_shipment_data_ship_to', 'shipment_data', ['Ship To'], False),
+    ('ix_shipment_plans_planweek_week', 'shipment_plans', ['Planweek', 'Week Name'], False),
+    ('ix_shipment_plans_model_suffix', 'shipment_plans', ['Mapping Model.Suffix'], False),
+    # Work Diary list: keyset pagination and per-entry comment counts
+    ('ix_work_diary_created_id', 'work_diary', ['created_at', 'id'], False),
+    ('ix_comments_work_entry_id', 'comments', ['work_entry_id'], False),
+]
+
+
+def quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def ensure_indexes(dbapi_conn, table=None):
+    """
+    Create the missing managed indexes (optionally only those on `table`).
+    Works on a raw sqlite3 connection or a SQLAlchemy raw_connection().
+    Returns the names of the indexes that exist after the call.
+    """
+    cursor = dbapi_conn.cursor()
+    try:
+        columns_by_table = {}
+        ensured = []
+        for name, index_table, columns, unique in MANAGED_INDEXES:
+            if table is not None and index_table != table:
+                continue
+            if index_table not in columns_by_table:
+                cursor.execute(f"PRAGMA table_info({quote_ident(index_table)})")
+                columns_by_table[index_table] = {row[1] for row in cursor.fetchall()}
+            if not set(columns) <= columns_by_table[index_table]:
+                continue
+
+            column_list = ', '.join(quote_ident(c) for c in columns)
+            cursor.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {quote_ident(name)} "
+                f"ON {quote_ident(index_table)} ({column_list})"
+            )
+            ensured.append(name)
+        return ensured
+    finally:
+        cursor.close()
@@ -0,0 +1,142 @@
+"""
+Full-text search for the Work Diary (SQLite FTS5).
+
+work_diary_fts holds one row per entry (rowid = work_diary.id) with the title, the
+content stripped of HTML, the hashtags and the text of all comments. The index is kept
+in sync from the ORM: every flush that touches a WorkDiary or Comment re-indexes the
+affected entries in the same transaction. Existing entries are backfilled at startup.
+
+The trigram tokenizer gives substring matching like the old LIKE '%keyword%' filter,
+which also works for Korean words without word segmentation. Terms shorter than three
+characters cannot use the trigram index and fall back to LIKE over the indexed text.
+"""
+import html
+import re
+from sqlalchemy import event, text, Integer, Float, String
+from sqlalchemy.orm import Session
+from models import WorkDiary, Comment
+
+FTS_TABLE = 'work_diary_fts'
+
+# Column weights for bm25(): title > hashtags > content = comments
+RANK_WEIGHTS = (10.0, 1.0, 5.0, 1.0)
+
+# Private-use markers around highlighted terms; replaced by <mark> after HTML escaping
+_MARK_START, _MARK_END = '\ue000', '\ue001'
+
+_TAG_RE = re.compile(r'<(script|style)\b.*?</\1>|<[^>]+>', re.IGNORECASE | re.DOTALL)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def strip_html(value):
+    """Plain text of an HTML fragment (tags removed, entities decoded, whitespace collapsed)."""
+    if not value:
+        return ''
+    return _SPACE_RE.sub(' ', html.unescape(_TAG_RE.sub(' ', value))).strip()
+
+
+def init_search_index(engine):
+    """Create the FTS table if needed and backfill it when it is out of step with work_diary."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(title, content, hashtags, comments, tokenize='trigram')"
+        ))
+        indexed = conn.execute(text(f"SELECT COUNT(*) FROM {FTS_TABLE}")).scalar()
+        entries = conn.execute(text("SELECT COUNT(*) FROM work_diary")).scalar()
+        if indexed != entries:
+            conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+            ids = [row[0] for row in conn.execute(text("SELECT id FROM work_diary"))]
+            for i in range(0, len(ids), 500):
+                reindex_entries(conn, ids[i:i + 500])
+
+
+def reindex_entries(conn, entry_ids):
+    """Rebuild the FTS rows of entry_ids from work_diary/comments (deleted entries are removed)."""
+    entry_ids = sorted(set(entry_ids))
+    if not entry_ids:
+        return
+    params = {f'id{i}': entry_id for i, entry_id in enumerate(entry_ids)}
+    in_clause = ', '.join(f':id{i}' for i in range(len(entry_ids)))
+
+    conn.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({in_clause})"), params)
+
+    entries = conn.execute(text(
+        f"SELECT id, title, content, hashtags FROM work_diary WHERE id IN ({in_clause})"
+    ), params).fetchall()
+    comments = {}
+    for entry_id, content in conn.execute(text(
+        f"SELECT work_entry_id, content FROM comments WHERE work_entry_id IN ({in_clause}) ORDER BY id"
+    ), params):
+        comments.setdefault(entry_id, []).append(strip_html(content))
+
+    rows = [{
+        'id': entry_id,
+        'title': title or '',
+        'content': strip_html(content),
+        'hashtags': hashtags or '',
+        'comments': '\n'.join(comments.get(entry_id, [])),
+    } for entry_id, title, content, hashtags in entries]
+    if rows:
+        conn.execute(text(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, content, hashtags, comments) "
+            f"VALUES (:id, :title, :content, :hashtags, :comments)"
+        ), rows)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    entry_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, WorkDiary) and obj.id is not None:
+            entry_ids.add(obj.id)
+        elif isinstance(obj, Comment) and obj.work_entry_id is not None:
+            entry_ids.add(obj.work_entry_id)
+    if entry_ids:
+        reindex_entries(session.connection(), entry_ids)
+
+
+def _terms(keyword):
+    return [t for t in keyword.split() if t]
+
+
+def search_subquery(keyword):
+    """
+    Subquery of entries matching every term of keyword, with columns
+    entry_id, rank (lower is better) and snippet (raw text, see format_snippet).
+    """
+    terms = _terms(keyword)
+    if terms and all(len(t) >= 3 for t in terms):
+        match = ' '.join('"' + t.replace('"', '""') + '"' for t in terms)
+        stmt = text(
+            f"SELECT rowid AS entry_id, bm25({FTS_TABLE}, {', '.join(map(str, RANK_WEIGHTS))}) AS rank, "
+            f"snippet({FTS_TABLE}, -1, '{_MARK_START}', '{_MARK_END}', '…', 48) AS snippet "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        ).bindparams(match=match)
+    else:
+        # Short terms: no trigram index, substring scan over the stripped text instead
+        haystack = "(title || ' ' || hashtags || ' ' || content || ' ' || comments)"
+        conditions = ' AND '.join(f"{haystack} LIKE :t{i}" for i in range(len(terms))) or '1'
+        stmt = text(
+            f"SELECT rowid AS entry_id, 0.0 AS rank, "
+            f"(title || ' ' || content || ' ' || comments) AS snippet "
+            f"FROM {FTS_TABLE} WHERE {conditions}"
+        ).bindparams(**{f't{i}': f'%{t}%' for i, t in enumerate(terms)})
+    return stmt.columns(entry_id=Integer, rank=Float, snippet=String).subquery('fts')
+
+
+def format_snippet(raw, keyword, width=80):
+    """HTML-safe snippet with matched terms wrapped in <mark>."""
+    if not raw:
+        return ''
+    if _MARK_START not in raw:
+        # LIKE fallback: cut a window around the first match and mark the terms ourselves
+        terms = _terms(keyword)
+        lowered = raw.lower()
+        hits = [lowered.find(t.lower()) for t in terms if lowered.find(t.lower()) >= 0]
+        start = max(0, min(hits) - width // 2) if hits else 0
+        raw = ('…' if start else '') + raw[start:start + width] + ('…' if start + width < len(raw) else '')
+        if terms:
+            pattern = re.compile('|'.join(re.escape(t) for t in terms), re.IGNORECASE)
+            raw = pattern.sub(lambda m: f'{_MARK_START}{m.group(0)}{_MARK_END}', raw)
+    return html.escape(raw).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
@@ -0,0 +1,109 @@
+"""
+Normalized Work Diary hashtags.
+
+WorkDiary.hashtags stays the free-text field the user typed ("#project #issue" or
+"#a, #b"); diary_hashtags holds one row per (entry, normalized tag) for exact, indexed
+tag filtering, and hashtag_counts holds the number of entries per tag for the tag cloud.
+Both are rebuilt for the affected entries/tags on every flush that touches a WorkDiary,
+so they are committed (or rolled back) together with the entry itself.
+"""
+import re
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from models import WorkDiary
+
+_SPLIT_RE = re.compile(r'[\s,]+')
+
+
+def normalize_tag(tag):
+    """'#Ship' -> 'ship' (None for an empty tag)"""
+    tag = (tag or '').strip().lstrip('#').strip().lower()
+    return tag[:100] or None
+
+
+def parse_hashtags(value):
+    """Distinct normalized tags of a hashtags string, in order of appearance."""
+    tags = []
+    for part in _SPLIT_RE.split(value or ''):
+        tag = normalize_tag(part)
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def _in_clause(prefix, values):
+    params = {f'{prefix}{i}': value for i, value in enumerate(values)}
+    return ', '.join(f':{name}' for name in params), params
+
+
+def sync_entry_tags(conn, entry_ids):
+    """Rebuild diary_hashtags rows of entry_ids and the counts of every tag they had or have."""
+    entry_ids = sorted(set(entry_ids))
+    if not entry_ids:
+        return
+    ids_clause, params = _in_clause('id', entry_ids)
+
+    touched = {row[0] for row in conn.execute(text(
+        f"SELECT DISTINCT tag FROM diary_hashtags WHERE work_entry_id IN ({ids_clause})"
+    ), params)}
+    conn.execute(text(f"DELETE FROM diary_hashtags WHERE work_entry_id IN ({ids_clause})"), params)
+
+    rows = []
+    for entry_id, hashtags in conn.execute(text(
+        f"SELECT id, hashtags FROM work_diary WHERE id IN ({ids_clause})"
+    ), params):
+        for tag in parse_hashtags(hashtags):
+            rows.append({'entry_id': entry_id, 'tag': tag})
+            touched.add(tag)
+    if rows:
+        conn.execute(text(
+            "INSERT INTO diary_hashtags (work_entry_id, tag) VALUES (:entry_id, :tag)"
+        ), rows)
+
+    refresh_counts(conn, touched)
+
+
+def refresh_counts(conn, tags=None):
+    """Recompute hashtag_counts for tags (all tags when None); tags no longer used are removed."""
+    if tags is None:
+        conn.execute(text("DELETE FROM hashtag_counts"))
+        conn.execute(text(
+            "INSERT INTO hashtag_counts (tag, entry_count) "
+            "SELECT tag, COUNT(*) FROM diary_hashtags GROUP BY tag"
+        ))
+        return
+    tags = sorted(tags)
+    if not tags:
+        return
+    tags_clause, params = _in_clause('tag', tags)
+    conn.execute(text(f"DELETE FROM hashtag_counts WHERE tag IN ({tags_clause})"), params)
+    conn.execute(text(
+        f"INSERT INTO hashtag_counts (tag, entry_count) "
+        f"SELECT tag, COUNT(*) FROM diary_hashtags WHERE tag IN ({tags_clause}) GROUP BY tag"
+    ), params)
+
+
+def migrate_hashtags(engine):
+    """
+    One-time split of the existing comma/space separated WorkDiary.hashtags strings.
+    Runs at startup and only does work while diary_hashtags is still empty.
+    """
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT 1 FROM diary_hashtags LIMIT 1")).first() is not None:
+            return
+        ids = [row[0] for row in conn.execute(text(
+            "SELECT id FROM work_diary WHERE hashtags IS NOT NULL AND hashtags != ''"
+        ))]
+        for i in range(0, len(ids), 500):
+            sync_entry_tags(conn, ids[i:i + 500])
+        refresh_counts(conn)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_hashtags(session, flush_context):
+    entry_ids = {
+        obj.id for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, WorkDiary) and obj.id is not None
+    }
+    if entry_ids:
+        sync_entry_tags(session.connection(), entry_ids)
@@ -0,0 +1,71 @@
+"""
+Print EXPLAIN QUERY PLAN for the hot queries on shipment_data / shipment_plans.
+
+Run after schema changes to catch full-table scans:
+    python server/explain_queries.py [path/to/mnt_data.db]
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_connection import DB_PATH, connect
+from db_indexes import ensure_indexes
+
+HOT_QUERIES = [
+    ("GLOP ingest: vanished rows of a From Site / PO set",
+     'SELECT rowid FROM shipment_data WHERE "From Site" = ? AND "PO No." IN (?, ?)',
+     ['TPV / MNT', 'PO1', 'PO2']),
+    ("GLOP ingest: natural key lookup",
+     'SELECT "Row Hash" FROM shipment_data WHERE "From Site" IS ? AND "Data Source" IS ? '
+     'AND "PO No." IS ? AND "Model" IS ? AND "Line Seq" IS ?',
+     ['TPV / MNT', 'GERP', 'PO1', '27GQ50F-B.AUS', 0]),
+    ("GLOP report: actuals of a week",
+     'SELECT * FROM shipment_data WHERE "Week Name" = ?', ['2025-01-06(W02)']),
+    ("GLOP report: actuals of a month",
+     'SELECT * FROM shipment_data WHERE "Month" = ?', ['2025-01']),
+    ("GLOP report: actuals of a Ship To",
+     'SELECT * FROM shipment_data WHERE "Ship To" = ?', ['EEUK']),
+    ("Shipment plan: one Planweek / Week Name",
+     'SELECT * FROM shipment_plans WHERE "Planweek" = ? AND "Week Name" = ?', ['202501', '2025-01-06(W02)']),
+    ("Shipment plan: latest Planweek",
+     'SELECT MAX("Planweek") FROM shipment_plans', []),
+    ("Shipment plan: one model",
+     'SELECT * FROM shipment_plans WHERE "Mapping Model.Suffix" = ?', ['27GQ50F-B.AUS']),
+]
+
+
+def explain(conn, sql, params):
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def is_full_scan(detail):
+    # "SCAN t" without an index is a full-table scan; "SEARCH ... USING INDEX" and covering scans are fine
+    return detail.startswith('SCAN') and 'INDEX' not in detail
+
+
+def main(db_path):
+    conn = connect(db_path)
+    try:
+        ensure_indexes(conn)
+        scans = 0
+        for title, sql, params in HOT_QUERIES:
+            print(f"\n== {title}\n   {sql}")
+            try:
+                details = explain(conn, sql, params)
+            except Exception as e:
+                print(f"   (skipped: {e})")
+                continue
+            for detail in details:
+                flag = '  <-- FULL SCAN' if is_full_scan(detail) else ''
+                scans += bool(flag)
+                print(f"   {detail}{flag}")
+        print(f"\n{scans} full-table scan(s) found.")
+        return scans
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main(sys.argv[1] if len(sys.argv) > 1 else DB_PATH) else 0)
@@ -0,0 +1,99 @@
+"""
+Per-week aggregates of the GLOP actuals in shipment_data, maintained at ingest time.
+
+shipment_actuals_weekly holds SUM(Ship) and the row count per
+(Week Name, Month, From Site, Ship To, Region, Country, Model); missing values are stored as ''.
+
+save_to_db only rewrites the rows of the POs in the file it loads (From Site + PO No. in
+temp.shipment_stage). It records the aggregate of that scope with sign -1 before applying
+the file and with sign +1 after (record_scope), then adds the difference to the aggregate
+table (apply_deltas). The GLOP report reads only this table, never shipment_data.
+
+All functions take a raw sqlite3 cursor so the driver can call them inside its own transaction.
+"""
+from db_indexes import quote_ident
+
+ACTUALS_TABLE = 'shipment_actuals_weekly'
+SOURCE_TABLE = 'shipment_data'
+QTY_COLUMN = 'Ship'
+KEY_COLUMNS = ['Week Name', 'Month', 'From Site', 'Ship To', 'Region', 'Country', 'Model']
+
+_KEY_LIST = ', '.join(quote_ident(c) for c in KEY_COLUMNS)
+
+
+def _source_columns(cursor):
+    cursor.execute(f"PRAGMA table_info({SOURCE_TABLE})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _aggregate_select(columns, sign, where=''):
+    """SELECT of the keys, sign * SUM(Ship) and sign * COUNT(*) from shipment_data; absent columns count as ''"""
+    keys = ', '.join(f"COALESCE({quote_ident(c)}, '')" if c in columns else "''" for c in KEY_COLUMNS)
+    qty = f"SUM(COALESCE(CAST({quote_ident(QTY_COLUMN)} AS REAL), 0))" if QTY_COLUMN in columns else "0"
+    group_by = ', '.join(str(i + 1) for i in range(len(KEY_COLUMNS)))
+    return f"SELECT {keys}, {sign} * {qty}, {sign} * COUNT(*) FROM {SOURCE_TABLE} {where} GROUP BY {group_by}"
+
+
+def ensure_actuals_table(cursor):
+    """Create the aggregate table; when it is new, build it once from the whole of shipment_data"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (ACTUALS_TABLE,))
+    if cursor.fetchone():
+        return False
+    keys = ', '.join(f"{quote_ident(c)} TEXT NOT NULL DEFAULT ''" for c in KEY_COLUMNS)
+    cursor.execute(
+        f"CREATE TABLE {ACTUALS_TABLE} ({keys}, ship_qty REAL NOT NULL DEFAULT 0, "
+        f"row_count INTEGER NOT NULL DEFAULT 0, PRIMARY KEY ({_KEY_LIST}))"
+    )
+    cursor.execute(f'CREATE INDEX ix_{ACTUALS_TABLE}_ship_to_week ON {ACTUALS_TABLE} ("Ship To", "Week Name")')
+    columns = _source_columns(cursor)
+    if columns:
+        cursor.execute(f"INSERT INTO {ACTUALS_TABLE} ({_KEY_LIST}, ship_qty, row_count) {_aggregate_select(columns, 1)}")
+    return True
+
+
+def record_scope(cursor, site_name, sign):
+    """
+    Add sign x the aggregate of the shipment_data rows of site_name whose PO is in
+    temp.shipment_stage to temp.actuals_delta. Call with -1 before and +1 after applying the stage.
+    """
+    columns = _source_columns(cursor)
+    cursor.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS actuals_delta "
+        f"({_KEY_LIST}, ship_qty REAL, row_count INTEGER)"
+    )
+    if not columns:
+        return
+    cursor.execute(
+        f"INSERT INTO temp.actuals_delta "
+        + _aggregate_select(
+            columns, sign,
+            where='WHERE "From Site" = ? AND "PO No." IN (SELECT "PO No." FROM temp.shipment_stage)'
+        ),
+        (site_name,)
+    )
+
+
+def apply_deltas(cursor):
+    """Fold temp.actuals_delta into the aggregate table and drop it. Returns the number of cells touched."""
+    ensure_actuals_table(cursor)
+    group_by = ', '.join(str(i + 1) for i in range(len(KEY_COLUMNS)))
+    cursor.execute(
+        f"INSERT INTO {ACTUALS_TABLE} ({_KEY_LIST}, ship_qty, row_count) "
+        f"SELECT {_KEY_LIST}, SUM(ship_qty), SUM(row_count) FROM temp.actuals_delta GROUP BY {group_by} "
+        f"HAVING SUM(row_count) != 0 OR SUM(ship_qty) != 0 "
+        f"ON CONFLICT ({_KEY_LIST}) DO UPDATE SET ship_qty = ship_qty + excluded.ship_qty, "
+        f"row_count = row_count + excluded.row_count"
+    )
+    touched = cursor.rowcount
+    cursor.execute(f"DELETE FROM {ACTUALS_TABLE} WHERE row_count <= 0")
+    cursor.execute("DROP TABLE temp.actuals_delta")
+    return touched
+
+
+def rebuild_actuals(cursor):
+    """Recompute the whole aggregate table from shipment_data (repair / after manual edits)"""
+    if not ensure_actuals_table(cursor):
+        cursor.execute(f"DELETE FROM {ACTUALS_TABLE}")
+        columns = _source_columns(cursor)
+        if columns:
+            cursor.execute(f"INSERT INTO {ACTUALS_TABLE} ({_KEY_LIST}, ship_qty, row_count) {_aggregate_select(columns, 1)}")
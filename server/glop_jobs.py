@@ -0,0 +1,209 @@
+"""
+GLOP driver jobs: a persistent job table (glop_jobs) and a bounded worker pool.
+
+  submit   queue a run of (product, supplier); while an identical run is queued or running
+           that job is returned instead (reused=True), so two clicks share one Chrome session
+  cancel   a queued job is dropped; a running one stops at the driver's next log line
+  events   the job's event stream (log / status / complete / error / cancelled) is a topic of
+           the LogBus (see log_bus); SSE requests only subscribe to it, and closing one does
+           not affect the job
+
+Workers are a ThreadPoolExecutor of ORCA_DRIVER_WORKERS threads (default 1: runs share the
+Downloads folder). The driver only sees a queue-like object with put(); cancellation is
+raised from there as JobCancelled, a BaseException, so the driver's `except Exception`
+handlers do not swallow it and its `finally: driver.quit()` still closes the browser.
+"""
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from sqlite3 import IntegrityError
+from database import engine
+from log_bus import LogBus
+
+ACTIVE_STATES = ('queued', 'running')
+MAX_WORKERS = int(os.environ.get('ORCA_DRIVER_WORKERS', 1))
+# Inserts retried when another server process keeps queuing (and finishing) the same run
+SUBMIT_ATTEMPTS = 3
+
+_JOB_COLUMNS = ['id', 'product', 'supplier', 'status', 'requested_by', 'cancel_requested', 'error',
+                'created_at', 'started_at', 'finished_at']
+
+
+class JobCancelled(BaseException):
+    """Raised inside the driver thread once the job has been cancelled"""
+
+
+class JobSink:
+    """The log_queue handed to the driver: publishes to the job's topic and raises once cancelled"""
+
+    def __init__(self, bus, job_id, cancelled):
+        self._bus = bus
+        self._job_id = job_id
+        self.cancelled = cancelled
+
+    def put(self, event):
+        if event is not None:
+            self._bus.publish(self._job_id, event)
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+
+def _now():
+    return datetime.utcnow().isoformat(' ')
+
+
+def _row_to_job(row):
+    job = dict(zip(_JOB_COLUMNS, row))
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    return job
+
+
+class JobManager:
+    def __init__(self, runner, max_workers=MAX_WORKERS):
+        """runner(product, supplier, log_queue) performs one driver run"""
+        self._runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='glop-job')
+        self._lock = threading.Lock()
+        self.bus = LogBus()
+        self._cancel_flags = {}
+        self._futures = {}
+
+    def _execute(self, sql, params=()):
+        with closing(engine.raw_connection()) as conn:
+            try:
+                cursor = conn.execute(sql, params)
+                rows = cursor.fetchall()
+                conn.commit()
+                return rows, cursor.rowcount
+            except Exception:
+                conn.rollback()
+                raise
+
+    def recover(self):
+        """At startup: runs cut off by a restart are failed, queued ones are queued again"""
+        self._execute(
+            "UPDATE glop_jobs SET status = 'failed', error = 'Interrupted by server restart', finished_at = ? "
+            "WHERE status = 'running'", (_now(),)
+        )
+        queued, _ = self._execute("SELECT id, product, supplier FROM glop_jobs WHERE status = 'queued' ORDER BY created_at")
+        for job_id, product, supplier in queued:
+            self._start(job_id, product, supplier)
+
+    def _start(self, job_id, product, supplier):
+        self._cancel_flags[job_id] = threading.Event()
+        self.bus.open(job_id)
+        self.bus.publish(job_id, {'type': 'status', 'message': '대기 중', 'status': 'pending'})
+        self._futures[job_id] = self._executor.submit(self._run, job_id, product, supplier)
+
+    def submit(self, product, supplier, user_id=None):
+        """
+        Returns (job, reused). job is None only when another server process kept queuing
+        the same run and it finished before it could be read, SUBMIT_ATTEMPTS times in a row.
+        """
+        with self._lock:
+            for _ in range(SUBMIT_ATTEMPTS):
+                active = self.find_active(product, supplier)
+                if active:
+                    return active, True
+                job_id = str(uuid.uuid4())
+                try:
+                    self._execute(
+                        "INSERT INTO glop_jobs (id, product, supplier, status, requested_by, cancel_requested, created_at) "
+                        "VALUES (?, ?, ?, 'queued', ?, 0, ?)",
+                        (job_id, product, supplier, user_id, _now())
+                    )
+                except IntegrityError:
+                    # Another server process queued the same run first (ux_glop_jobs_active):
+                    # join it, or try again if it has already finished
+                    continue
+                self._start(job_id, product, supplier)
+                return self.get(job_id), False
+            return None, False
+
+    def _run(self, job_id, product, supplier):
+        _, started = self._execute(
+            "UPDATE glop_jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'",
+            (_now(), job_id)
+        )
+        if not started:
+            return  # cancelled while queued (cancel() has already removed its flag)
+        sink = JobSink(self.bus, job_id, self._cancel_flags[job_id])
+
+        status, error = 'succeeded', None
+        try:
+            self.bus.publish(job_id, {'type': 'log', 'message': f'GLOP Driver 시작: Product={product}, Supplier={supplier}'})
+            self.bus.publish(job_id, {'type': 'status', 'message': '실행 중', 'status': 'pending'})
+            self._runner(product, supplier, sink)
+            self.bus.publish(job_id, {'type': 'complete'})
+        except JobCancelled:
+            status = 'cancelled'
+            self.bus.publish(job_id, {'type': 'cancelled', 'message': '작업이 취소되었습니다.'})
+        except Exception as e:
+            status, error = 'failed', str(e)
+            self.bus.publish(job_id, {'type': 'error', 'message': f"드라이버 실행 중 오류 발생: {e}"})
+        finally:
+            self._execute(
+                "UPDATE glop_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, error, _now(), job_id)
+            )
+            self._finish(job_id)
+
+    def _finish(self, job_id):
+        with self._lock:
+            self._futures.pop(job_id, None)
+            self._cancel_flags.pop(job_id, None)
+        self.bus.close(job_id)
+
+    def cancel(self, job_id):
+        """Returns the job after the request, or None if it does not exist"""
+        job = self.get(job_id)
+        if job is None or job['status'] not in ACTIVE_STATES:
+            return job
+        self._execute("UPDATE glop_jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        _, dropped = self._execute(
+            "UPDATE glop_jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+            (_now(), job_id)
+        )
+        flag = self._cancel_flags.get(job_id)
+        if dropped:
+            future = self._futures.get(job_id)
+            if future:
+                future.cancel()
+            if flag:
+                self.bus.publish(job_id, {'type': 'cancelled', 'message': '작업이 취소되었습니다.'})
+            self._finish(job_id)
+        elif flag:
+            self.bus.publish(job_id, {'type': 'log', 'message': '취소 요청됨 - 현재 단계가 끝나면 중단합니다.'})
+            flag.set()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        rows, _ = self._execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM glop_jobs WHERE id = ?", (job_id,))
+        return _row_to_job(rows[0]) if rows else None
+
+    def find_active(self, product, supplier):
+        rows, _ = self._execute(
+            f"SELECT {', '.join(_JOB_COLUMNS)} FROM glop_jobs "
+            f"WHERE product = ? AND supplier = ? AND status IN ('queued', 'running')",
+            (product, supplier)
+        )
+        return _row_to_job(rows[0]) if rows else None
+
+    def list(self, limit=50, active_only=False):
+        where = "WHERE status IN ('queued', 'running')" if active_only else ''
+        rows, _ = self._execute(
+            f"SELECT {', '.join(_JOB_COLUMNS)} FROM glop_jobs {where} ORDER BY created_at DESC LIMIT ?", (limit,)
+        )
+        return [_row_to_job(row) for row in rows]
+
+    def subscribe(self, job_id, last_seq=-1, heartbeat=15):
+        """
+        Event stream of a job started by this process (see LogBus.subscribe), or None when
+        its events are not in memory (older or foreign jobs).
+        """
+        if not self.bus.has_topic(job_id):
+            return None
+        return self.bus.subscribe(job_id, last_seq=last_seq, heartbeat=heartbeat)
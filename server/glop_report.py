@@ -0,0 +1,183 @@
+"""
+GLOP Report: plan vs actual per (Week Name, To Site, model).
+
+  plan    SUM(SP) of one Planweek snapshot (default: latest) by Week Name, To Site and
+          Mapping Model.Suffix
+  actual  SUM(Ship) from shipment_actuals_weekly (see glop_actuals), with Ship To as the site
+
+The two sides are FULL OUTER JOINed, so weeks that were planned but not shipped (and the
+reverse) are both reported. variance = actual - plan; attainment = actual / plan.
+Filters are pushed into both sides, so a page reads one plan snapshot and the small actuals
+aggregate, never shipment_data.
+"""
+from contextlib import closing
+from database import engine
+from glop_actuals import ACTUALS_TABLE, ensure_actuals_table
+from plan_snapshots import snapshot_source, read_snapshot, latest_planweek
+
+REPORT_COLUMNS = ['week_name', 'month', 'to_site', 'region', 'country', 'model',
+                  'plan_qty', 'actual_qty', 'variance', 'attainment']
+WEEK_COLUMNS = ['week_name', 'month', 'plan_qty', 'actual_qty', 'variance', 'attainment']
+SORTS = {
+    'week': 'week_name, to_site, model',
+    'variance': 'ABS(variance) DESC, week_name, to_site, model',
+}
+MAX_PER_PAGE = 500
+EXPORT_BATCH = 5000
+
+
+def init_actuals():
+    """Create (and on first run build) the actuals aggregate before the first report request"""
+    with closing(engine.raw_connection()) as conn:
+        cursor = conn.cursor()
+        ensure_actuals_table(cursor)
+        conn.commit()
+
+
+def _plan_source(conn, planweek, plan_filters, plan_params):
+    """(FROM clause, params) of the plan side; archived snapshots are aggregated into a temp table"""
+    source = snapshot_source(planweek)
+    if source['storage'] != 'archived':
+        conditions = ([source['where'][len('WHERE '):]] if source['where'] else []) + plan_filters
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        return f'"{source["table"]}"{where}', [*source['params'], *plan_params]
+
+    plan = read_snapshot(source=source, columns=['Week Name', 'Month', 'Region', 'To Site',
+                                                 'Mapping Model.Suffix', 'SP'])
+    conn.execute("DROP TABLE IF EXISTS temp.report_plan")
+    conn.execute('CREATE TEMP TABLE report_plan ("Week Name", "Month", "Region", "To Site", "Mapping Model.Suffix", "SP")')
+    conn.executemany("INSERT INTO temp.report_plan VALUES (?, ?, ?, ?, ?, ?)",
+                     plan.astype(object).where(plan.notna(), None).itertuples(index=False, name=None))
+    return "temp.report_plan" + (f" WHERE {' AND '.join(plan_filters)}" if plan_filters else ''), plan_params
+
+
+def _report_cte(conn, planweek, filters):
+    """WITH ... report AS (...) for the report, and its params"""
+    plan_filters, plan_params = [], []
+    actual_filters, actual_params = [], []
+    for key, plan_column, actual_column, op in (
+        ('week_from', 'Week Name', 'Week Name', '>='),
+        ('week_to', 'Week Name', 'Week Name', '<='),
+        ('month', 'Month', 'Month', '='),
+        ('to_site', 'To Site', 'Ship To', '='),
+        ('model', 'Mapping Model.Suffix', 'Model', '='),
+    ):
+        if filters.get(key):
+            plan_filters.append(f'"{plan_column}" {op} ?')
+            plan_params.append(filters[key])
+            actual_filters.append(f'"{actual_column}" {op} ?')
+            actual_params.append(filters[key])
+
+    plan_from, plan_params = _plan_source(conn, planweek, plan_filters, plan_params)
+    actual_where = f"WHERE {' AND '.join(actual_filters)}" if actual_filters else ''
+
+    joined_filters, joined_params = [], []
+    if filters.get('region'):
+        joined_filters.append("region = ?")
+        joined_params.append(filters['region'])
+    if filters.get('only_variance'):
+        joined_filters.append("variance != 0")
+
+    cte = f"""
+        WITH plan AS (
+            SELECT COALESCE("Week Name", '') AS week_name, MAX(COALESCE("Month", '')) AS month,
+                   COALESCE("To Site", '') AS to_site, COALESCE("Mapping Model.Suffix", '') AS model,
+                   MAX("Region") AS region, SUM(COALESCE("SP", 0)) AS plan_qty
+            FROM {plan_from}
+            GROUP BY 1, 3, 4
+        ),
+        actual AS (
+            SELECT "Week Name" AS week_name, MAX("Month") AS month, "Ship To" AS to_site, "Model" AS model,
+                   MAX(NULLIF("Region", '')) AS region, MAX(NULLIF("Country", '')) AS country,
+                   SUM(ship_qty) AS actual_qty
+            FROM {ACTUALS_TABLE} {actual_where}
+            GROUP BY 1, 3, 4
+        ),
+        joined AS (
+            SELECT COALESCE(p.week_name, a.week_name) AS week_name,
+                   COALESCE(NULLIF(p.month, ''), a.month) AS month,
+                   COALESCE(p.to_site, a.to_site) AS to_site,
+                   COALESCE(a.region, p.region) AS region,
+                   a.country AS country,
+                   COALESCE(p.model, a.model) AS model,
+                   COALESCE(p.plan_qty, 0) AS plan_qty,
+                   COALESCE(a.actual_qty, 0) AS actual_qty,
+                   COALESCE(a.actual_qty, 0) - COALESCE(p.plan_qty, 0) AS variance
+            FROM plan AS p FULL OUTER JOIN actual AS a
+              ON p.week_name = a.week_name AND p.to_site = a.to_site AND p.model = a.model
+        ),
+        report AS (
+            SELECT *, CASE WHEN plan_qty > 0 THEN ROUND(actual_qty * 1.0 / plan_qty, 4) END AS attainment
+            FROM joined
+            {f"WHERE {' AND '.join(joined_filters)}" if joined_filters else ''}
+        )
+    """
+    return cte, [*plan_params, *actual_params, *joined_params]
+
+
+def report_page(planweek=None, filters=None, page=1, per_page=100, sort='week', level='detail'):
+    """
+    One page of the report. level='week' sums the rows per Week Name (chart data).
+    Raises KeyError for an unknown Planweek and ValueError for an unknown sort.
+    """
+    filters = filters or {}
+    planweek = planweek or latest_planweek()
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    per_page = max(1, min(int(per_page), MAX_PER_PAGE))
+    page = max(1, int(page))
+
+    with closing(engine.raw_connection()) as conn:
+        cte, params = _report_cte(conn, planweek, filters)
+        count, plan_total, actual_total = conn.execute(
+            f"{cte} SELECT COUNT(*), COALESCE(SUM(plan_qty), 0), COALESCE(SUM(actual_qty), 0) FROM report", params
+        ).fetchone()
+
+        if level == 'week':
+            columns = WEEK_COLUMNS
+            rows = conn.execute(
+                f"{cte} SELECT week_name, MIN(month), SUM(plan_qty), SUM(actual_qty), SUM(variance), "
+                f"CASE WHEN SUM(plan_qty) > 0 THEN ROUND(SUM(actual_qty) * 1.0 / SUM(plan_qty), 4) END "
+                f"FROM report GROUP BY week_name ORDER BY week_name",
+                params
+            ).fetchall()
+            total = len(rows)
+        else:
+            columns = REPORT_COLUMNS
+            rows = conn.execute(
+                f"{cte} SELECT {', '.join(REPORT_COLUMNS)} FROM report ORDER BY {SORTS[sort]} LIMIT ? OFFSET ?",
+                [*params, per_page, (page - 1) * per_page]
+            ).fetchall()
+            total = count
+
+    return {
+        "planweek": planweek,
+        "level": level,
+        "columns": columns,
+        "rows": [dict(zip(columns, row)) for row in rows],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": (total + per_page - 1) // per_page if level != 'week' else 1,
+        "totals": {
+            "plan_qty": plan_total,
+            "actual_qty": actual_total,
+            "variance": actual_total - plan_total,
+            "attainment": round(actual_total / plan_total, 4) if plan_total else None,
+        },
+    }
+
+
+def iter_report_rows(planweek=None, filters=None, sort='week'):
+    """All report rows as tuples in REPORT_COLUMNS order, fetched in batches (for the XLSX export)"""
+    planweek = planweek or latest_planweek()
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    with closing(engine.raw_connection()) as conn:
+        cte, params = _report_cte(conn, planweek, filters or {})
+        cursor = conn.execute(f"{cte} SELECT {', '.join(REPORT_COLUMNS)} FROM report ORDER BY {SORTS[sort]}", params)
+        while True:
+            batch = cursor.fetchmany(EXPORT_BATCH)
+            if not batch:
+                break
+            yield from batch
@@ -0,0 +1,101 @@
+"""
+Load test: read latency of the web app while the GLOP driver ingest holds the write lock.
+
+Runs a writer thread that repeats large single-transaction ingests (like save_to_db) and
+several reader threads that query through the pooled engine (like Flask request threads),
+once with SQLite defaults and once with the shared settings from db_connection.py.
+A scratch database is used so mnt_data.db is never touched.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import threading
+import statistics
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_connection import SQLITE_SETTINGS, connect, create_db_engine
+
+SQLITE_DEFAULTS = {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000}
+
+DURATION = 10          # seconds per profile
+READERS = 8
+INGEST_ROWS = 100000   # rows written per ingest transaction
+
+
+def prepare(db_path):
+    conn = connect(db_path, SQLITE_DEFAULTS)
+    conn.execute('CREATE TABLE shipment_data ("From Site" TEXT, "PO No." TEXT, "Model" TEXT, "Ship" INTEGER, "Week Name" TEXT)')
+    conn.executemany('INSERT INTO shipment_data VALUES (?, ?, ?, ?, ?)', make_rows(200000))
+    conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, userid TEXT)')
+    conn.executemany('INSERT INTO users VALUES (?, ?)', [(i, f'user{i}') for i in range(1000)])
+    conn.commit()
+    conn.close()
+
+
+def make_rows(n):
+    return [(f'SITE{i % 8}', f'PO{i // 3}', f'27GQ50F-B.{i % 50}', i % 500, f'2025-01-{(i % 28) + 1:02d}(W01)')
+            for i in range(n)]
+
+
+def writer(db_path, settings, stop, stats):
+    rows = make_rows(INGEST_ROWS)
+    while not stop.is_set():
+        conn = connect(db_path, settings)
+        try:
+            start = time.perf_counter()
+            conn.execute('DELETE FROM shipment_data WHERE "From Site" = ?', ('SITE0',))
+            conn.executemany('INSERT INTO shipment_data VALUES (?, ?, ?, ?, ?)', rows)
+            conn.commit()
+            stats['ingests'].append(time.perf_counter() - start)
+        except Exception as e:
+            stats['write_errors'].append(str(e))
+        finally:
+            conn.close()
+
+
+def reader(engine, stop, stats):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text('SELECT userid FROM users WHERE id = :id'), {'id': random.randint(0, 999)}).fetchone()
+                conn.execute(text('SELECT COUNT(*) FROM shipment_data WHERE "From Site" = :site'),
+                             {'site': f'SITE{random.randint(1, 7)}'}).fetchone()
+            stats['reads'].append(time.perf_counter() - start)
+        except Exception as e:
+            stats['read_errors'].append(str(e))
+        time.sleep(0.01)
+
+
+def run_profile(name, settings):
+    db_path = os.path.join(tempfile.mkdtemp(), 'load_test.db')
+    prepare(db_path)
+    engine = create_db_engine(db_path, settings, pool_size=READERS)
+    stats = {'reads': [], 'read_errors': [], 'ingests': [], 'write_errors': []}
+    stop = threading.Event()
+
+    threads = [threading.Thread(target=writer, args=(db_path, settings, stop, stats))]
+    threads += [threading.Thread(target=reader, args=(engine, stop, stats)) for _ in range(READERS)]
+    for t in threads:
+        t.start()
+    time.sleep(DURATION)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    reads = sorted(stats['reads']) or [0]
+    print(f"\n[{name}] {settings}")
+    print(f"  ingests: {len(stats['ingests'])}, write errors: {len(stats['write_errors'])}")
+    print(f"  reads:   {len(stats['reads'])}, read errors: {len(stats['read_errors'])}")
+    print(f"  read latency ms  p50={statistics.median(reads) * 1000:.1f}"
+          f"  p95={reads[int(len(reads) * 0.95)] * 1000:.1f}  max={reads[-1] * 1000:.1f}")
+
+
+if __name__ == '__main__':
+    run_profile('sqlite defaults', SQLITE_DEFAULTS)
+    run_profile('db_connection settings', SQLITE_SETTINGS)
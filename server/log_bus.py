@@ -0,0 +1,137 @@
+"""
+In-process pub/sub bus for progress streams (GLOP driver jobs).
+
+Every topic (a job id) keeps its last RING_SIZE events in a ring buffer, numbered by a
+per-topic sequence that the SSE endpoints send as the event id. Any number of subscribers
+can follow a topic; a subscriber that reconnects with Last-Event-ID gets the buffered events
+after that id before the live ones.
+
+publish() never blocks: each subscriber has a bounded queue, and when it is full the
+subscriber is only flagged as lagging. It then catches up from the ring buffer on its next
+read (or is told how many events it missed if they already left the ring). Heartbeats are
+produced on the reading side when its queue stays empty, so they never take queue space.
+"""
+import os
+import queue
+import threading
+from collections import deque
+
+RING_SIZE = int(os.environ.get('ORCA_LOG_RING_SIZE', 2000))
+SUBSCRIBER_QUEUE_SIZE = 256
+# Closed topics kept for replay
+MAX_CLOSED_TOPICS = 50
+
+_CLOSED = object()
+
+
+class _Topic:
+    def __init__(self):
+        self.ring = deque(maxlen=RING_SIZE)
+        self.next_seq = 0
+        self.subscribers = set()
+        self.closed = False
+
+
+class _Subscription:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.lagging = False
+
+    def offer(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.lagging = True
+
+
+class LogBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._topics = {}
+        self._closed = deque()
+
+    def open(self, topic):
+        with self._lock:
+            self._topics.setdefault(topic, _Topic())
+
+    def has_topic(self, topic):
+        with self._lock:
+            return topic in self._topics
+
+    def publish(self, topic, event):
+        """Append event to the topic and hand it to every subscriber; returns its sequence number"""
+        with self._lock:
+            state = self._topics.setdefault(topic, _Topic())
+            seq = state.next_seq
+            state.next_seq += 1
+            state.ring.append((seq, event))
+            for subscription in state.subscribers:
+                subscription.offer((seq, event))
+        return seq
+
+    def close(self, topic):
+        """End the topic's stream; it stays available for replay until MAX_CLOSED_TOPICS newer ones closed"""
+        with self._lock:
+            state = self._topics.get(topic)
+            if state is None or state.closed:
+                return
+            state.closed = True
+            for subscription in state.subscribers:
+                subscription.offer(_CLOSED)
+            self._closed.append(topic)
+            while len(self._closed) > MAX_CLOSED_TOPICS:
+                self._topics.pop(self._closed.popleft(), None)
+
+    def _replay(self, state, last_seq):
+        """(events after last_seq still in the ring, number of events lost before them). Hold the lock."""
+        pending = [item for item in state.ring if item[0] > last_seq]
+        first = pending[0][0] if pending else state.next_seq
+        return pending, max(0, first - last_seq - 1)
+
+    def subscribe(self, topic, last_seq=-1, heartbeat=15):
+        """
+        Yield (seq, event) of the topic after last_seq, then live events until the topic is
+        closed. Yields None every `heartbeat` seconds without events, and (None, gap event) when
+        events were dropped before this subscriber could read them. Raises KeyError for an
+        unknown topic.
+        """
+        subscription = _Subscription()
+        with self._lock:
+            state = self._topics[topic]
+            backlog, missed = self._replay(state, last_seq)
+            done = state.closed
+            if not done:
+                state.subscribers.add(subscription)
+
+        try:
+            while True:
+                if missed:
+                    yield None, {'type': 'log', 'message': f'(로그 {missed}건 생략)'}
+                for seq, event in backlog:
+                    last_seq = seq
+                    yield seq, event
+                if done:
+                    return
+
+                backlog, missed = [], 0
+                if subscription.lagging:
+                    with self._lock:
+                        subscription.lagging = False
+                        while not subscription.queue.empty():
+                            subscription.queue.get_nowait()
+                        backlog, missed = self._replay(state, last_seq)
+                        done = state.closed
+                    continue
+
+                try:
+                    item = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield None
+                    continue
+                if item is _CLOSED:
+                    return
+                if item[0] > last_seq:
+                    backlog = [item]
+        finally:
+            with self._lock:
+                state.subscribers.discard(subscription)
@@ -0,0 +1,93 @@
+"""
+Process-wide cache of the master-data tables (os_models, site_mapping, monitor_stuffing).
+
+Each table is read once and compiled into a lookup structure that the GLOP driver and
+the simulation code share (series extraction itself is in model_series). A cached table
+is reloaded only after its version counter has been bumped by a master-data write
+(see bump_version).
+"""
+import threading
+from contextlib import closing
+from db_connection import DB_PATH, connect
+
+_lock = threading.RLock()
+_versions = {'os_models': 0, 'site_mapping': 0, 'monitor_stuffing': 0}
+_entries = {}
+_counts = {}
+MAX_CACHED_COUNTS = 256
+
+
+def get_version(table_name):
+    with _lock:
+        return _versions.get(table_name, 0)
+
+
+def bump_version(table_name):
+    """Invalidate the cached copy of table_name. Call after every committed write to it."""
+    with _lock:
+        _versions[table_name] = _versions.get(table_name, 0) + 1
+        return _versions[table_name]
+
+
+def _cached(table_name, db_path, loader):
+    with _lock:
+        version = _versions.get(table_name, 0)
+        key = (table_name, db_path)
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with closing(connect(db_path)) as conn:
+            value = loader(conn)
+        _entries[key] = (version, value)
+        return value
+
+
+def cached_count(table_name, key, counter):
+    """
+    Row count of table_name for a filter combination `key` (hashable), computed by counter()
+    and reused until the table's version is bumped.
+    """
+    with _lock:
+        version = _versions.get(table_name, 0)
+        entry = _counts.get((table_name, key))
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+    value = counter()
+    with _lock:
+        if len(_counts) >= MAX_CACHED_COUNTS:
+            _counts.clear()
+        _counts[(table_name, key)] = (version, value)
+    return value
+
+
+def _load_valid_series(conn):
+    rows = conn.execute("SELECT Series FROM os_models WHERE Series IS NOT NULL").fetchall()
+    return frozenset(row[0] for row in rows)
+
+
+def _load_site_mapping(conn):
+    rows = conn.execute("SELECT to_site, region, country FROM site_mapping").fetchall()
+    return {to_site: (region, country) for to_site, region, country in rows}
+
+
+def _load_stuffing(conn):
+    rows = conn.execute("SELECT series, qty_20ft, qty_40ft, qty_40hc FROM monitor_stuffing").fetchall()
+    return {series: (qty_20ft, qty_40ft, qty_40hc) for series, qty_20ft, qty_40ft, qty_40hc in rows}
+
+
+def get_valid_series(db_path=DB_PATH):
+    """frozenset of the series registered in os_models"""
+    return _cached('os_models', db_path, _load_valid_series)
+
+
+def get_site_mapping(db_path=DB_PATH):
+    """dict of Ship To (site_mapping.to_site) -> (region, country)"""
+    return _cached('site_mapping', db_path, _load_site_mapping)
+
+
+def get_stuffing(db_path=DB_PATH):
+    """dict of series -> (qty_20ft, qty_40ft, qty_40hc) from monitor_stuffing"""
+    return _cached('monitor_stuffing', db_path, _load_stuffing)
+
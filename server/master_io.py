@@ -0,0 +1,270 @@
+"""
+Bulk import/export of the master-data tables (monitor_stuffing, site_mapping, os_models).
+
+Uploads are read in chunks (CSV through pandas, XLSX through openpyxl read-only), each
+chunk is validated and written with one INSERT ... ON CONFLICT DO UPDATE, and the caller
+commits once at the end, so a file is applied completely or not at all.
+Exports are generated row batch by row batch and never hold the whole table in memory.
+"""
+import csv
+import io
+import os
+import tempfile
+import pandas as pd
+from sqlalchemy import Integer, select
+from sqlalchemy.dialects.sqlite import insert
+
+# Rows per validated/upserted batch (4 columns x 500 rows stays far below SQLite's variable limit)
+IMPORT_BATCH_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+
+
+class ImportValidationError(ValueError):
+    """Raised with the list of row errors when an uploaded file fails validation"""
+
+    def __init__(self, errors, message=None):
+        super().__init__(message or f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+def iter_upload_chunks(file_storage, chunk_size=IMPORT_BATCH_SIZE):
+    """DataFrames of string cells (None for empty) from an uploaded .csv/.xlsx file"""
+    filename = (file_storage.filename or '').lower()
+    if filename.endswith('.xlsx'):
+        return _iter_xlsx_chunks(file_storage.stream, chunk_size)
+    if filename.endswith('.csv'):
+        return _iter_csv_chunks(file_storage.stream, chunk_size)
+    raise ImportValidationError([], "Only .csv and .xlsx files are supported")
+
+
+def _iter_csv_chunks(stream, chunk_size):
+    # Master CSVs exported from Excel are often cp949 (Korean Windows); detect from a sample
+    sample = stream.read(64 * 1024)
+    stream.seek(0)
+    try:
+        sample.decode('utf-8')
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encoding = 'cp949'
+
+    reader = pd.read_csv(stream, encoding=encoding, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    for chunk in reader:
+        yield chunk.map(lambda v: v.strip() or None)
+
+
+def _iter_xlsx_chunks(stream, chunk_size):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c).strip() if c is not None else '' for c in header]
+
+        batch = []
+        for row in rows:
+            values = [_cell_text(v) for v in row[:len(columns)]]
+            if all(v is None for v in values):
+                continue
+            batch.append(values + [None] * (len(columns) - len(values)))
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=columns, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def _cell_text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def import_key(meta):
+    """Upsert key: the first unique non-PK column (monitor_stuffing.series), else the PK"""
+    for key in meta['columns']:
+        column = _column(meta, key)
+        if column.unique and not column.primary_key:
+            return key
+    return meta['pk']
+
+
+def _column(meta, key):
+    return meta['attrs'][key].property.columns[0]
+
+
+def import_rows(session, meta, chunks):
+    """
+    Validate and upsert every chunk inside the session's transaction (the caller commits).
+    Returns {"rows": n, "batches": m}; raises ImportValidationError if any row is invalid.
+    """
+    table = meta['model'].__table__
+    key = import_key(meta)
+    # Accept both attribute keys (ship_to) and DB column names ('Ship To') as headers
+    column_of = {key_: _column(meta, key_) for key_ in meta['columns']}
+    header_map = {}
+    for key_, column in column_of.items():
+        header_map[key_.lower()] = key_
+        header_map[column.name.lower()] = key_
+    # An autoincrement id is never taken from the file
+    writable = [k for k in meta['columns'] if not (k == meta['pk'] and k != key and column_of[k].autoincrement)]
+
+    errors = []
+    total = batches = 0
+    has_unique_key = None
+    row_offset = 2  # header is row 1
+    for chunk in chunks:
+        unknown = [c for c in chunk.columns if c.lower() not in header_map]
+        if unknown:
+            raise ImportValidationError([], f"Unknown columns: {', '.join(unknown)}")
+        chunk = chunk.rename(columns=lambda c: header_map[c.lower()])
+        if key not in chunk.columns:
+            raise ImportValidationError([], f"Missing key column: {key}")
+        chunk = chunk[[c for c in chunk.columns if c in writable]]
+
+        records, chunk_errors = _validate_chunk(chunk, key, column_of, row_offset)
+        row_offset += len(chunk)
+        errors.extend(chunk_errors)
+        if errors:
+            # Keep validating to report errors from the whole file, but stop writing
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                break
+            continue
+
+        key_name = column_of[key].name
+        if has_unique_key is None:
+            has_unique_key = _has_unique_key(session, table.name, key_name)
+        if not has_unique_key:
+            # Tables created by the old import scripts (pandas to_sql) have no key constraint:
+            # replace the rows set-wise instead of ON CONFLICT
+            session.execute(table.delete().where(column_of[key].in_([r[key_name] for r in records])))
+            session.execute(insert(table).values(records))
+            total += len(records)
+            batches += 1
+            continue
+
+        stmt = insert(table).values(records)
+        update_cols = [column_of[c].name for c in chunk.columns if c != key]
+        if update_cols:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[column_of[key].name],
+                set_={name: stmt.excluded[name] for name in update_cols}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[column_of[key].name])
+        session.execute(stmt)
+        total += len(records)
+        batches += 1
+
+    if errors:
+        errors.sort(key=lambda e: e["row"])
+        raise ImportValidationError(errors[:MAX_REPORTED_ERRORS])
+    return {"rows": total, "batches": batches}
+
+
+def _has_unique_key(session, table_name, column_name):
+    """True if the live table has a PRIMARY KEY or UNIQUE index on exactly column_name"""
+    conn = session.connection()
+    pk_columns = [row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table_name}")') if row[5]]
+    if pk_columns == [column_name]:
+        return True
+    for index in conn.exec_driver_sql(f'PRAGMA index_list("{table_name}")').fetchall():
+        if index[2]:
+            columns = [row[2] for row in conn.exec_driver_sql(f'PRAGMA index_info("{index[1]}")')]
+            if columns == [column_name]:
+                return True
+    return False
+
+
+def _validate_chunk(chunk, key, column_of, row_offset):
+    """(records keyed by DB column name, errors) for one chunk; records are empty on any error"""
+    errors = []
+
+    def add_errors(mask, message):
+        for position in mask.to_numpy().nonzero()[0]:
+            errors.append({"row": row_offset + int(position), "error": message(chunk.iloc[position])})
+
+    missing_key = chunk[key].isna()
+    add_errors(missing_key, lambda row: f"{key} is empty")
+    add_errors(chunk[key].duplicated(keep=False) & ~missing_key, lambda row: f"Duplicate {key}: {row[key]}")
+
+    data = {}
+    for col in chunk.columns:
+        values = chunk[col]
+        if isinstance(column_of[col].type, Integer):
+            numbers = pd.to_numeric(values, errors='coerce')
+            bad = values.notna() & (numbers.isna() | (numbers % 1 != 0))
+            if bad.any():
+                add_errors(bad, lambda row, col=col: f"{col} is not an integer: {row[col]}")
+                continue
+            values = numbers.astype('Int64')
+        data[column_of[col].name] = values.astype(object).where(values.notna(), None)
+
+    if errors:
+        return [], errors
+    return pd.DataFrame(data).to_dict(orient='records'), []
+
+
+def _export_batches(engine, meta):
+    columns = [meta['attrs'][c] for c in meta['columns']]
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(
+            select(*columns).order_by(meta['attrs'][meta['pk']])
+        )
+        for batch in result.partitions():
+            yield batch
+
+
+def stream_csv(engine, meta):
+    """Generator of CSV text chunks (header first, UTF-8 BOM so Excel detects the encoding)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(meta['columns'])
+    for batch in _export_batches(engine, meta):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+def stream_xlsx(engine, meta, read_size=64 * 1024):
+    """Generator of XLSX bytes for a master-data table (see spool_xlsx)"""
+    rows = (row for batch in _export_batches(engine, meta) for row in batch)
+    return spool_xlsx(meta['model'].__tablename__, meta['columns'], rows, read_size)
+
+
+def spool_xlsx(sheet_name, header, rows, read_size=64 * 1024):
+    """
+    Generator of XLSX bytes. openpyxl write-only mode keeps memory flat while rows are
+    added; the finished workbook is spooled to a temp file and sent in read_size blocks.
+    """
+    from openpyxl import Workbook
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(list(header))
+        for row in rows:
+            sheet.append(list(row))
+        workbook.save(path)
+
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(read_size)
+                if not block:
+                    break
+                yield block
+    finally:
+        os.remove(path)
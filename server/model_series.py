@@ -0,0 +1,13 @@
+"""
+Series code of GLOP model names, shared by the GLOP driver's model filter and the plan
+simulations: the model name up to the first '-' or '.' (27GQ50F-B.AUS -> 27GQ50F).
+"""
+import pandas as pd
+
+
+def extract_series(models):
+    """
+    Series code of each model name, e.g. 27GQ50F-B.AUS -> 27GQ50F.
+    Same result as x.split('-')[0].split('.')[0], computed with vectorized string ops.
+    """
+    return pd.Series(models).astype(str).str.extract(r'^([^-.]*)', expand=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, UniqueConstraint, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, UniqueConstraint, Text, Index, text
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -33,6 +33,71 @@ class ShipmentPlan(Base):
         return f"<ShipmentPlan(id={self.id}, Planweek='{self.Planweek}', Division='{self.Division}')>"
 
 
+class PlanSnapshot(Base):
+    """Planweek 스냅샷 레지스트리 (shipment_plans 파티션 위치와 상태)"""
+    __tablename__ = 'plan_snapshots'
+
+    planweek = Column(String, primary_key=True)
+    storage = Column(String(20), nullable=False, default='live')  # live, sealed, archived
+    table_name = Column(String(100))  # shipment_plans (live) or shipment_plans_p<planweek> (sealed)
+    archive_path = Column(String(500))  # Parquet file (archived)
+    row_count = Column(Integer, nullable=False, default=0)
+    last_created_at = Column(String)  # MAX(Created_at) of the snapshot
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PlanSnapshot(planweek='{self.planweek}', storage='{self.storage}')>"
+
+
+class SpCube(Base):
+    """SP 집계 큐브 (Planweek x Week x Month x Region x To Site x Category x Series 별 SP 합계)"""
+    __tablename__ = 'sp_cube'
+
+    planweek = Column(String, primary_key=True)
+    week_name = Column(String, primary_key=True)
+    month = Column(String, primary_key=True)
+    region = Column(String, primary_key=True)
+    to_site = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    series = Column(String, primary_key=True)
+    sp = Column(Integer, nullable=False, default=0)
+    row_count = Column(Integer, nullable=False, default=0)  # shipment_plans rows folded into this cell
+
+    __table_args__ = (Index('ix_sp_cube_week_name', 'week_name', 'planweek'),)
+
+    def __repr__(self):
+        return f"<SpCube(planweek='{self.planweek}', week_name='{self.week_name}', sp={self.sp})>"
+
+
+class PlanUploadSession(Base):
+    """Shipment plan 분할 업로드 세션 (청크를 스테이징한 뒤 commit 시 한 번에 반영)"""
+    __tablename__ = 'plan_upload_sessions'
+
+    id = Column(String(36), primary_key=True)
+    status = Column(String(20), nullable=False, default='open')  # open, committed, aborted
+    total_chunks = Column(Integer)
+    columns = Column(Text)  # JSON list of DB column names, fixed by the first chunk
+    rows_affected = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    committed_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<PlanUploadSession(id='{self.id}', status='{self.status}')>"
+
+
+class PlanUploadChunk(Base):
+    """업로드 세션에서 수신 완료된 청크"""
+    __tablename__ = 'plan_upload_chunks'
+
+    session_id = Column(String(36), ForeignKey('plan_upload_sessions.id'), primary_key=True)
+    chunk_no = Column(Integer, primary_key=True)
+    row_count = Column(Integer, nullable=False)
+    received_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PlanUploadChunk(session_id='{self.session_id}', chunk_no={self.chunk_no})>"
+
+
 class User(Base):
     """ORCA 사용자 모델"""
     __tablename__ = 'users'
@@ -74,6 +139,32 @@ class LoginHistory(Base):
     def __repr__(self):
         return f"<LoginHistory(user_id={self.user_id}, login_at='{self.login_at}')>"
 
+class GlopJob(Base):
+    """GLOP 드라이버 실행 작업 (queued -> running -> succeeded / failed / cancelled)"""
+    __tablename__ = 'glop_jobs'
+
+    id = Column(String(36), primary_key=True)
+    product = Column(String(20), nullable=False)
+    supplier = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default='queued')
+    requested_by = Column(Integer, ForeignKey('users.id'))
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # 같은 (product, supplier) 작업은 동시에 하나만 대기/실행
+        Index('ux_glop_jobs_active', 'product', 'supplier', unique=True,
+              sqlite_where=text("status IN ('queued', 'running')")),
+        Index('ix_glop_jobs_created_at', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f"<GlopJob(id='{self.id}', product='{self.product}', supplier='{self.supplier}', status='{self.status}')>"
+
+
 class MonitorStuffing(Base):
     """모니터 적재 수량(Stuffing) 기준 정보 모델"""
     __tablename__ = 'monitor_stuffing'
@@ -126,6 +217,28 @@ class WorkDiary(Base):
     def __repr__(self):
         return f"<WorkDiary(id={self.id}, title='{self.title}', status='{self.status}')>"
 
+class DiaryHashtag(Base):
+    """업무 일지 해시태그 (WorkDiary.hashtags를 태그 단위로 정규화한 테이블)"""
+    __tablename__ = 'diary_hashtags'
+
+    work_entry_id = Column(Integer, ForeignKey('work_diary.id'), primary_key=True)
+    tag = Column(String(100), primary_key=True)  # Normalized: lower case, without '#'
+
+    __table_args__ = (Index('ix_diary_hashtags_tag', 'tag'),)
+
+    def __repr__(self):
+        return f"<DiaryHashtag(work_entry_id={self.work_entry_id}, tag='{self.tag}')>"
+
+class HashtagCount(Base):
+    """해시태그별 사용 횟수 (태그 클라우드용 집계 테이블)"""
+    __tablename__ = 'hashtag_counts'
+
+    tag = Column(String(100), primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<HashtagCount(tag='{self.tag}', entry_count={self.entry_count})>"
+
 class Comment(Base):
     """댓글 모델"""
     __tablename__ = 'comments'
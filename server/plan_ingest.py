@@ -0,0 +1,87 @@
+"""
+Request body decoding for /upsert_shipment_plan.
+
+Besides the original JSON array of records, the endpoint accepts column-oriented bodies
+that are bound to SQLite without building a dict per row (see database.upsert_columns):
+
+  Content-Type                          body
+  application/json                      {"Planweek": [...], "From Site": [...], ...}
+  application/vnd.apache.arrow.stream   Arrow IPC stream
+  application/vnd.apache.arrow.file     Arrow IPC file
+  application/vnd.apache.parquet        Parquet file
+
+Any of them may be sent with Content-Encoding: gzip.
+"""
+import gzip
+import io
+import json
+
+ARROW_STREAM_TYPES = ('application/vnd.apache.arrow.stream',)
+ARROW_FILE_TYPES = ('application/vnd.apache.arrow.file', 'application/x-arrow')
+PARQUET_TYPES = ('application/vnd.apache.parquet', 'application/x-parquet', 'application/parquet')
+
+
+def read_body(request):
+    """Raw request body, gunzipped when Content-Encoding is gzip"""
+    body = request.get_data(cache=False)
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        body = gzip.decompress(body)
+    return body
+
+
+def decode_plan_payload(body, content_type):
+    """
+    Returns (format, data):
+      ('records', list of dicts)         legacy JSON array
+      (fmt, {column: list of values})    columnar JSON / Arrow / Parquet
+    Raises ValueError for an unsupported or malformed body.
+    """
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+
+    if mimetype in ARROW_STREAM_TYPES or mimetype in ARROW_FILE_TYPES or mimetype in PARQUET_TYPES:
+        import pyarrow as pa
+
+        if mimetype in ARROW_STREAM_TYPES:
+            table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+            fmt = 'arrow'
+        elif mimetype in ARROW_FILE_TYPES:
+            table = pa.ipc.open_file(pa.py_buffer(body)).read_all()
+            fmt = 'arrow'
+        else:
+            import pyarrow.parquet as pq
+            table = pq.read_table(io.BytesIO(body))
+            fmt = 'parquet'
+        return fmt, arrow_to_columns(table)
+
+    if mimetype not in ('application/json', ''):
+        raise ValueError(f"Unsupported Content-Type: {content_type}")
+
+    data = json.loads(body) if body else None
+    if isinstance(data, list):
+        if not all(isinstance(r, dict) for r in data):
+            raise ValueError("Body must be a JSON array of records (objects)")
+        return 'records', data
+    if isinstance(data, dict) and data and all(isinstance(v, list) for v in data.values()):
+        return 'columns', data
+    raise ValueError("Body must be a JSON array of records or an object of column arrays")
+
+
+def arrow_to_columns(table):
+    """{column: list of Python values}; date/time columns become ISO strings like the JSON path"""
+    import pyarrow as pa
+
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_temporal(column.type):
+            column = column.cast(pa.string())
+        elif pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        columns[name] = column.to_pylist()
+    return columns
+
+
+def records_to_columns(records):
+    """[{column: value}, ...] -> {column: [values]} (columns from the first record; missing keys are None)"""
+    if not records:
+        return {}
+    return {name: [record.get(name) for record in records] for name in records[0]}
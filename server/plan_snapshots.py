@@ -0,0 +1,343 @@
+"""
+Planweek snapshots of shipment_plans.
+
+Every weekly plan (Planweek) is a snapshot. Snapshots move through three storages:
+
+  live      rows in shipment_plans (the newest KEEP_LIVE Planweeks; all uploads land here)
+  sealed    rows moved to their own table shipment_plans_p<planweek>
+  archived  table exported to ARCHIVE_DIR/<planweek>.parquet and dropped
+
+plan_snapshots is the registry (storage, location, row count) and its maximum Planweek is
+the latest snapshot. compact() is the retention/compaction job. snapshot_source() and
+read_snapshot() resolve a Planweek (default: latest) to the one place that holds it, so a
+query never scans other snapshots. Uploading into a sealed or archived Planweek first moves
+it back to live (ensure_live), and the next compact() seals it again. Uploads run inside
+uploading(planweeks); while one is in flight compact() leaves those Planweeks live, so a
+snapshot is never sealed between ensure_live() and the upsert.
+
+    python server/plan_snapshots.py [compact | list]
+"""
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import closing, contextmanager
+from datetime import datetime
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import engine
+from db_indexes import quote_ident
+from models import ShipmentPlan
+
+LIVE_TABLE = ShipmentPlan.__tablename__
+KEEP_LIVE = int(os.environ.get('ORCA_PLAN_KEEP_LIVE', 2))
+KEEP_SEALED = int(os.environ.get('ORCA_PLAN_KEEP_SEALED', 26))
+ARCHIVE_DIR = os.environ.get(
+    'ORCA_PLAN_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'archive', 'shipment_plans')
+)
+
+# Data columns of a snapshot (everything except the autoincrement id)
+DATA_COLUMNS = [c for c in ShipmentPlan.__table__.columns if not (c.primary_key and c.autoincrement)]
+COLUMN_NAMES = [c.name for c in DATA_COLUMNS]
+_COLUMN_LIST = ', '.join(quote_ident(n) for n in COLUMN_NAMES)
+
+# Planweeks with an upload in flight (count per Planweek). seal()/archive() check it under
+# _move_lock, so a move either finishes before the upload registers or is skipped.
+_move_lock = threading.Lock()
+_uploads_in_flight = Counter()
+
+
+def partition_table(planweek):
+    return f"{LIVE_TABLE}_p{re.sub(r'[^0-9A-Za-z_]', '_', str(planweek))}"
+
+
+def _now():
+    return datetime.utcnow().isoformat(' ')
+
+
+def _registry(conn, planweeks=None):
+    sql = "SELECT planweek, storage, table_name, archive_path, row_count, updated_at FROM plan_snapshots"
+    params = []
+    if planweeks is not None:
+        planweeks = list(planweeks)
+        if not planweeks:
+            return {}
+        sql += f" WHERE planweek IN ({', '.join('?' for _ in planweeks)})"
+        params = planweeks
+    return {
+        row[0]: {'planweek': row[0], 'storage': row[1], 'table_name': row[2], 'archive_path': row[3],
+                 'row_count': row[4], 'updated_at': row[5]}
+        for row in conn.execute(sql, params)
+    }
+
+
+def refresh_registry(planweeks=None):
+    """
+    Recount the live snapshots (all, or only `planweeks`) from shipment_plans.
+    Call after every upload into shipment_plans.
+    """
+    with closing(engine.raw_connection()) as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            params, where = [], ''
+            if planweeks is not None:
+                params = [p for p in set(planweeks) if p is not None]
+                if not params:
+                    conn.rollback()
+                    return
+                where = f'WHERE "Planweek" IN ({", ".join("?" for _ in params)})'
+            counts = conn.execute(
+                f'SELECT "Planweek", COUNT(*), MAX("Created_at") FROM {LIVE_TABLE} {where} GROUP BY "Planweek"', params
+            ).fetchall()
+            conn.executemany(
+                "INSERT INTO plan_snapshots (planweek, storage, table_name, row_count, last_created_at, updated_at) "
+                "VALUES (?, 'live', ?, ?, ?, ?) "
+                "ON CONFLICT (planweek) DO UPDATE SET storage = 'live', table_name = excluded.table_name, "
+                "archive_path = NULL, row_count = excluded.row_count, last_created_at = excluded.last_created_at, "
+                "updated_at = excluded.updated_at",
+                [(planweek, LIVE_TABLE, count, created_at, _now()) for planweek, count, created_at in counts]
+            )
+            # Live snapshots whose rows are all gone
+            present = {row[0] for row in counts}
+            stale = [p for p, snap in _registry(conn, params if planweeks is not None else None).items()
+                     if snap['storage'] == 'live' and p not in present]
+            conn.executemany("DELETE FROM plan_snapshots WHERE planweek = ?", [(p,) for p in stale])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def init_snapshots():
+    """Build the registry for a database that predates it"""
+    with closing(engine.raw_connection()) as conn:
+        empty = conn.execute("SELECT 1 FROM plan_snapshots LIMIT 1").fetchone() is None
+    if empty:
+        refresh_registry()
+
+
+def ensure_live(planweeks):
+    """Move sealed/archived snapshots of `planweeks` back into shipment_plans before an upload"""
+    with closing(engine.raw_connection()) as conn:
+        pending = [p for p, s in _registry(conn, {p for p in planweeks if p is not None}).items() if s['storage'] != 'live']
+    moved, restored_files = [], []
+    for planweek in pending:
+        with closing(engine.raw_connection()) as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                # Re-read under the write lock: a concurrent upload may have restored it already
+                snap = _registry(conn, [planweek]).get(planweek)
+                if snap is None or snap['storage'] == 'live':
+                    conn.rollback()
+                    continue
+                if snap['storage'] == 'sealed':
+                    conn.execute(
+                        f"INSERT INTO {LIVE_TABLE} ({_COLUMN_LIST}) SELECT {_COLUMN_LIST} FROM {quote_ident(snap['table_name'])} "
+                        f"WHERE true ON CONFLICT DO NOTHING"
+                    )
+                    conn.execute(f"DROP TABLE {quote_ident(snap['table_name'])}")
+                else:
+                    df = pd.read_parquet(snap['archive_path'], columns=COLUMN_NAMES)
+                    conn.executemany(
+                        f"INSERT INTO {LIVE_TABLE} ({_COLUMN_LIST}) VALUES ({', '.join('?' for _ in COLUMN_NAMES)}) "
+                        f"ON CONFLICT DO NOTHING",
+                        df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+                    )
+                conn.execute(
+                    "UPDATE plan_snapshots SET storage = 'live', table_name = ?, archive_path = NULL, updated_at = ? "
+                    "WHERE planweek = ?",
+                    (LIVE_TABLE, _now(), snap['planweek'])
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        moved.append(planweek)
+        if snap['archive_path']:
+            restored_files.append(snap['archive_path'])
+    # The rows are back in shipment_plans; the Parquet file is no longer referenced
+    for path in restored_files:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return moved
+
+
+@contextmanager
+def uploading(planweeks):
+    """
+    Wrap an upload into shipment_plans: marks `planweeks` as in flight, moves them back to
+    live (ensure_live) and keeps compact() from sealing them until the block exits.
+    """
+    planweeks = {p for p in planweeks if p is not None}
+    with _move_lock:
+        _uploads_in_flight.update(planweeks)
+    try:
+        ensure_live(planweeks)
+        yield
+    finally:
+        with _move_lock:
+            _uploads_in_flight.subtract(planweeks)
+            for planweek in planweeks:
+                if _uploads_in_flight[planweek] <= 0:
+                    del _uploads_in_flight[planweek]
+
+
+def seal(planweek):
+    """
+    Move one live snapshot out of shipment_plans into its own partition table.
+    Returns None (nothing moved) while an upload into the Planweek is in flight.
+    """
+    table = partition_table(planweek)
+    columns = ', '.join(
+        f"{quote_ident(c.name)} {'INTEGER' if c.type.python_type is int else 'TEXT'}" for c in DATA_COLUMNS
+    )
+    with _move_lock, closing(engine.raw_connection()) as conn:
+        if _uploads_in_flight[planweek] > 0:
+            return None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f"DROP TABLE IF EXISTS {quote_ident(table)}")
+            conn.execute(f"CREATE TABLE {quote_ident(table)} ({columns})")
+            conn.execute(
+                f'INSERT INTO {quote_ident(table)} ({_COLUMN_LIST}) SELECT {_COLUMN_LIST} FROM {LIVE_TABLE} WHERE "Planweek" = ?',
+                (planweek,)
+            )
+            conn.execute(f'CREATE INDEX {quote_ident("ix_" + table + "_week_name")} ON {quote_ident(table)} ("Week Name")')
+            row_count = conn.execute(f'DELETE FROM {LIVE_TABLE} WHERE "Planweek" = ?', (planweek,)).rowcount
+            conn.execute(
+                "UPDATE plan_snapshots SET storage = 'sealed', table_name = ?, row_count = ?, updated_at = ? WHERE planweek = ?",
+                (table, row_count, _now(), planweek)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return table
+
+
+def archive(planweek, archive_dir=ARCHIVE_DIR):
+    """
+    Export one sealed snapshot to Parquet and drop its partition table.
+    Returns None (nothing moved) while an upload is in flight or the snapshot is no longer sealed.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{re.sub(r'[^0-9A-Za-z_]', '_', str(planweek))}.parquet")
+    with _move_lock, closing(engine.raw_connection()) as conn:
+        if _uploads_in_flight[planweek] > 0:
+            return None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            snap = _registry(conn, [planweek]).get(planweek)
+            if snap is None or snap['storage'] != 'sealed':
+                conn.rollback()
+                return None
+            table = snap['table_name']
+            df = pd.read_sql_query(f"SELECT {_COLUMN_LIST} FROM {quote_ident(table)}", conn.driver_connection)
+            # Write next to the target and rename, so a crash never leaves a half-written archive
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path + '.tmp')
+            os.replace(path + '.tmp', path)
+            conn.execute(f"DROP TABLE {quote_ident(table)}")
+            conn.execute(
+                "UPDATE plan_snapshots SET storage = 'archived', table_name = NULL, archive_path = ?, updated_at = ? "
+                "WHERE planweek = ?",
+                (path, _now(), planweek)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return path
+
+
+def compact(keep_live=KEEP_LIVE, keep_sealed=KEEP_SEALED, archive_dir=ARCHIVE_DIR):
+    """
+    Retention/compaction job: keep the newest keep_live Planweeks live, seal the next
+    keep_sealed into partition tables and archive everything older to Parquet.
+    Each snapshot is moved in its own transaction so uploads are never blocked for long.
+    Planweeks with an upload in flight are skipped and picked up by the next run.
+    """
+    refresh_registry()
+    with closing(engine.raw_connection()) as conn:
+        snapshots = sorted(_registry(conn).values(), key=lambda s: s['planweek'], reverse=True)
+
+    sealed, archived = [], []
+    for rank, snap in enumerate(snapshots):
+        if rank >= keep_live and snap['storage'] == 'live':
+            if seal(snap['planweek']) is None:
+                continue
+            snap['storage'] = 'sealed'
+            sealed.append(snap['planweek'])
+        if rank >= keep_live + keep_sealed and snap['storage'] == 'sealed':
+            if archive(snap['planweek'], archive_dir) is not None:
+                archived.append(snap['planweek'])
+    return {"sealed": sealed, "archived": archived, "snapshots": len(snapshots)}
+
+
+def list_snapshots():
+    with closing(engine.raw_connection()) as conn:
+        rows = conn.execute(
+            "SELECT planweek, storage, table_name, archive_path, row_count, last_created_at, updated_at "
+            "FROM plan_snapshots ORDER BY planweek DESC"
+        ).fetchall()
+    keys = ['planweek', 'storage', 'table_name', 'archive_path', 'row_count', 'last_created_at', 'updated_at']
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def latest_planweek():
+    with closing(engine.raw_connection()) as conn:
+        return conn.execute("SELECT MAX(planweek) FROM plan_snapshots").fetchone()[0]
+
+
+def snapshot_source(planweek=None):
+    """
+    Where a snapshot lives: {planweek, storage, table, where, params, archive_path, updated_at}.
+    updated_at changes whenever the snapshot is re-uploaded, so (planweek, updated_at) identifies its content.
+    `SELECT ... FROM {table} {where}` with params reads exactly that snapshot (SQL storages).
+    Raises KeyError for an unknown Planweek (or when there are no snapshots yet).
+    """
+    with closing(engine.raw_connection()) as conn:
+        if planweek is None:
+            planweek = conn.execute("SELECT MAX(planweek) FROM plan_snapshots").fetchone()[0]
+        snap = _registry(conn, [planweek]).get(planweek) if planweek is not None else None
+    if snap is None:
+        raise KeyError(f"Unknown Planweek: {planweek}")
+
+    source = {'planweek': planweek, 'storage': snap['storage'], 'archive_path': snap['archive_path'],
+              'updated_at': snap['updated_at'], 'table': None, 'where': '', 'params': []}
+    if snap['storage'] == 'live':
+        source.update(table=LIVE_TABLE, where='WHERE "Planweek" = ?', params=[planweek])
+    elif snap['storage'] == 'sealed':
+        source.update(table=snap['table_name'])
+    return source
+
+
+def read_snapshot(planweek=None, columns=None, source=None):
+    """DataFrame of one snapshot (default: latest), read only from the storage that holds it"""
+    source = source or snapshot_source(planweek)
+    columns = columns or COLUMN_NAMES
+    if source['storage'] == 'archived':
+        return pd.read_parquet(source['archive_path'], columns=columns)
+    column_list = ', '.join(quote_ident(c) for c in columns)
+    with closing(engine.raw_connection()) as conn:
+        return pd.read_sql_query(
+            f"SELECT {column_list} FROM {quote_ident(source['table'])} {source['where']}",
+            conn.driver_connection, params=source['params']
+        )
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'compact'
+    if command == 'compact':
+        print(compact())
+    for snap in list_snapshots():
+        print(f"{snap['planweek']:<10} {snap['storage']:<9} {snap['row_count']:>9,} rows  "
+              f"{snap['table_name'] or snap['archive_path']}")
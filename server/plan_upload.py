@@ -0,0 +1,245 @@
+"""
+Resumable, idempotent chunked uploads of shipment plans.
+
+  open     POST   /upsert_shipment_plan/sessions              {"total_chunks": n}
+  chunk    PUT    /upsert_shipment_plan/sessions/<id>/chunks/<k>   (any /upsert_shipment_plan body)
+  status   GET    /upsert_shipment_plan/sessions/<id>          received chunk numbers, for resuming
+  commit   POST   /upsert_shipment_plan/sessions/<id>/commit
+  abort    DELETE /upsert_shipment_plan/sessions/<id>
+
+Chunks are numbered 0..total_chunks-1 and may arrive in any order and in parallel. Sending
+a chunk again replaces its staged rows, so retries are safe. Rows wait in
+shipment_plans_staging until commit, which moves the whole session into shipment_plans
+with one INSERT ... SELECT ... ON CONFLICT in a single transaction. Committing twice
+returns the first result.
+"""
+import json
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta
+from database import engine, resolve_columns, upsert_sql, SHIPMENT_PLAN_KEYS
+from db_indexes import quote_ident
+from plan_snapshots import uploading, refresh_registry
+from sp_cube import refresh_cube
+
+STAGING_TABLE = 'shipment_plans_staging'
+
+# Uncommitted sessions older than this are dropped (with their staged rows) when a new one opens
+SESSION_TTL = timedelta(hours=24)
+
+
+class UploadSessionError(Exception):
+    """Raised for requests that do not fit the session state; carries the HTTP status"""
+
+    def __init__(self, message, status=409):
+        super().__init__(message)
+        self.status = status
+
+
+def init_upload_staging(model_class):
+    """Create the staging table: session_id, chunk_no and the data columns of model_class"""
+    columns = [
+        f"{quote_ident(c.name)} {'INTEGER' if c.type.python_type is int else 'TEXT'}"
+        for c in model_class.__table__.columns
+        if not (c.primary_key and c.autoincrement)
+    ]
+    with closing(engine.raw_connection()) as conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {STAGING_TABLE} "
+            f"(session_id TEXT NOT NULL, chunk_no INTEGER NOT NULL, {', '.join(columns)})"
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{STAGING_TABLE}_session_chunk "
+            f"ON {STAGING_TABLE} (session_id, chunk_no)"
+        )
+        conn.commit()
+
+
+def _now():
+    # Same text format SQLAlchemy's DateTime uses for SQLite
+    return datetime.utcnow().isoformat(' ')
+
+
+def _begin(conn):
+    # Take the write lock up front; parallel chunk requests queue on busy_timeout
+    conn.execute("BEGIN IMMEDIATE")
+
+
+def _load_session(conn, session_id):
+    row = conn.execute(
+        "SELECT status, total_chunks, columns, rows_affected FROM plan_upload_sessions WHERE id = ?",
+        (session_id,)
+    ).fetchone()
+    if row is None:
+        raise UploadSessionError("Upload session not found", 404)
+    return {
+        'status': row[0],
+        'total_chunks': row[1],
+        'columns': json.loads(row[2]) if row[2] else None,
+        'rows_affected': row[3],
+    }
+
+
+def open_session(total_chunks=None):
+    """Create a session and drop expired uncommitted ones. Returns the session id."""
+    if total_chunks is not None and (not isinstance(total_chunks, int) or total_chunks < 1):
+        raise UploadSessionError("total_chunks must be a positive integer", 400)
+    session_id = str(uuid.uuid4())
+    expired = datetime.utcnow() - SESSION_TTL
+    with closing(engine.raw_connection()) as conn:
+        try:
+            _begin(conn)
+            stale = [row[0] for row in conn.execute(
+                "SELECT id FROM plan_upload_sessions WHERE status = 'open' AND created_at < ?", (expired.isoformat(' '),)
+            )]
+            for stale_id in stale:
+                _discard(conn, stale_id, 'aborted')
+            conn.execute(
+                "INSERT INTO plan_upload_sessions (id, status, total_chunks, created_at) VALUES (?, 'open', ?, ?)",
+                (session_id, total_chunks, _now())
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return session_id
+
+
+def session_status(session_id):
+    with closing(engine.raw_connection()) as conn:
+        session = _load_session(conn, session_id)
+        chunks = conn.execute(
+            "SELECT chunk_no, row_count FROM plan_upload_chunks WHERE session_id = ? ORDER BY chunk_no",
+            (session_id,)
+        ).fetchall()
+    return {
+        "session_id": session_id,
+        "status": session['status'],
+        "total_chunks": session['total_chunks'],
+        "received_chunks": [c[0] for c in chunks],
+        "staged_rows": sum(c[1] for c in chunks),
+        "rows_affected": session['rows_affected'],
+    }
+
+
+def put_chunk(session_id, chunk_no, columns, model_class):
+    """Stage one chunk ({column: values}), replacing an earlier copy of the same chunk"""
+    names = resolve_columns(columns, model_class)
+    values = list(columns.values())
+    row_count = len(values[0]) if values else 0
+
+    with closing(engine.raw_connection()) as conn:
+        try:
+            _begin(conn)
+            session = _load_session(conn, session_id)
+            if session['status'] != 'open':
+                raise UploadSessionError(f"Upload session is {session['status']}")
+            if chunk_no < 0 or (session['total_chunks'] is not None and chunk_no >= session['total_chunks']):
+                raise UploadSessionError(f"chunk_no must be in 0..{(session['total_chunks'] or 1) - 1}", 400)
+
+            # Every chunk must carry the same columns, or the final upsert would null out
+            # the columns a chunk left out
+            if session['columns'] is None:
+                conn.execute("UPDATE plan_upload_sessions SET columns = ? WHERE id = ?", (json.dumps(names), session_id))
+            elif sorted(session['columns']) != sorted(names):
+                raise UploadSessionError("Chunk columns differ from the first chunk of the session", 400)
+
+            conn.execute(f"DELETE FROM {STAGING_TABLE} WHERE session_id = ? AND chunk_no = ?", (session_id, chunk_no))
+            if row_count:
+                column_list = ', '.join(quote_ident(n) for n in names)
+                conn.cursor().executemany(
+                    f"INSERT INTO {STAGING_TABLE} (session_id, chunk_no, {column_list}) "
+                    f"VALUES (?, ?, {', '.join('?' for _ in names)})",
+                    ((session_id, chunk_no, *row) for row in zip(*values))
+                )
+            conn.execute(
+                "INSERT INTO plan_upload_chunks (session_id, chunk_no, row_count, received_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (session_id, chunk_no) DO UPDATE SET row_count = excluded.row_count, received_at = excluded.received_at",
+                (session_id, chunk_no, row_count, _now())
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return {"session_id": session_id, "chunk_no": chunk_no, "rows": row_count}
+
+
+def commit_session(session_id, model_class, total_chunks=None):
+    """
+    Move all staged rows of the session into the target table in one transaction.
+    Returns {"rows_affected": n, "already_committed": bool}.
+    """
+    with closing(engine.raw_connection()) as conn:
+        planweeks = [row[0] for row in conn.execute(
+            f'SELECT DISTINCT "Planweek" FROM {STAGING_TABLE} WHERE session_id = ?', (session_id,)
+        )]
+    # Keeps compact() from sealing these Planweeks until the rows are in
+    with uploading(planweeks):
+        with closing(engine.raw_connection()) as conn:
+            try:
+                _begin(conn)
+                session = _load_session(conn, session_id)
+                if session['status'] == 'committed':
+                    conn.rollback()
+                    return {"rows_affected": session['rows_affected'], "already_committed": True}
+                if session['status'] != 'open':
+                    raise UploadSessionError(f"Upload session is {session['status']}")
+
+                expected = total_chunks if total_chunks is not None else session['total_chunks']
+                if expected is None:
+                    raise UploadSessionError("total_chunks is required to commit", 400)
+                received = {row[0] for row in conn.execute(
+                    "SELECT chunk_no FROM plan_upload_chunks WHERE session_id = ?", (session_id,)
+                )}
+                missing = sorted(set(range(expected)) - received)
+                if missing:
+                    raise UploadSessionError(f"Missing chunks: {missing[:20]}{' ...' if len(missing) > 20 else ''}")
+                if received - set(range(expected)):
+                    raise UploadSessionError("Received chunks beyond total_chunks", 400)
+
+                rows_affected = 0
+                names = session['columns']
+                if names:
+                    column_list = ', '.join(quote_ident(n) for n in names)
+                    # Later chunks win for duplicate keys: rows are applied in chunk order
+                    cursor = conn.execute(
+                        upsert_sql(
+                            model_class.__tablename__, names, SHIPMENT_PLAN_KEYS,
+                            source=f"SELECT {column_list} FROM {STAGING_TABLE} WHERE session_id = ? ORDER BY chunk_no, rowid"
+                        ),
+                        (session_id,)
+                    )
+                    rows_affected = cursor.rowcount
+                conn.execute(f"DELETE FROM {STAGING_TABLE} WHERE session_id = ?", (session_id,))
+                conn.execute(
+                    "UPDATE plan_upload_sessions SET status = 'committed', total_chunks = ?, rows_affected = ?, committed_at = ? "
+                    "WHERE id = ?",
+                    (expected, rows_affected, _now(), session_id)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        refresh_registry(planweeks)
+    refresh_cube(planweeks)
+    return {"rows_affected": rows_affected, "already_committed": False}
+
+
+def abort_session(session_id):
+    with closing(engine.raw_connection()) as conn:
+        try:
+            _begin(conn)
+            session = _load_session(conn, session_id)
+            if session['status'] == 'committed':
+                raise UploadSessionError("Upload session is already committed")
+            _discard(conn, session_id, 'aborted')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def _discard(conn, session_id, status):
+    conn.execute(f"DELETE FROM {STAGING_TABLE} WHERE session_id = ?", (session_id,))
+    conn.execute("DELETE FROM plan_upload_chunks WHERE session_id = ?", (session_id,))
+    conn.execute("UPDATE plan_upload_sessions SET status = ? WHERE id = ?", (status, session_id))
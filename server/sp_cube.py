@@ -0,0 +1,131 @@
+"""
+Materialized SP cube for the SP visualization and forecast pages.
+
+sp_cube holds SUM(SP) of shipment_plans by Planweek x Week Name x Month x Region x To Site x
+Category x series (NULL dimensions are stored as ''). The cells of a Planweek are rebuilt from
+its snapshot after every upload into it (refresh_cube), so the charts group a table of a few
+thousand rows per Planweek instead of the raw plan. Sealing or archiving a snapshot does not
+change its cells, so the cube keeps covering compacted Planweeks.
+"""
+from contextlib import closing
+import pandas as pd
+from sqlalchemy import select, func
+from database import engine
+from model_series import extract_series
+from models import SpCube
+from plan_snapshots import snapshot_source, read_snapshot
+
+# API name -> cube column
+DIMENSIONS = {
+    'planweek': SpCube.planweek,
+    'week_name': SpCube.week_name,
+    'month': SpCube.month,
+    'region': SpCube.region,
+    'to_site': SpCube.to_site,
+    'category': SpCube.category,
+    'series': SpCube.series,
+}
+
+# Same result as model_series.extract_series: model name up to the first '-' or '.'
+_MODEL = '"Mapping Model.Suffix"'
+SERIES_SQL = (
+    f"CASE WHEN instr({_MODEL}, '-') = 0 AND instr({_MODEL}, '.') = 0 THEN {_MODEL} "
+    f"WHEN instr({_MODEL}, '-') = 0 THEN substr({_MODEL}, 1, instr({_MODEL}, '.') - 1) "
+    f"WHEN instr({_MODEL}, '.') = 0 THEN substr({_MODEL}, 1, instr({_MODEL}, '-') - 1) "
+    f"ELSE substr({_MODEL}, 1, min(instr({_MODEL}, '-'), instr({_MODEL}, '.')) - 1) END"
+)
+
+_INSERT = (
+    "INSERT INTO sp_cube (planweek, week_name, month, region, to_site, category, series, sp, row_count) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _aggregate_frame(plan):
+    """Cube cells of an archived snapshot (read from Parquet) as tuples for _INSERT"""
+    frame = pd.DataFrame({
+        'week_name': plan['Week Name'], 'month': plan['Month'], 'region': plan['Region'],
+        'to_site': plan['To Site'], 'category': plan['Category'],
+        'series': extract_series(plan['Mapping Model.Suffix'].fillna('').astype(str)).to_numpy(),
+    }).fillna('').astype(str)
+    frame['sp'] = pd.to_numeric(plan['SP'], errors='coerce').fillna(0).astype(int).to_numpy()
+    cells = frame.groupby(list(frame.columns[:-1]), sort=False)['sp'].agg(['sum', 'size']).reset_index()
+    return [(*row[:-2], int(row[-2]), int(row[-1])) for row in cells.itertuples(index=False, name=None)]
+
+
+def refresh_cube(planweeks):
+    """Rebuild the cube cells of each Planweek from its snapshot. Call after every upload."""
+    for planweek in {p for p in planweeks if p is not None}:
+        try:
+            source = snapshot_source(planweek)
+        except KeyError:
+            source = None  # every row of the Planweek is gone
+
+        with closing(engine.raw_connection()) as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM sp_cube WHERE planweek = ?", (planweek,))
+                if source is not None and source['storage'] == 'archived':
+                    conn.executemany(_INSERT, [(planweek, *cell) for cell in _aggregate_frame(
+                        read_snapshot(source=source, columns=['Week Name', 'Month', 'Region', 'To Site', 'Category',
+                                                              'Mapping Model.Suffix', 'SP'])
+                    )])
+                elif source is not None:
+                    conn.execute(
+                        f"INSERT INTO sp_cube (planweek, week_name, month, region, to_site, category, series, sp, row_count) "
+                        f"SELECT ?, COALESCE(\"Week Name\", ''), COALESCE(\"Month\", ''), COALESCE(\"Region\", ''), "
+                        f"COALESCE(\"To Site\", ''), COALESCE(\"Category\", ''), COALESCE({SERIES_SQL}, ''), "
+                        f"SUM(COALESCE(\"SP\", 0)), COUNT(*) "
+                        f"FROM \"{source['table']}\" {source['where']} GROUP BY 2, 3, 4, 5, 6, 7",
+                        [planweek, *source['params']]
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+
+def init_cube():
+    """Build the cells of every registered Planweek the cube does not cover yet"""
+    with closing(engine.raw_connection()) as conn:
+        missing = [row[0] for row in conn.execute(
+            "SELECT planweek FROM plan_snapshots EXCEPT SELECT DISTINCT planweek FROM sp_cube"
+        )]
+    refresh_cube(missing)
+
+
+def _where(filters):
+    return [DIMENSIONS[dim].in_(values) for dim, values in filters.items() if values]
+
+
+def query_cube(group_by, filters=None):
+    """
+    SUM(sp) grouped by the `group_by` dimensions, restricted by `filters` ({dimension: [values]}).
+    Returns [{dimension: value, ..., 'sp': n}] ordered by the group_by dimensions.
+    """
+    unknown = [d for d in [*group_by, *(filters or {})] if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension: {', '.join(unknown)}")
+    columns = [DIMENSIONS[d] for d in group_by]
+    stmt = (
+        select(*columns, func.sum(SpCube.sp).label('sp'))
+        .where(*_where(filters or {}))
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    with engine.connect() as conn:
+        return [dict(zip([*group_by, 'sp'], row)) for row in conn.execute(stmt)]
+
+
+def dimension_values(filters=None):
+    """Distinct values of every dimension within `filters`, for the chart filter controls"""
+    unknown = [d for d in (filters or {}) if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension: {', '.join(unknown)}")
+    with engine.connect() as conn:
+        return {
+            dim: [row[0] for row in conn.execute(
+                select(column).distinct().where(*_where(filters or {})).order_by(column)
+            )]
+            for dim, column in DIMENSIONS.items()
+        }
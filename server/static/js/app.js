@@ -24,66 +24,137 @@ document.addEventListener('DOMContentLoaded', function () {
         driverStatus.className = `status-badge status-${type}`;
     }
 
+    const cancelBtn = document.getElementById('cancel-btn');
+    const FINAL_STATES = { succeeded: 'active', failed: 'rejected', cancelled: 'rejected' };
+    let currentJobId = null;
+
+    function resetButtons() {
+        driveBtn.disabled = false;
+        driveBtn.textContent = '🚀 Drive GLOP';
+        if (cancelBtn) cancelBtn.disabled = true;
+        currentJobId = null;
+    }
+
+    // Subscribe to a job's event stream; the job keeps running if this page is closed
+    function watchJob(jobId) {
+        if (eventSource) {
+            eventSource.close();
+        }
+        currentJobId = jobId;
+        driveBtn.disabled = true;
+        driveBtn.textContent = '⏳ 실행 중...';
+        if (cancelBtn) cancelBtn.disabled = false;
+
+        eventSource = new EventSource(`/api/glop-jobs/${jobId}/events`);
+
+        eventSource.onmessage = function (event) {
+            const data = JSON.parse(event.data);
+
+            if (data.type === 'log') {
+                let logType = 'info';
+                if (data.message.includes('완료') || data.message.includes('성공')) {
+                    logType = 'success';
+                } else if (data.message.includes('오류') || data.message.includes('실패')) {
+                    logType = 'error';
+                } else if (data.message.includes('알림') || data.message.includes('>>>')) {
+                    logType = 'highlight';
+                }
+                addLog(data.message, logType);
+            } else if (data.type === 'job') {
+                addLog(`Job ${data.job.id.slice(0, 8)} (${data.job.product.toUpperCase()} / ${data.job.supplier}): ${data.job.status}`, 'highlight');
+            } else if (data.type === 'status') {
+                if (FINAL_STATES[data.status]) {
+                    // Job finished before this server process started: no event history
+                    updateStatus(data.message, FINAL_STATES[data.status]);
+                    eventSource.close();
+                    resetButtons();
+                } else {
+                    updateStatus(data.message, data.status);
+                }
+            } else if (data.type === 'complete') {
+                addLog('GLOP Driver 작업 완료', 'success');
+                updateStatus('완료', 'active');
+                eventSource.close();
+                resetButtons();
+            } else if (data.type === 'cancelled') {
+                addLog(data.message, 'error');
+                updateStatus('취소됨', 'rejected');
+                eventSource.close();
+                resetButtons();
+            } else if (data.type === 'error') {
+                addLog(`오류: ${data.message}`, 'error');
+                updateStatus('오류 발생', 'rejected');
+                eventSource.close();
+                resetButtons();
+            }
+        };
+
+        // EventSource reconnects on its own and resumes after the last event id
+        eventSource.onerror = function () {
+            if (eventSource.readyState === EventSource.CLOSED) {
+                addLog('연결이 끊어졌습니다.', 'error');
+                updateStatus('연결 끊김', 'rejected');
+                resetButtons();
+            }
+        };
+    }
+
     // Drive button click handler
     if (driveBtn) {
-        driveBtn.addEventListener('click', function () {
+        driveBtn.addEventListener('click', async function () {
             const product = productCategory.value;
             const supplier = supplierCategory.value;
 
-            // Close existing connection
-            if (eventSource) {
-                eventSource.close();
-            }
-
             // Clear console
             logConsole.innerHTML = '';
-            addLog(`GLOP Driver 시작: Product=${product.toUpperCase()}, Supplier=${supplier}`, 'highlight');
-            updateStatus('실행 중...', 'pending');
-
-            // Disable button during execution
+            addLog(`GLOP Driver 요청: Product=${product.toUpperCase()}, Supplier=${supplier}`, 'highlight');
+            updateStatus('대기 중', 'pending');
             driveBtn.disabled = true;
-            driveBtn.textContent = '⏳ 실행 중...';
-
-            // Connect to SSE endpoint
-            eventSource = new EventSource(`/api/drive_glop?product=${product}&supplier=${supplier}`);
-
-            eventSource.onmessage = function (event) {
-                const data = JSON.parse(event.data);
-
-                if (data.type === 'log') {
-                    let logType = 'info';
-                    if (data.message.includes('완료') || data.message.includes('성공')) {
-                        logType = 'success';
-                    } else if (data.message.includes('오류') || data.message.includes('실패')) {
-                        logType = 'error';
-                    } else if (data.message.includes('알림') || data.message.includes('>>>')) {
-                        logType = 'highlight';
-                    }
-                    addLog(data.message, logType);
-                } else if (data.type === 'status') {
-                    updateStatus(data.message, data.status);
-                } else if (data.type === 'complete') {
-                    addLog('GLOP Driver 작업 완료', 'success');
-                    updateStatus('완료', 'active');
-                    eventSource.close();
-                    driveBtn.disabled = false;
-                    driveBtn.textContent = '🚀 Drive GLOP';
-                } else if (data.type === 'error') {
-                    addLog(`오류: ${data.message}`, 'error');
-                    updateStatus('오류 발생', 'rejected');
-                    eventSource.close();
-                    driveBtn.disabled = false;
-                    driveBtn.textContent = '🚀 Drive GLOP';
-                }
-            };
 
-            eventSource.onerror = function () {
-                addLog('연결이 끊어졌습니다.', 'error');
-                updateStatus('연결 끊김', 'rejected');
-                eventSource.close();
-                driveBtn.disabled = false;
-                driveBtn.textContent = '🚀 Drive GLOP';
-            };
+            try {
+                const response = await fetch('/api/glop-jobs', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ product, supplier })
+                });
+                const result = await response.json();
+                if (!response.ok) {
+                    throw new Error(result.error || response.statusText);
+                }
+                if (result.reused) {
+                    addLog('같은 조건의 작업이 이미 진행 중입니다. 해당 작업에 연결합니다.', 'highlight');
+                }
+                watchJob(result.job.id);
+            } catch (e) {
+                addLog(`오류: ${e.message}`, 'error');
+                updateStatus('오류 발생', 'rejected');
+                resetButtons();
+            }
         });
+
+        if (cancelBtn) {
+            cancelBtn.addEventListener('click', async function () {
+                if (!currentJobId) return;
+                cancelBtn.disabled = true;
+                const response = await fetch(`/api/glop-jobs/${currentJobId}/cancel`, { method: 'POST' });
+                if (!response.ok) {
+                    const result = await response.json();
+                    addLog(`취소 실패: ${result.error || response.statusText}`, 'error');
+                    cancelBtn.disabled = false;
+                }
+            });
+        }
+
+        // Reattach to a job that is still queued or running (e.g. after a page reload)
+        fetch('/api/glop-jobs?active=1&limit=1')
+            .then(response => response.ok ? response.json() : { jobs: [] })
+            .then(result => {
+                if (result.jobs.length && !currentJobId) {
+                    logConsole.innerHTML = '';
+                    productCategory.value = result.jobs[0].product;
+                    supplierCategory.value = result.jobs[0].supplier;
+                    watchJob(result.jobs[0].id);
+                }
+            });
     }
 });
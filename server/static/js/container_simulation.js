@@ -0,0 +1,110 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const planweekSelect = document.getElementById('planweek-select');
+    const valueSelect = document.getElementById('value-select');
+    const simMeta = document.getElementById('sim-meta');
+    const simTotals = document.getElementById('sim-totals');
+    const simHead = document.getElementById('sim-head');
+    const simBody = document.getElementById('sim-body');
+    const simFoot = document.getElementById('sim-foot');
+    const simUnmatched = document.getElementById('sim-unmatched');
+
+    let result = null;
+
+    function escapeHtml(value) {
+        return String(value ?? '').replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        }[c]));
+    }
+
+    function fmt(value) {
+        if (!value) return '';
+        return value.toLocaleString(undefined, { maximumFractionDigits: valueSelect.value === 'SP' ? 0 : 2 });
+    }
+
+    async function loadPlanweeks() {
+        const response = await fetch('/api/plan-snapshots');
+        const snapshots = await response.json();
+        planweekSelect.innerHTML = snapshots.map(s =>
+            `<option value="${escapeHtml(s.planweek)}">${escapeHtml(s.planweek)} (${s.storage})</option>`
+        ).join('');
+        if (snapshots.length) {
+            loadSimulation();
+        } else {
+            simMeta.textContent = 'No shipment plan uploaded yet.';
+        }
+    }
+
+    async function loadSimulation() {
+        simMeta.textContent = 'Calculating...';
+        const response = await fetch(`/api/container-simulation?planweek=${encodeURIComponent(planweekSelect.value)}`);
+        const data = await response.json();
+        if (!response.ok) {
+            simMeta.textContent = data.error || 'Failed to load simulation';
+            return;
+        }
+        result = data;
+        simMeta.textContent = `${data.rows.toLocaleString()} plan rows · ` +
+            (data.cached ? 'cached' : `calculated in ${data.elapsed_sec}s`);
+        renderTotals();
+        renderPivot();
+        renderUnmatched();
+    }
+
+    function renderTotals() {
+        simTotals.innerHTML = ['SP', ...result.container_types].map(value => `
+            <div class="sim-total">${value === 'SP' ? 'SP (Qty)' : value}
+                <strong>${result.totals[value].toLocaleString()}</strong>
+            </div>`).join('');
+    }
+
+    function renderPivot() {
+        const value = valueSelect.value;
+        const matrix = result.pivot[value];
+
+        // Month header cells span their weeks
+        const months = [];
+        result.weeks.forEach(w => {
+            const last = months[months.length - 1];
+            if (last && last.month === w.month) last.span++;
+            else months.push({ month: w.month, span: 1 });
+        });
+        const monthTotals = Object.fromEntries(result.month_totals.map(m => [m.month, m[value]]));
+
+        simHead.innerHTML = `
+            <tr>
+                <th rowspan="2">To Site</th>
+                ${months.map(m => `<th class="num" colspan="${m.span}">${escapeHtml(m.month)}<br><small>${fmt(monthTotals[m.month])}</small></th>`).join('')}
+                <th rowspan="2" class="num">Total</th>
+            </tr>
+            <tr>${result.weeks.map(w => `<th class="num">${escapeHtml(w.week)}</th>`).join('')}</tr>`;
+
+        simBody.innerHTML = result.sites.map((site, i) => `
+            <tr>
+                <td>${escapeHtml(site)}</td>
+                ${matrix[i].map(v => `<td class="num">${fmt(v)}</td>`).join('')}
+                <td class="num">${fmt(result.site_totals[value][i])}</td>
+            </tr>`).join('');
+
+        simFoot.innerHTML = `
+            <tr>
+                <td>Total</td>
+                ${result.week_totals[value].map(v => `<td class="num">${fmt(v)}</td>`).join('')}
+                <td class="num">${fmt(result.totals[value])}</td>
+            </tr>`;
+    }
+
+    function renderUnmatched() {
+        if (!result.unmatched.length) {
+            simUnmatched.innerHTML = '';
+            return;
+        }
+        simUnmatched.innerHTML = `<i class="fas fa-exclamation-triangle"></i> No stuffing data for ` +
+            result.unmatched.map(u => `${escapeHtml(u.series)} (${u.SP.toLocaleString()})`).join(', ') +
+            ` — these quantities are not converted to containers.`;
+    }
+
+    planweekSelect.addEventListener('change', loadSimulation);
+    valueSelect.addEventListener('change', () => { if (result) renderPivot(); });
+
+    loadPlanweeks();
+});
@@ -0,0 +1,100 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const depthSelect = document.getElementById('depth-select');
+    const filterSelects = document.querySelectorAll('.cube-filter');
+    const cubeMeta = document.getElementById('cube-meta');
+    const deltaHead = document.getElementById('delta-head');
+    const deltaBody = document.getElementById('delta-body');
+
+    let planweeks = [];
+
+    function escapeHtml(value) {
+        return String(value ?? '').replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        }[c]));
+    }
+
+    function fillSelect(select, values) {
+        select.innerHTML = '<option value="">All</option>' +
+            values.map(v => `<option value="${escapeHtml(v)}">${escapeHtml(v || '(blank)')}</option>`).join('');
+    }
+
+    async function loadDimensions() {
+        const response = await fetch('/api/sp-cube/dimensions');
+        const dims = await response.json();
+        planweeks = dims.planweek;
+        filterSelects.forEach(select => fillSelect(select, dims[select.dataset.dim]));
+        if (!planweeks.length) {
+            cubeMeta.textContent = 'No shipment plan uploaded yet.';
+            return;
+        }
+        loadForecast();
+    }
+
+    async function loadForecast() {
+        const shown = planweeks.slice(-parseInt(depthSelect.value));
+        const params = new URLSearchParams({ group_by: 'planweek,week_name' });
+        shown.forEach(p => params.append('planweek', p));
+        filterSelects.forEach(select => {
+            if (select.value) params.append(select.dataset.dim, select.value);
+        });
+
+        const response = await fetch(`/api/sp-cube?${params}`);
+        const data = await response.json();
+        if (!response.ok) {
+            cubeMeta.textContent = data.error || 'Failed to load forecast data';
+            return;
+        }
+        cubeMeta.textContent = `${shown.length} planweeks · ${data.elapsed_ms} ms`;
+
+        // One line per Planweek: how the plan for each week changed from plan to plan
+        const byPlanweek = new Map(shown.map(p => [p, new Map()]));
+        data.rows.forEach(r => byPlanweek.get(r.planweek).set(r.week_name, r.sp));
+        const weeks = [...new Set(data.rows.map(r => r.week_name))].sort();
+
+        const traces = shown.map((p, i) => ({
+            type: 'scatter',
+            mode: 'lines+markers',
+            name: p,
+            x: weeks,
+            y: weeks.map(w => byPlanweek.get(p).get(w) ?? null),
+            line: { width: i === shown.length - 1 ? 3 : 1.5 }
+        }));
+        Plotly.react('forecast-chart', traces, {
+            paper_bgcolor: 'rgba(0,0,0,0)',
+            plot_bgcolor: 'rgba(0,0,0,0)',
+            font: { color: '#cfd8e3' },
+            margin: { t: 20, r: 20, b: 80, l: 60 },
+            yaxis: { title: 'SP' },
+            legend: { orientation: 'h' }
+        }, { responsive: true });
+
+        renderDelta(shown, byPlanweek, weeks);
+    }
+
+    function renderDelta(shown, byPlanweek, weeks) {
+        if (shown.length < 2) {
+            deltaHead.innerHTML = '';
+            deltaBody.innerHTML = '';
+            return;
+        }
+        const latest = shown[shown.length - 1];
+        const previous = shown[shown.length - 2];
+        deltaHead.innerHTML = `<tr><th>Week</th><th class="num">${escapeHtml(previous)}</th>` +
+            `<th class="num">${escapeHtml(latest)}</th><th class="num">Change</th></tr>`;
+        deltaBody.innerHTML = weeks.map(w => {
+            const before = byPlanweek.get(previous).get(w);
+            const after = byPlanweek.get(latest).get(w);
+            const change = (after || 0) - (before || 0);
+            const cls = change > 0 ? 'delta-up' : change < 0 ? 'delta-down' : '';
+            return `<tr><td>${escapeHtml(w)}</td>
+                <td class="num">${before === undefined ? '-' : before.toLocaleString()}</td>
+                <td class="num">${after === undefined ? '-' : after.toLocaleString()}</td>
+                <td class="num ${cls}">${change > 0 ? '+' : ''}${change.toLocaleString()}</td></tr>`;
+        }).join('');
+    }
+
+    depthSelect.addEventListener('change', loadForecast);
+    filterSelects.forEach(select => select.addEventListener('change', loadForecast));
+
+    loadDimensions();
+});
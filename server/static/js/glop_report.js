@@ -0,0 +1,135 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const filtersForm = document.getElementById('report-filters');
+    const planweekSelect = document.getElementById('planweek-select');
+    const exportBtn = document.getElementById('export-btn');
+    const reportTotals = document.getElementById('report-totals');
+    const reportBody = document.getElementById('report-body');
+    const pagination = document.getElementById('pagination');
+
+    let page = 1;
+
+    function escapeHtml(value) {
+        return String(value ?? '').replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        }[c]));
+    }
+
+    function num(value) {
+        return (value ?? 0).toLocaleString(undefined, { maximumFractionDigits: 0 });
+    }
+
+    function percent(value) {
+        return value === null || value === undefined ? '-' : `${(value * 100).toFixed(1)}%`;
+    }
+
+    function filterParams() {
+        const params = new URLSearchParams();
+        new FormData(filtersForm).forEach((value, key) => {
+            if (value) params.append(key, value);
+        });
+        return params;
+    }
+
+    async function loadPlanweeks() {
+        const response = await fetch('/api/plan-snapshots');
+        const snapshots = await response.json();
+        planweekSelect.innerHTML = snapshots.map(s =>
+            `<option value="${escapeHtml(s.planweek)}">${escapeHtml(s.planweek)}</option>`).join('');
+        if (!snapshots.length) {
+            reportTotals.textContent = 'No shipment plan uploaded yet.';
+            return;
+        }
+        loadReport();
+    }
+
+    async function loadReport() {
+        const params = filterParams();
+        params.set('page', page);
+        const [detail, weekly] = await Promise.all([
+            fetch(`/api/glop-report?${params}`).then(r => r.json()),
+            fetch(`/api/glop-report?${params}&level=week`).then(r => r.json())
+        ]);
+        if (detail.error) {
+            reportTotals.textContent = detail.error;
+            return;
+        }
+
+        const t = detail.totals;
+        reportTotals.innerHTML = `
+            <span>Plan <strong>${num(t.plan_qty)}</strong></span>
+            <span>Actual <strong>${num(t.actual_qty)}</strong></span>
+            <span>Variance <strong>${num(t.variance)}</strong></span>
+            <span>Attainment <strong>${percent(t.attainment)}</strong></span>
+            <span>${detail.total.toLocaleString()} rows</span>`;
+
+        renderChart(weekly.rows || []);
+        renderRows(detail.rows);
+        renderPagination(detail);
+    }
+
+    function renderChart(rows) {
+        const weeks = rows.map(r => r.week_name);
+        Plotly.react('report-chart', [
+            { type: 'bar', name: 'Plan', x: weeks, y: rows.map(r => r.plan_qty) },
+            { type: 'bar', name: 'Actual', x: weeks, y: rows.map(r => r.actual_qty) }
+        ], {
+            barmode: 'group',
+            paper_bgcolor: 'rgba(0,0,0,0)',
+            plot_bgcolor: 'rgba(0,0,0,0)',
+            font: { color: '#cfd8e3' },
+            margin: { t: 10, r: 20, b: 80, l: 60 },
+            legend: { orientation: 'h' }
+        }, { responsive: true });
+    }
+
+    function renderRows(rows) {
+        if (!rows.length) {
+            reportBody.innerHTML = '<tr><td colspan="10" style="text-align:center;">No data</td></tr>';
+            return;
+        }
+        reportBody.innerHTML = rows.map(r => {
+            const cls = r.variance > 0 ? 'variance-up' : r.variance < 0 ? 'variance-down' : '';
+            return `<tr>
+                <td>${escapeHtml(r.week_name)}</td><td>${escapeHtml(r.month)}</td>
+                <td>${escapeHtml(r.to_site)}</td><td>${escapeHtml(r.region)}</td>
+                <td>${escapeHtml(r.country)}</td><td>${escapeHtml(r.model)}</td>
+                <td class="num">${num(r.plan_qty)}</td><td class="num">${num(r.actual_qty)}</td>
+                <td class="num ${cls}">${num(r.variance)}</td><td class="num">${percent(r.attainment)}</td>
+            </tr>`;
+        }).join('');
+    }
+
+    function renderPagination(data) {
+        pagination.innerHTML = '';
+        if (data.pages <= 1) return;
+        const prev = document.createElement('button');
+        prev.className = 'btn btn-secondary';
+        prev.innerHTML = '<i class="fas fa-chevron-left"></i>';
+        prev.disabled = data.page <= 1;
+        prev.onclick = () => { page--; loadReport(); };
+
+        const label = document.createElement('span');
+        label.textContent = `${data.page} / ${data.pages}`;
+        label.style.margin = '0 15px';
+
+        const next = document.createElement('button');
+        next.className = 'btn btn-secondary';
+        next.innerHTML = '<i class="fas fa-chevron-right"></i>';
+        next.disabled = data.page >= data.pages;
+        next.onclick = () => { page++; loadReport(); };
+
+        pagination.append(prev, label, next);
+    }
+
+    filtersForm.addEventListener('submit', e => {
+        e.preventDefault();
+        page = 1;
+        loadReport();
+    });
+
+    exportBtn.addEventListener('click', () => {
+        window.location.href = `/api/glop-report/export?${filterParams()}`;
+    });
+
+    loadPlanweeks();
+});
@@ -4,22 +4,73 @@ document.addEventListener('DOMContentLoaded', () => {
     const tableBody = document.getElementById('table-body');
     const pagination = document.getElementById('pagination');
     const addBtn = document.getElementById('add-btn');
+    const importBtn = document.getElementById('import-btn');
+    const importFile = document.getElementById('import-file');
+    const exportBtn = document.getElementById('export-btn');
+    const exportFormat = document.getElementById('export-format');
     const modal = document.getElementById('master-modal');
     const modalTitle = document.getElementById('modal-title');
     const masterForm = document.getElementById('master-form');
     const formFields = document.getElementById('form-fields');
     const closeBtns = document.querySelectorAll('.close-modal');
+    const saveBatchBtn = document.getElementById('save-batch-btn');
+    const discardBatchBtn = document.getElementById('discard-batch-btn');
 
     let currentTable = tableSelect.value;
-    let currentPage = 1;
     let columns = [];
     let pkColumn = '';
 
+    // Keyset paging: cursorStack[i] is the cursor that loads page i (null for the first page)
+    let cursorStack = [null];
+    let pageIndex = 0;
+    let nextCursor = null;
+    let sortColumn = '';
+    let sortDesc = false;
+    let filters = {};
+
+    // Queued grid edits, sent together through PATCH /api/master-data/<table>/batch
+    let pendingCreates = [];
+    let pendingUpdates = new Map();  // pk -> {column: value}
+    let pendingDeletes = new Set();  // pk
+
+    function pendingCount() {
+        return pendingCreates.length + pendingUpdates.size + pendingDeletes.size;
+    }
+
+    function clearPending() {
+        pendingCreates = [];
+        pendingUpdates = new Map();
+        pendingDeletes = new Set();
+        updateBatchButtons();
+    }
+
+    function updateBatchButtons() {
+        const count = pendingCount();
+        saveBatchBtn.innerHTML = `<i class="fas fa-save"></i> Save Changes (${count})`;
+        saveBatchBtn.disabled = count === 0;
+        discardBatchBtn.disabled = count === 0;
+    }
+
+    function resetPaging() {
+        cursorStack = [null];
+        pageIndex = 0;
+    }
+
     // Load Data
-    async function loadData(page = 1) {
-        currentPage = page;
+    async function loadData() {
+        const params = new URLSearchParams();
+        const cursor = cursorStack[pageIndex];
+        if (cursor) params.append('cursor', cursor);
+        if (sortColumn) {
+            params.append('sort', sortColumn);
+            params.append('order', sortDesc ? 'desc' : 'asc');
+        }
+        Object.entries(filters).forEach(([col, value]) => {
+            if (value) params.append(`filter_${col}`, value);
+        });
+
         try {
-            const response = await fetch(`/api/master-data/${currentTable}?page=${page}`);
+            const response = await fetch(`/api/master-data/${currentTable}?${params.toString()}`);
             const data = await response.json();
 
             if (data.error) {
@@ -28,6 +79,8 @@ document.addEventListener('DOMContentLoaded', () => {
             }
 
             columns = data.columns;
+            pkColumn = data.pk;
+            nextCursor = data.next_cursor;
             renderTable(data);
             renderPagination(data);
         } catch (error) {
@@ -36,43 +89,122 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function renderTable(data) {
-        // Render Headers
+        // Render Headers (click to sort) and a filter row
         tableHead.innerHTML = `
             <tr>
-                ${data.columns.map(col => `<th>${col}</th>`).join('')}
+                ${data.columns.map(col => `
+                    <th class="sortable" data-col="${col}" style="cursor: pointer;">
+                        ${col} ${col === sortColumn ? (sortDesc ? '▼' : '▲') : ''}
+                    </th>`).join('')}
                 <th>Actions</th>
             </tr>
+            <tr>
+                ${data.columns.map(col => `
+                    <th><input type="text" class="form-input column-filter" data-col="${col}"
+                        value="${filters[col] || ''}" placeholder="Filter" style="padding: 4px 8px;"></th>`).join('')}
+                <th></th>
+            </tr>
         `;
 
-        // Render Rows
-        tableBody.innerHTML = data.items.map(item => `
-            <tr>
-                ${data.columns.map(col => `<td>${item[col] || ''}</td>`).join('')}
+        // Render Rows (queued creates first, then the page with queued edits applied)
+        const createRows = pendingCreates.map((item, index) => `
+            <tr class="pending-create">
+                ${data.columns.map(col => `<td>${col === pkColumn ? '(new)' : (item[col] ?? '')}</td>`).join('')}
                 <td>
-                    <button class="action-btn approve edit-btn" data-id="${item[data.columns[0]]}">Edit</button>
-                    <button class="action-btn reject delete-btn" data-id="${item[data.columns[0]]}">Delete</button>
+                    <button class="action-btn reject cancel-create-btn" data-index="${index}">Cancel</button>
                 </td>
             </tr>
         `).join('');
 
+        tableBody.innerHTML = createRows + data.items.map(item => {
+            const id = String(item[pkColumn]);
+            const edits = pendingUpdates.get(id) || {};
+            const deleted = pendingDeletes.has(id);
+            return `
+            <tr class="${deleted ? 'pending-delete' : ''}" data-id="${id}">
+                ${data.columns.map(col => {
+                    const value = col in edits ? edits[col] : (item[col] ?? '');
+                    if (col === pkColumn || deleted) return `<td>${value}</td>`;
+                    return `<td class="editable-cell ${col in edits ? 'pending-edit' : ''}" contenteditable="true"
+                        data-col="${col}" data-original="${item[col] ?? ''}">${value}</td>`;
+                }).join('')}
+                <td>
+                    <button class="action-btn approve edit-btn" data-id="${id}" ${deleted ? 'disabled' : ''}>Edit</button>
+                    <button class="action-btn reject delete-btn" data-id="${id}">${deleted ? 'Undo' : 'Delete'}</button>
+                </td>
+            </tr>`;
+        }).join('');
+
+        document.querySelectorAll('.editable-cell').forEach(cell => {
+            cell.addEventListener('blur', () => {
+                const id = cell.closest('tr').dataset.id;
+                const edits = pendingUpdates.get(id) || {};
+                const value = cell.innerText.trim();
+                if (value === cell.dataset.original) {
+                    delete edits[cell.dataset.col];
+                } else {
+                    edits[cell.dataset.col] = value;
+                }
+                if (Object.keys(edits).length) {
+                    pendingUpdates.set(id, edits);
+                } else {
+                    pendingUpdates.delete(id);
+                }
+                cell.classList.toggle('pending-edit', cell.dataset.col in edits);
+                updateBatchButtons();
+            });
+        });
+        document.querySelectorAll('.cancel-create-btn').forEach(btn => {
+            btn.addEventListener('click', () => {
+                pendingCreates.splice(parseInt(btn.dataset.index), 1);
+                updateBatchButtons();
+                loadData();
+            });
+        });
+
         // Add Event Listeners
+        document.querySelectorAll('th.sortable').forEach(th => {
+            th.addEventListener('click', () => {
+                sortDesc = sortColumn === th.dataset.col ? !sortDesc : false;
+                sortColumn = th.dataset.col;
+                resetPaging();
+                loadData();
+            });
+        });
+        document.querySelectorAll('.column-filter').forEach(input => {
+            input.addEventListener('change', () => {
+                filters[input.dataset.col] = input.value.trim();
+                resetPaging();
+                loadData();
+            });
+        });
         document.querySelectorAll('.edit-btn').forEach(btn => {
             btn.addEventListener('click', () => openModal('edit', btn.dataset.id));
         });
         document.querySelectorAll('.delete-btn').forEach(btn => {
-            btn.addEventListener('click', () => deleteItem(btn.dataset.id));
+            btn.addEventListener('click', () => toggleDelete(btn.dataset.id));
         });
     }
 
     function renderPagination(data) {
-        let html = '';
-        for (let i = 1; i <= data.total_pages; i++) {
-            html += `<button class="page-btn ${i === data.page ? 'active' : ''}" data-page="${i}">${i}</button>`;
-        }
-        pagination.innerHTML = html;
+        const totalPages = Math.max(1, Math.ceil(data.total / data.per_page));
+        pagination.innerHTML = `
+            <button class="page-btn" id="prev-page" ${pageIndex === 0 ? 'disabled' : ''}>&laquo; Prev</button>
+            <span style="margin: 0 10px;">Page ${pageIndex + 1} / ${totalPages} (${data.total} rows)</span>
+            <button class="page-btn" id="next-page" ${nextCursor ? '' : 'disabled'}>Next &raquo;</button>
+        `;
 
-        document.querySelectorAll('.page-btn').forEach(btn => {
-            btn.addEventListener('click', () => loadData(parseInt(btn.dataset.page)));
+        document.getElementById('prev-page').addEventListener('click', () => {
+            if (pageIndex === 0) return;
+            pageIndex -= 1;
+            loadData();
+        });
+        document.getElementById('next-page').addEventListener('click', () => {
+            if (!nextCursor) return;
+            cursorStack = cursorStack.slice(0, pageIndex + 1);
+            cursorStack.push(nextCursor);
+            pageIndex += 1;
+            loadData();
         });
     }
 
@@ -85,13 +217,14 @@ document.addEventListener('DOMContentLoaded', () => {
         formFields.innerHTML = columns.map(col => `
             <div class="form-group">
                 <label class="form-label">${col}</label>
-                <input type="text" name="${col}" class="form-input" ${mode === 'edit' && col === columns[0] ? 'readonly' : ''}>
+                <input type="text" name="${col}" class="form-input" ${mode === 'edit' && col === pkColumn ? 'readonly' : ''}>
             </div>
         `).join('');
 
         if (mode === 'edit') {
             // Fetch item data and populate form
-            const row = Array.from(tableBody.rows).find(r => r.cells[0].innerText === id);
+            const pkIndex = columns.indexOf(pkColumn);
+            const row = Array.from(tableBody.rows).find(r => r.cells[pkIndex].innerText === id);
             if (row) {
                 columns.forEach((col, index) => {
                     masterForm.elements[col].value = row.cells[index].innerText;
@@ -113,61 +246,141 @@ document.addEventListener('DOMContentLoaded', () => {
         if (event.target === modal) modal.style.display = 'none';
     };
 
-    // Form Submission
-    masterForm.addEventListener('submit', async (e) => {
+    // Form Submission (queued; sent with Save Changes)
+    masterForm.addEventListener('submit', (e) => {
         e.preventDefault();
         const formData = new FormData(masterForm);
         const data = Object.fromEntries(formData.entries());
         const mode = masterForm.dataset.mode;
-        const id = masterForm.dataset.id;
 
-        const url = mode === 'edit' ? `/api/master-data/${currentTable}/${id}` : `/api/master-data/${currentTable}`;
-        const method = mode === 'edit' ? 'PUT' : 'POST';
+        if (mode === 'edit') {
+            const id = masterForm.dataset.id;
+            delete data[pkColumn];
+            pendingUpdates.set(id, { ...(pendingUpdates.get(id) || {}), ...data });
+        } else {
+            // Leave empty fields (e.g. an autoincrement id) to the server defaults
+            Object.keys(data).forEach(key => { if (data[key] === '') delete data[key]; });
+            pendingCreates.push(data);
+        }
+        modal.style.display = 'none';
+        updateBatchButtons();
+        loadData();
+    });
+
+    // Delete Logic (toggle a queued delete)
+    function toggleDelete(id) {
+        if (pendingDeletes.has(id)) {
+            pendingDeletes.delete(id);
+        } else {
+            pendingDeletes.add(id);
+            pendingUpdates.delete(id);
+        }
+        updateBatchButtons();
+        loadData();
+    }
+
+    async function saveBatch() {
+        const operations = [
+            ...pendingCreates.map(data => ({ op: 'create', data })),
+            ...Array.from(pendingUpdates, ([id, data]) => ({ op: 'update', id, data })),
+            ...Array.from(pendingDeletes, id => ({ op: 'delete', id }))
+        ];
+        if (!operations.length) return;
+        if (pendingDeletes.size && !confirm(`Delete ${pendingDeletes.size} item(s) and save ${operations.length} change(s)?`)) return;
 
+        saveBatchBtn.disabled = true;
         try {
-            const response = await fetch(url, {
-                method: method,
+            const response = await fetch(`/api/master-data/${currentTable}/batch`, {
+                method: 'PATCH',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(data)
+                body: JSON.stringify({ operations })
             });
             const result = await response.json();
             if (result.error) {
                 alert(result.error);
-            } else {
-                modal.style.display = 'none';
-                loadData(currentPage);
+                updateBatchButtons();
+                return;
+            }
+
+            // Keep only the failed operations queued so they can be fixed and saved again
+            const failed = result.results.filter(r => r.status !== 'ok');
+            const failedOps = failed.map(r => operations[r.index]);
+            pendingCreates = failedOps.filter(op => op.op === 'create').map(op => op.data);
+            pendingUpdates = new Map(failedOps.filter(op => op.op === 'update').map(op => [op.id, op.data]));
+            pendingDeletes = new Set(failedOps.filter(op => op.op === 'delete').map(op => op.id));
+            updateBatchButtons();
+
+            if (failed.length) {
+                alert(`Saved ${result.succeeded}, failed ${result.failed}:\n` +
+                    failed.map(r => `${r.op} ${r.id ?? ''}: ${r.error}`).join('\n'));
             }
+            loadData();
         } catch (error) {
-            console.error('Error saving data:', error);
+            console.error('Error saving changes:', error);
+            updateBatchButtons();
+        }
+    }
+
+    saveBatchBtn.addEventListener('click', saveBatch);
+    discardBatchBtn.addEventListener('click', () => {
+        if (!confirm('Discard all unsaved changes?')) return;
+        clearPending();
+        loadData();
+    });
+
+    // Initial Load
+    tableSelect.addEventListener('change', () => {
+        if (pendingCount() && !confirm('Discard unsaved changes?')) {
+            tableSelect.value = currentTable;
+            return;
         }
+        clearPending();
+        currentTable = tableSelect.value;
+        sortColumn = '';
+        sortDesc = false;
+        filters = {};
+        resetPaging();
+        loadData();
     });
 
-    // Delete Logic
-    async function deleteItem(id) {
-        if (!confirm('Are you sure you want to delete this item?')) return;
+    addBtn.addEventListener('click', () => openModal('add'));
+
+    // Bulk Import / Export
+    importBtn.addEventListener('click', () => importFile.click());
+
+    importFile.addEventListener('change', async () => {
+        const file = importFile.files[0];
+        if (!file) return;
 
+        const formData = new FormData();
+        formData.append('file', file);
+        importBtn.disabled = true;
         try {
-            const response = await fetch(`/api/master-data/${currentTable}/${id}`, {
-                method: 'DELETE'
+            const response = await fetch(`/api/master-data/${currentTable}/import`, {
+                method: 'POST',
+                body: formData
             });
             const result = await response.json();
             if (result.error) {
-                alert(result.error);
+                const details = (result.errors || []).map(e => `${e.row ? `Row ${e.row}: ` : ''}${e.error}`).join('\n');
+                alert(`${result.error}${details ? `\n\n${details}` : ''}`);
             } else {
-                loadData(currentPage);
+                alert(result.message);
+                resetPaging();
+                loadData();
             }
         } catch (error) {
-            console.error('Error deleting data:', error);
+            console.error('Error importing data:', error);
+        } finally {
+            importBtn.disabled = false;
+            importFile.value = '';
         }
-    }
-
-    // Initial Load
-    tableSelect.addEventListener('change', () => {
-        currentTable = tableSelect.value;
-        loadData(1);
     });
 
-    addBtn.addEventListener('click', () => openModal('add'));
+    exportBtn.addEventListener('click', () => {
+        location.href = `/api/master-data/${currentTable}/export?format=${exportFormat.value}`;
+    });
 
+    updateBatchButtons();
     loadData();
 });
@@ -0,0 +1,96 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const planweekSelect = document.getElementById('planweek-select');
+    const stackSelect = document.getElementById('stack-select');
+    const filterSelects = document.querySelectorAll('.cube-filter');
+    const cubeMeta = document.getElementById('cube-meta');
+    const MAX_STACKS = 10;
+    const COLORS = ['#00d9ff', '#00ff88', '#ffb86c', '#ff6b6b', '#bd93f9', '#f1fa8c', '#8be9fd', '#ff79c6',
+        '#50fa7b', '#6272a4', '#888888'];
+
+    let chart = null;
+
+    function fillSelect(select, values, allLabel) {
+        select.innerHTML = (allLabel ? `<option value="">${allLabel}</option>` : '') +
+            values.map(v => `<option value="${escapeHtml(v)}">${escapeHtml(v || '(blank)')}</option>`).join('');
+    }
+
+    function escapeHtml(value) {
+        return String(value ?? '').replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        }[c]));
+    }
+
+    function cubeParams(extra) {
+        const params = new URLSearchParams(extra);
+        params.append('planweek', planweekSelect.value);
+        filterSelects.forEach(select => {
+            if (select.value) params.append(select.dataset.dim, select.value);
+        });
+        return params;
+    }
+
+    async function loadDimensions() {
+        const response = await fetch('/api/sp-cube/dimensions');
+        const dims = await response.json();
+        fillSelect(planweekSelect, [...dims.planweek].reverse());
+        filterSelects.forEach(select => fillSelect(select, dims[select.dataset.dim], 'All'));
+        if (!dims.planweek.length) {
+            cubeMeta.textContent = 'No shipment plan uploaded yet.';
+            return;
+        }
+        loadChart();
+    }
+
+    async function loadChart() {
+        const stack = stackSelect.value;
+        const params = cubeParams({ group_by: stack ? `week_name,${stack}` : 'week_name' });
+        const response = await fetch(`/api/sp-cube?${params}`);
+        const data = await response.json();
+        if (!response.ok) {
+            cubeMeta.textContent = data.error || 'Failed to load SP data';
+            return;
+        }
+
+        const weeks = [...new Set(data.rows.map(r => r.week_name))];
+        const weekIndex = new Map(weeks.map((w, i) => [w, i]));
+        let datasets;
+        if (!stack) {
+            datasets = [{ label: 'SP', data: weeks.map(() => 0), backgroundColor: COLORS[0] }];
+            data.rows.forEach(r => { datasets[0].data[weekIndex.get(r.week_name)] = r.sp; });
+        } else {
+            // Largest MAX_STACKS members get their own series, the rest are summed into Others
+            const totals = new Map();
+            data.rows.forEach(r => totals.set(r[stack], (totals.get(r[stack]) || 0) + r.sp));
+            const top = [...totals.entries()].sort((a, b) => b[1] - a[1]).slice(0, MAX_STACKS).map(e => e[0]);
+            const labels = [...top, ...(totals.size > MAX_STACKS ? ['Others'] : [])];
+            const series = new Map(labels.map((label, i) => [label, {
+                label: label || '(blank)', data: weeks.map(() => 0), backgroundColor: COLORS[i % COLORS.length]
+            }]));
+            data.rows.forEach(r => {
+                const target = series.get(top.includes(r[stack]) ? r[stack] : 'Others');
+                target.data[weekIndex.get(r.week_name)] += r.sp;
+            });
+            datasets = [...series.values()];
+        }
+
+        const total = data.rows.reduce((sum, r) => sum + r.sp, 0);
+        cubeMeta.textContent = `Total SP ${total.toLocaleString()} · ${weeks.length} weeks · ${data.elapsed_ms} ms`;
+
+        if (chart) chart.destroy();
+        chart = new Chart(document.getElementById('sp-chart'), {
+            type: 'bar',
+            data: { labels: weeks, datasets },
+            options: {
+                maintainAspectRatio: false,
+                scales: { x: { stacked: true }, y: { stacked: true, beginAtZero: true } },
+                plugins: { legend: { display: datasets.length > 1 } }
+            }
+        });
+    }
+
+    planweekSelect.addEventListener('change', loadChart);
+    stackSelect.addEventListener('change', loadChart);
+    filterSelects.forEach(select => select.addEventListener('change', loadChart));
+
+    loadDimensions();
+});
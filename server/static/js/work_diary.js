@@ -1,5 +1,6 @@
 document.addEventListener('DOMContentLoaded', () => {
     const diaryList = document.getElementById('diary-list');
+    const tagCloud = document.getElementById('tag-cloud');
     const entryDetail = document.getElementById('entry-detail');
     const entryForm = document.getElementById('entry-form');
     const editor = document.getElementById('editor');
@@ -30,9 +31,25 @@ document.addEventListener('DOMContentLoaded', () => {
         hashtag: new URLSearchParams(window.location.search).get('hashtag') || ''
     };
 
+    // Infinite scroll state (keyset cursor returned by the list API)
+    let nextCursor = null;
+    let isLoading = false;
+    let listSentinel = null;
+
     // Load entries if on list page
     if (diaryList) {
+        listSentinel = document.createElement('div');
+        listSentinel.id = 'diary-list-sentinel';
+        diaryList.after(listSentinel);
+
+        new IntersectionObserver((observed) => {
+            if (observed[0].isIntersecting && nextCursor && !isLoading) {
+                loadEntries(false);
+            }
+        }, { rootMargin: '200px' }).observe(listSentinel);
+
         loadEntries();
+        loadTagCloud();
     }
 
     // Load entry detail if on detail page
@@ -41,7 +58,8 @@ document.addEventListener('DOMContentLoaded', () => {
         loadEntryDetail();
     }
 
-    async function loadEntries() {
+    async function loadEntries(reset = true) {
+        if (reset) nextCursor = null;
         const params = new URLSearchParams();
         if (currentFilters.status) params.append('status', currentFilters.status);
         if (currentFilters.author) params.append('author', currentFilters.author);
@@ -49,26 +67,46 @@ document.addEventListener('DOMContentLoaded', () => {
         if (currentFilters.hashtag) params.append('hashtag', currentFilters.hashtag);
         if (currentFilters.from_date) params.append('from_date', currentFilters.from_date);
         if (currentFilters.to_date) params.append('to_date', currentFilters.to_date);
+        if (nextCursor) params.append('cursor', nextCursor);
 
+        isLoading = true;
         try {
             const response = await fetch(`/api/work-diary?${params.toString()}`);
             const data = await response.json();
-            renderEntries(data);
+            nextCursor = data.next_cursor;
+            renderEntries(data.items, reset);
         } catch (error) {
             console.error('Error loading entries:', error);
+        } finally {
+            isLoading = false;
         }
     }
 
-    function renderEntries(entries) {
-        if (entries.length === 0) {
+    async function loadTagCloud() {
+        if (!tagCloud) return;
+        try {
+            const response = await fetch('/api/work-diary/hashtags');
+            const tags = await response.json();
+            tagCloud.innerHTML = tags.map(t => `
+                <span class="hashtag-link ${t.tag === currentFilters.hashtag.toLowerCase() ? 'active' : ''}"
+                    onclick="filterByHashtag('${t.tag}')">#${t.tag} <span class="tag-count">${t.count}</span></span>
+            `).join('');
+        } catch (error) {
+            console.error('Error loading hashtags:', error);
+        }
+    }
+
+    function renderEntries(entries, reset = true) {
+        if (reset && entries.length === 0) {
             diaryList.innerHTML = '<div style="text-align: center; padding: 40px; color: var(--text-muted);">No entries found.</div>';
             return;
         }
 
-        diaryList.innerHTML = entries.map(entry => `
+        const html = entries.map(entry => `
             <div class="diary-item" onclick="location.href='/work-diary/${entry.id}'">
                 <div class="diary-info">
                     <h3>${entry.title}</h3>
+                    ${entry.snippet ? `<div class="diary-snippet">${entry.snippet}</div>` : ''}
                     <div class="diary-meta">
                         <span><i class="fas fa-user"></i> ${entry.author}</span>
                         <span><i class="fas fa-calendar-alt"></i> ${entry.created_at}</span>
@@ -81,6 +119,12 @@ document.addEventListener('DOMContentLoaded', () => {
                 </div>
             </div>
         `).join('');
+
+        if (reset) {
+            diaryList.innerHTML = html;
+        } else {
+            diaryList.insertAdjacentHTML('beforeend', html);
+        }
     }
 
     async function loadEntryDetail() {
@@ -88,8 +132,8 @@ document.addEventListener('DOMContentLoaded', () => {
             const response = await fetch(`/api/work-diary/${currentEntryId}`);
             const data = await response.json();
 
-            const hashtagsHtml = data.hashtags ? data.hashtags.split(',').map(tag =>
-                `<span class="hashtag-link" onclick="filterByHashtag('${tag.trim().replace('#', '')}')">${tag.trim()}</span>`
+            const hashtagsHtml = data.hashtags ? data.hashtags.split(/[\s,]+/).filter(tag => tag.replace(/#/g, '')).map(tag =>
+                `<span class="hashtag-link" onclick="filterByHashtag('${tag.replace(/^#+/, '')}')">${tag}</span>`
             ).join(' ') : '';
 
             entryDetail.innerHTML = `
@@ -119,7 +163,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     window.filterByHashtag = (tag) => {
-        location.href = `/work-diary?hashtag=${tag}`;
+        location.href = `/work-diary?hashtag=${encodeURIComponent(tag)}`;
     };
 
     function renderComments(comments) {
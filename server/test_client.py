@@ -1,6 +1,10 @@
 import requests
 import pandas as pd
 import json
+import gzip
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
 # Sample data based on the image provided by the user
@@ -52,22 +56,47 @@ def check_server_status():
         print(f"❌ Server is OFFLINE or unreachable: {str(e)}")
         return False
 
-def send_large_dataframe(df, chunk_size=5000):
+def encode_dataframe(df, fmt='records'):
+    """
+    Request body and headers for /upsert_shipment_plan.
+    fmt: 'records' (JSON array), 'columns' (columnar JSON, gzip), 'arrow' (Arrow IPC stream), 'parquet'
+    """
+    if fmt == 'records':
+        return json.dumps(df.to_dict(orient='records')).encode(), {'Content-Type': 'application/json'}
+    if fmt == 'columns':
+        body = gzip.compress(json.dumps(df.to_dict(orient='list')).encode(), compresslevel=1)
+        return body, {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    if fmt == 'arrow':
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue(), {'Content-Type': 'application/vnd.apache.arrow.stream'}
+    if fmt == 'parquet':
+        pq.write_table(table, sink)
+        return sink.getvalue(), {'Content-Type': 'application/vnd.apache.parquet'}
+    raise ValueError(f"Unknown format: {fmt}")
+
+def send_large_dataframe(df, chunk_size=5000, fmt='records'):
     """
     Splits a large DataFrame into chunks and sends them to the server sequentially.
+    With a columnar fmt ('columns', 'arrow', 'parquet') larger chunks (e.g. 100000) work well.
     """
     total_rows = len(df)
     chunks = [df[i:i + chunk_size] for i in range(0, total_rows, chunk_size)]
     total_chunks = len(chunks)
     
-    print(f"\n🚀 Starting large upload: {total_rows} rows in {total_chunks} chunks.")
+    print(f"\n🚀 Starting large upload: {total_rows} rows in {total_chunks} chunks ({fmt}).")
     endpoint = f"{BASE_URL}/upsert_shipment_plan"
     
     # Use tqdm for progress bar
     for i, chunk in enumerate(tqdm(chunks, desc="Uploading", unit="chunk")):
-        data = chunk.to_dict(orient='records')
+        body, headers = encode_dataframe(chunk, fmt)
         try:
-            response = requests.post(endpoint, json=data)
+            response = requests.post(endpoint, data=body, headers=headers)
             if response.status_code != 200:
                 print(f"\n❌ Chunk {i+1} failed ({response.status_code}): {response.text}")
                 return False
@@ -78,6 +107,59 @@ def send_large_dataframe(df, chunk_size=5000):
     print(f"\n✨ Successfully uploaded {total_rows} rows.\n")
     return True
 
+def send_dataframe_session(df, chunk_size=50000, fmt='parquet', workers=4, retries=3, session_id=None):
+    """
+    Uploads a DataFrame through an upload session: chunks are sent concurrently with a thread
+    pool and retried individually, then committed in one server-side transaction.
+    Pass the session_id printed by a failed run to resume it; chunks already received are skipped.
+    """
+    total_rows = len(df)
+    total_chunks = max(1, (total_rows + chunk_size - 1) // chunk_size)
+    endpoint = f"{BASE_URL}/upsert_shipment_plan/sessions"
+
+    if session_id:
+        status = requests.get(f"{endpoint}/{session_id}").json()
+        done = set(status.get('received_chunks', []))
+    else:
+        response = requests.post(endpoint, json={"total_chunks": total_chunks})
+        response.raise_for_status()
+        session_id = response.json()['session_id']
+        done = set()
+
+    def send_chunk(chunk_no):
+        body, headers = encode_dataframe(df[chunk_no * chunk_size:(chunk_no + 1) * chunk_size], fmt)
+        for attempt in range(1, retries + 1):
+            try:
+                response = requests.put(f"{endpoint}/{session_id}/chunks/{chunk_no}", data=body, headers=headers)
+                if response.status_code == 200:
+                    return chunk_no, None
+                error = f"{response.status_code}: {response.text}"
+                if 400 <= response.status_code < 500:
+                    break  # not retryable
+            except Exception as e:
+                error = str(e)
+            time.sleep(attempt)
+        return chunk_no, error
+
+    pending = [n for n in range(total_chunks) if n not in done]
+    print(f"\n🚀 Session {session_id}: {total_rows} rows, {len(pending)}/{total_chunks} chunks to send ({fmt}, {workers} workers).")
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk_no, error in tqdm(pool.map(send_chunk, pending), total=len(pending), desc="Uploading", unit="chunk"):
+            if error:
+                failed.append(chunk_no)
+                print(f"\n❌ Chunk {chunk_no} failed: {error}")
+    if failed:
+        print(f"\n⚠️ {len(failed)} chunks failed. Resume with send_dataframe_session(df, ..., session_id='{session_id}')")
+        return False
+
+    response = requests.post(f"{endpoint}/{session_id}/commit")
+    if response.status_code != 200:
+        print(f"\n❌ Commit failed ({response.status_code}): {response.text}")
+        return False
+    print(f"\n✨ Successfully uploaded {total_rows} rows: {response.json()}\n")
+    return True
+
 def test_upsert():
     print("\nStarting upsert test...")
     endpoint = f"{BASE_URL}/upsert_shipment_plan"
@@ -118,5 +200,7 @@ if __name__ == "__main__":
         # Example of how to send a large DataFrame (commented out for safety)
         # large_df = pd.read_excel("your_large_file.xlsx")
         # send_large_dataframe(large_df)
+        # send_large_dataframe(large_df, chunk_size=100000, fmt='parquet')
+        # send_dataframe_session(large_df, chunk_size=50000, workers=4)
     else:
         print("Aborting tests because server is not responding.")
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'server'))
+sys.path.insert(0, os.path.join(ROOT, 'driver'))
+
+# driver/main.py와 서버 모듈은 import 시점에 DB 경로를 정하므로 실제 mnt_data.db 대신 임시 DB 사용
+os.environ.setdefault('ORCA_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='orca_test_'), 'mnt_data.db'))
@@ -0,0 +1,89 @@
+import pandas as pd
+import xlwt
+from openpyxl import Workbook
+
+from excel_stream import iter_excel_chunks
+
+HEADER = ['Model', 'PO No.', 'Ship', 'Ship To']
+# 두 번째 chunk(chunk_size=3)에만 빈 PO No. / Ship 셀이 있음
+ROWS = [
+    ['A-1.X', 4500123, 10, 'EEUK'],
+    ['A-1.X', 4500123, 10, 'EEUK'],
+    ['B-1.X', 4500124, 5, 'EEPT'],
+    ['A-1.X', 4500123, 10, 'EEUK'],
+    ['B-1.X', None, None, 'EEPT'],
+    ['B-1.X', 4500124, 7, None],
+]
+
+
+def write_html(path, rows):
+    cells = lambda row: ''.join(f"<td>{'' if v is None else v}</td>" for v in row)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><body><table>' + ''.join(f'<tr>{cells(r)}</tr>' for r in [HEADER, *rows]) + '</table></body></html>')
+
+
+def write_xls(path, rows):
+    book = xlwt.Workbook()
+    sheet = book.add_sheet('Sheet1')
+    for r, row in enumerate([HEADER, *rows]):
+        for c, value in enumerate(row):
+            if value is not None:
+                sheet.write(r, c, value)
+    book.save(path)
+
+
+def write_xlsx(path, rows):
+    book = Workbook()
+    sheet = book.active
+    for row in [HEADER, *rows]:
+        sheet.append(row)
+    book.save(path)
+
+
+def read_chunks(path):
+    return list(iter_excel_chunks(str(path), chunk_size=3))
+
+
+def assert_stable_dtypes(chunks):
+    assert len(chunks) == 2
+    assert dict(chunks[0].dtypes) == dict(chunks[1].dtypes)
+    assert chunks[1]['PO No.'].dtype == 'Int64'
+    assert chunks[1]['PO No.'].isna().tolist() == [False, True, False]
+    assert chunks[1]['PO No.'].iloc[0] == 4500123
+
+
+def test_html_dtypes_fixed_by_first_chunk(tmp_path):
+    path = tmp_path / 'ship.xls'
+    write_html(path, ROWS)
+    assert_stable_dtypes(read_chunks(path))
+
+
+def test_xls_dtypes_fixed_by_first_chunk(tmp_path):
+    path = tmp_path / 'ship.xls'
+    write_xls(path, ROWS)
+    assert_stable_dtypes(read_chunks(path))
+
+
+def test_xlsx_dtypes_fixed_by_first_chunk(tmp_path):
+    path = tmp_path / 'ship.xlsx'
+    write_xlsx(path, ROWS)
+    assert_stable_dtypes(read_chunks(path))
+
+
+def test_integer_column_with_decimals_in_later_chunk(tmp_path):
+    path = tmp_path / 'ship.xls'
+    write_html(path, ROWS[:3] + [['A-1.X', 4500123, '7.5', 'EEUK']])
+    chunks = read_chunks(path)
+    assert chunks[0]['Ship'].dtype == 'Int64'
+    assert chunks[1]['Ship'].dtype == 'float64'
+    assert chunks[1]['Ship'].iloc[0] == 7.5
+
+
+def test_html_text_column_keeps_strings(tmp_path):
+    path = tmp_path / 'ship.xls'
+    write_html(path, [['A-1.X', 'PO-1', '1,000', 'EEUK'], *ROWS])
+    chunks = read_chunks(path)
+    assert chunks[0]['PO No.'].dtype == object
+    assert chunks[1]['PO No.'].tolist() == ['4500124', '4500123', None]
+    assert chunks[0]['Ship'].iloc[0] == 1000
+    assert pd.concat(chunks)['Ship'].dtype == 'Int64'
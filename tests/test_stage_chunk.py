@@ -0,0 +1,89 @@
+import functools
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import excel_stream
+import main
+from db_connection import DB_PATH
+
+
+def stage(chunks):
+    conn = sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    seq_counts = {}
+    for df in chunks:
+        main.stage_chunk(cursor, df, seq_counts)
+    staged = pd.read_sql('SELECT * FROM temp.shipment_stage ORDER BY rowid', conn)
+    conn.close()
+    return staged
+
+
+def chunk(po, model, ship):
+    return pd.DataFrame({'From Site': 'S', 'Data Source': 'NERP', 'PO No.': po, 'Model': model, 'Ship': ship})
+
+
+def test_line_seq_continues_when_chunk_dtype_changes():
+    # 두 번째 chunk는 빈 PO No. / Ship 때문에 float64 (4500123 -> 4500123.0)
+    first = chunk([4500123, 4500123, 4500124], ['A', 'A', 'B'], [10, 10, 5])
+    second = chunk([4500123, np.nan, 4500124], ['A', 'B', 'B'], [10, np.nan, 5])
+    assert second['PO No.'].dtype == 'float64'
+
+    staged = stage([first, second])
+    keys = list(zip(staged['PO No.'], staged['Model'], staged['Line Seq']))
+    assert len(set(keys)) == len(keys)
+    assert staged['Line Seq'].tolist() == [0, 1, 0, 2, 0, 1]
+
+
+def test_row_hash_ignores_chunk_dtype():
+    as_int = stage([chunk([4500123], ['A'], [10])])
+    as_float = stage([chunk([4500123.0, np.nan], ['A', 'B'], [10.0, np.nan])])
+    as_object = stage([chunk(pd.Series(['4500123'], dtype=object), ['A'], pd.Series([10], dtype=object))])
+    assert as_int['Row Hash'][0] == as_float['Row Hash'][0] == as_object['Row Hash'][0]
+
+
+@pytest.fixture
+def shipment_db(monkeypatch):
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("CREATE TABLE site_mapping (to_site TEXT, region TEXT, country TEXT)")
+    conn.execute("INSERT INTO site_mapping VALUES ('EEUK', 'EU', 'UK')")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(main, 'iter_excel_chunks', functools.partial(excel_stream.iter_excel_chunks, chunk_size=3))
+    return DB_PATH
+
+
+def write_glop_file(path):
+    rows = [
+        ['Model', 'PO No.', 'Ship To', 'Ship', 'Ship Date'],
+        ['A-1.X', '4500123', 'EEUK', '10', '2025-01-02'],
+        ['A-1.X', '4500123', 'EEUK', '10', '2025-01-02'],
+        ['B-1.X', '4500124', 'EEUK', '5', '2025-01-03'],
+        # chunk 경계를 넘어 이어지는 PO 4500123, 같은 chunk에 빈 PO No. / Ship 셀
+        ['A-1.X', '4500123', 'EEUK', '10', '2025-01-04'],
+        ['B-1.X', '', 'EEUK', '', '2025-01-05'],
+        ['B-1.X', '4500124', 'EEUK', '7', '2025-01-06'],
+    ]
+    body = ''.join('<tr>' + ''.join(f'<td>{v}</td>' for v in row) + '</tr>' for row in rows)
+    path.write_text(f'<html><body><table>{body}</table></body></html>', encoding='utf-8')
+    return str(path)
+
+
+def test_save_to_db_po_across_chunks_with_blank_cell(shipment_db, tmp_path):
+    first = main.save_to_db(write_glop_file(tmp_path / 'ship.xls'), 'S', 'NERP', skip_model_filter=True)
+    assert first == {'inserted': 6, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    again = main.save_to_db(write_glop_file(tmp_path / 'ship.xls'), 'S', 'NERP', skip_model_filter=True)
+    assert again == {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 6}
+
+    conn = sqlite3.connect(shipment_db)
+    seqs = conn.execute(
+        'SELECT "Line Seq" FROM shipment_data WHERE "PO No." = 4500123 AND "Model" = \'A-1.X\' ORDER BY "Line Seq"'
+    ).fetchall()
+    conn.close()
+    assert seqs == [(0,), (1,), (2,)]